@@ -0,0 +1,84 @@
+# Archivo: ai_scheduler.py
+
+import os, time  # os para leer la configuración, time para el presupuesto opcional en milisegundos
+from collections import deque  # Cola de baddies que esperan su turno
+from pathfinding import NavGraph
+from path_worker import PathWorker
+
+MOVE_PERIOD = 30  # Cada cuántos frames le toca moverse a un baddie
+STAGGER_STEP = 7  # Separación (en frames) entre baddies consecutivos; coprimo con MOVE_PERIOD para no repetir franja
+
+
+class AIScheduler:
+    """
+    Reparte el trabajo de la IA de los baddies entre frames.
+
+    Antes cada baddie registraba Event(move_action, 30) al cargar el nivel, así que todos
+    buscaban camino en el mismo frame cada 30 frames. Ahora el evento de cada baddie solo
+    lo pone en la cola (con un desfase distinto por baddie) y AIScheduler.update(), una vez
+    por frame, mueve a los que entren en el presupuesto de nodos expandidos; los que no
+    entran quedan primeros en la cola para el frame siguiente. Siempre se atiende al menos
+    uno por frame para que la cola avance aunque una sola búsqueda supere el presupuesto.
+
+    También da turno a los baddies cuya búsqueda en segundo plano (PathWorker) terminó.
+
+    El presupuesto en nodos es determinista (las repeticiones dan lo mismo). El presupuesto
+    en tiempo (LODERUNNER_AI_BUDGET_MS) depende de la máquina, así que solo sirve jugando.
+    """
+    budget = int(os.environ.get('LODERUNNER_AI_BUDGET', 400))  # Nodos expandidos por frame
+    time_budget = float(os.environ.get('LODERUNNER_AI_BUDGET_MS', 0)) / 1000 or None  # Segundos por frame, o None
+    _pending = deque()  # Baddies cuyo turno llegó y todavía no se movieron
+    carried_over = 0  # Turnos que tuvieron que esperar a un frame posterior (para medir)
+
+    @staticmethod
+    def first_delay(slot):
+        """
+        Frames hasta el primer turno del baddie número `slot` del nivel: así los baddies
+        quedan repartidos en las MOVE_PERIOD franjas en lugar de caer todos en la misma.
+        """
+        return MOVE_PERIOD + (slot * STAGGER_STEP) % MOVE_PERIOD
+
+    @staticmethod
+    def request(baddie):
+        """
+        Pone a `baddie` en la cola para moverse apenas haya presupuesto.
+        Si todavía esperaba su turno anterior, no se encola dos veces.
+        """
+        if baddie not in AIScheduler._pending:
+            AIScheduler._pending.append(baddie)
+
+    @staticmethod
+    def cancel(baddie):
+        """
+        Saca a `baddie` de la cola (p.ej. porque murió).
+        """
+        if baddie in AIScheduler._pending:
+            AIScheduler._pending.remove(baddie)
+
+    @staticmethod
+    def reset():
+        """
+        Vacía la cola. Se usa al cargar un nivel.
+        """
+        AIScheduler._pending.clear()
+
+    @staticmethod
+    def update():
+        """
+        Mueve a los baddies de la cola, en orden, mientras quede presupuesto en este frame.
+        """
+        pending = AIScheduler._pending
+        for baddie in PathWorker.ready():
+            AIScheduler.request(baddie)  # Su camino llegó del trabajador: se aplica en este tick
+        if not pending:
+            return
+        start_nodes = NavGraph.expanded
+        deadline = time.perf_counter() + AIScheduler.time_budget if AIScheduler.time_budget else None
+        pending.popleft().move_action()  # El primero siempre, para que la cola nunca se trabe
+        while pending:
+            if NavGraph.expanded - start_nodes >= AIScheduler.budget:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            pending.popleft().move_action()
+        AIScheduler.carried_over += len(pending)
@@ -5,17 +5,25 @@
 from drawable import Drawable 
 from tiles import Tile, Empty
 from event import Event
-import csv, os
 from config import Config
+from level_data import LevelData
+from game_events import GameEvents
+from pathfinding import NavGraph
+from ai_scheduler import AIScheduler, MOVE_PERIOD
+from path_worker import PathWorker
+import os, util
 
 # Defino la clase base para los personajes del juego
 class Character (Drawable):
     char_map = {}  # Diccionario para mapear caracteres del CSV a clases (como 'P' para Player)
 
     @staticmethod
-    def load_characters(num):
+    def load_characters(num, data=None):
         # Método estático para cargar personajes desde un archivo CSV que representa el nivel
         # 'num' es el número del nivel, por ejemplo, 'level1.csv'
+        # 'data' es el LevelData ya parseado (si no me lo dan, lo pido a LevelData)
+        if data is None:
+            data = LevelData.get(num)
 
         # Si ya existe un Player.main de un nivel anterior, quiero mantener sus vidas
         # pero resetear su posición para el nuevo nivel
@@ -25,23 +33,19 @@ class Character (Drawable):
 
         player_loaded_this_level = False  # Bandera para evitar cargar múltiples jugadores en el mismo nivel
 
-        # Abro el archivo CSV correspondiente al nivel
-        with open(os.path.join('levels', 'level{}.csv').format(num)) as file_data:
-            row_num = 0  # Contador de filas
-            for row in csv.reader(file_data):  # Leo cada fila del CSV
-                for col, value in enumerate(row):  # Itero sobre cada columna de la fila
-                    if value in char_map_definition:  # Si el valor está en el diccionario de mapeo
-                        if value == 'P':  # Si encuentro un 'P', es el jugador
-                            if not player_loaded_this_level:  # Solo cargo un jugador por nivel
-                                if Player.main is None:  # Si es el primer nivel o no hay jugador aún
-                                    char_map_definition[value](col, row_num, is_initial_load=True)  # Creo un nuevo Player
-                                else:  # Si el jugador ya existe (de un nivel anterior)
-                                    Player.main.set_initial_pos(col, row_num)  # Actualizo su posición inicial
-                                    Player.main.respawn(force_redraw_lives=True)  # Lo hago reaparecer en la nueva posición
-                                player_loaded_this_level = True  # Marco que ya cargué al jugador
-                        else:  # Si no es 'P', es otro personaje como un Baddie
-                            char_map_definition[value](col, row_num)  # Creo la instancia correspondiente
-                row_num += 1  # Incremento el contador de filas
+        # Recorro los personajes del nivel en el orden del archivo
+        for value, col, row_num in data.characters:
+            if value in char_map_definition:  # Si el valor está en el diccionario de mapeo
+                if value == 'P':  # Si encuentro un 'P', es el jugador
+                    if not player_loaded_this_level:  # Solo cargo un jugador por nivel
+                        if Player.main is None:  # Si es el primer nivel o no hay jugador aún
+                            char_map_definition[value](col, row_num, is_initial_load=True)  # Creo un nuevo Player
+                        else:  # Si el jugador ya existe (de un nivel anterior)
+                            Player.main.set_initial_pos(col, row_num)  # Actualizo su posición inicial
+                            Player.main.respawn(force_redraw_lives=True)  # Lo hago reaparecer en la nueva posición
+                        player_loaded_this_level = True  # Marco que ya cargué al jugador
+                else:  # Si no es 'P', es otro personaje como un Baddie
+                    char_map_definition[value](col, row_num)  # Creo la instancia correspondiente
 
         # Verifico si se cargó un jugador; si no, aviso que falta en el nivel
         if not Player.main:
@@ -142,6 +146,7 @@ class Player (Character):
             self.lives -= 1  # Reduzco las vidas
             print(f"Player perdió una vida. Vidas restantes: {self.lives}")
             Drawable.update_lives_display(self.lives)  # Actualizo la pantalla
+            GameEvents.emit(GameEvents.CHARACTER_DIED, self)
 
         if self.lives > 0:  # Si aún le quedan vidas
             self.respawn()  # Lo hago reaparecer
@@ -169,6 +174,7 @@ class Player (Character):
 
         if self._y + 1 < Config.LEVEL_HEIGHT:  # Si no estoy en la última fila
             self.fall()  # Chequeo si debe caer
+        GameEvents.emit(GameEvents.PLAYER_RESPAWNED, self)
 
     def at_exit(self):
         # Compruebo si el jugador está en la salida (fila 0)
@@ -198,11 +204,13 @@ class Player (Character):
         def refill(tile_dug):
             # Función que se ejecutará para rellenar el tile cavado después de un tiempo
             tile_dug.show()  # Restauro el tile
+            GameEvents.emit(GameEvents.TILE_REFILLED, tile_dug)
             if Player.main and Player.main.pos() == tile_dug.coord:  # Si estoy sobre el tile al rellenarse
                 Player.main.lose_life()  # Pierdo una vida
-            for baddie in Baddie.baddies:  # Chequeo si hay baddies en el tile
+            for baddie in list(Baddie.baddies):  # Chequeo si hay baddies en el tile (copia: die() modifica la lista)
                 if baddie.pos() == tile_dug.coord:
                     baddie.die()  # Elimino al baddie
+                    GameEvents.emit(GameEvents.CHARACTER_DIED, baddie)
 
         dig_x = self._x + direction  # Calculo la posición x del tile a cavar
         dig_y = self._y + 1  # El tile a cavar está justo debajo
@@ -217,6 +225,7 @@ class Player (Character):
             if Tile.query((dig_x, dig_y), 'diggable') and can_dig_from_current_pos:
                 tile_to_dig_obj = Tile.tile_at((dig_x, dig_y))  # Obtengo el objeto del tile
                 tile_to_dig_obj.hide()  # Lo hago desaparecer (se convierte en pasable)
+                GameEvents.emit(GameEvents.TILE_DUG, tile_to_dig_obj)
                 Event(refill, 120, args=[tile_to_dig_obj])  # Programo que se rellene después de 120 ticks
 
                 if Player.main: Player.main.fall()  # Chequeo si caigo tras cavar
@@ -232,15 +241,21 @@ class Baddie (Character):
         super(Baddie, self).__init__(x, y, img_path)
         self.initial_x = x  # Guardo su posición inicial x
         self.initial_y = y  # Guardo su posición inicial y
-        self.move_event = Event(self.move_action, 30, recurring=True)  # Creo un evento para que se mueva cada 30 ticks
+        # Cada 30 ticks pido turno al AIScheduler; el primero se desfasa según cuántos baddies hay ya
+        self.move_event = Event(AIScheduler.request, MOVE_PERIOD, args=[self], recurring=True,
+                                delay=AIScheduler.first_delay(len(Baddie.baddies)))
+        self.route = []  # Camino cacheado hacia el jugador, al revés: el próximo paso es route[-1]
+        self.route_version = -1  # Tile.version con la que se validó el camino
+        self.route_extensions = 0  # Pasos agregados al final sin volver a buscar
         Baddie.baddies.append(self)  # Lo añado a la lista de baddies
         self.draw()  # Lo dibujo en pantalla
 
     def move_action(self):
         # Acción que realiza el baddie cada vez que se dispara el evento de movimiento
         if not Player.main or not Player.main.lives > 0:  # No me muevo si no hay jugador o está muerto
+            PathWorker.cancel(self)  # Nadie va a usar su camino: que PathWorker.ready() no lo vuelva a ofrecer
             return
-        move_coords_delta = PathFinder.run(self.pos())  # Busco el próximo movimiento hacia el jugador
+        move_coords_delta = PathFinder.run_cached(self)  # Busco el próximo movimiento hacia el jugador
         if move_coords_delta:  # Si hay un movimiento válido
             super(Baddie, self).move(*move_coords_delta)  # Me muevo en esa dirección
         if Player.main and self.pos() == Player.main.pos():  # Si alcanzo al jugador
@@ -250,6 +265,8 @@ class Baddie (Character):
         # Elimino al baddie cuando muere
         self.undraw()  # Borro su imagen
         Event.delete(self.move_event)  # Cancelo su evento de movimiento
+        AIScheduler.cancel(self)  # Y el turno que tuviera pendiente
+        PathWorker.cancel(self)  # Y la búsqueda en segundo plano, si había una
         if self in Baddie.baddies: 
             Baddie.baddies.remove(self)  # Lo quito de la lista
 
@@ -262,53 +279,107 @@ Character.char_map = char_map_definition  # Asigno el diccionario a la clase Cha
 
 # Clase para encontrar caminos, usada por los baddies para perseguir al jugador
 class PathFinder:
-    tiles = None  # Matriz para marcar tiles visitados durante la búsqueda
+    # Algoritmo de búsqueda: 'bfs' (el original), 'astar' o 'hierarchical' (para mapas grandes)
+    mode = os.environ.get('LODERUNNER_PATHFINDER', 'bfs')
+    # Si es True, cada baddie reusa su camino entre ticks en lugar de buscar uno nuevo cada vez
+    cache_paths = os.environ.get('LODERUNNER_PATH_CACHE', '1') != '0'
+    max_extensions = 4  # Pasos que se pueden agregar al camino (jugador que se aleja) antes de rehacerlo
+    searches = 0  # Búsquedas completas hechas (las que el caché no pudo evitar)
 
     @staticmethod
-    def valid_tile(pos, last_pos):
-        # Chequeo si un tile es válido para que un baddie se mueva allí
-        x, y = pos
-        if not (0 <= x < Config.LEVEL_WIDTH and 0 <= y < Config.LEVEL_HEIGHT):  # Fuera de límites
-            return False
-        if PathFinder.tiles[x][y]:  # Ya visitado en esta búsqueda
-            return False
-        if Tile.query(pos, 'passable'):  # Si es transitable
-            under = (x, y + 1)  # Posición debajo
-            is_on_grabbable = Tile.query(pos, 'grabbable')  # Chequeo si puedo agarrarme
-            is_supported_below = False
-            if y + 1 < Config.LEVEL_HEIGHT:  # Si hay tile debajo
-                is_supported_below = Tile.query(under, 'standable')  # Chequeo si me sostiene
-            else:  # Si estoy en la última fila
-                is_supported_below = Tile.query(pos, 'standable')
-            return is_on_grabbable or is_supported_below  # Válido si estoy agarrado o soportado
-        return False
+    def find_path(start, goal):
+        """
+        Camino de `start` a `goal` (índices) con el algoritmo de PathFinder.mode: lista de celdas
+        sin `start` y terminando en `goal`, o None si no hay (o si ya está en el objetivo).
+        """
+        if start == goal:
+            return None
+        PathFinder.searches += 1
+        return NavGraph.current().find(start, goal, PathFinder.mode)
+
+    @staticmethod
+    def step_to(start_pos, target):
+        # Movimiento (dx, dy) para pasar de `start_pos` a la celda de índice `target`
+        next_x, next_y = util.coord(target)
+        return (next_x - start_pos[0], next_y - start_pos[1])
 
     @staticmethod
     def run(start_pos):
-        # Implemento un BFS para encontrar el próximo movimiento hacia el jugador
+        # Busco el próximo movimiento hacia el jugador, sin caché
         if not Player.main:  # Si no hay jugador, no hago nada
             return None
-        PathFinder.tiles = [[False for _ in range(Config.LEVEL_HEIGHT)] for _ in range(Config.LEVEL_WIDTH)]  # Reinicio la matriz
-        queue = []  # Cola para el BFS
-
-        # Exploro los movimientos iniciales desde mi posición
-        for dx_dy, neighbor_pos in PathFinder.get_valid_initial_moves(start_pos):
-            if neighbor_pos == Player.main.pos():  # Si ya estoy al lado del jugador
-                return dx_dy  # Devuelvo el movimiento directo
-            PathFinder.tiles[neighbor_pos[0]][neighbor_pos[1]] = True  # Marco como visitado
-            queue.append((neighbor_pos, [dx_dy]))  # Añado a la cola con el primer movimiento
-
-        # Proceso la cola hasta encontrar al jugador
-        while queue:
-            current_pos, path_taken = queue.pop(0)  # Tomo el primer elemento (FIFO)
-            for dx_dy_next, next_neighbor_pos in PathFinder.get_valid_initial_moves(current_pos):
-                if next_neighbor_pos == Player.main.pos():  # Encontré al jugador
-                    return path_taken[0]  # Devuelvo el primer paso del camino
-                if not PathFinder.tiles[next_neighbor_pos[0]][next_neighbor_pos[1]]:  # Si no lo visité
-                    PathFinder.tiles[next_neighbor_pos[0]][next_neighbor_pos[1]] = True  # Lo marco
-                    new_path = list(path_taken)  # Copio el camino
-                    queue.append((next_neighbor_pos, new_path))  # Añado a la cola
-        return None  # No encontré camino
+        path = PathFinder.find_path(util.index(*start_pos), util.index(*Player.main.pos()))
+        if not path:
+            return None
+        return PathFinder.step_to(start_pos, path[0])
+
+    @staticmethod
+    def run_cached(baddie):
+        """
+        Próximo movimiento de `baddie` hacia el jugador reusando el camino guardado en baddie.route.
+        Solo se busca de nuevo si:
+        - el baddie no está sobre su camino (cayó, o se restauró una foto),
+        - el terreno cambió (Tile.version) y el resto del camino ya no se puede recorrer,
+        - el jugador se fue a una celda que no está en el camino ni a un paso de su final,
+          o ya se alargó el camino max_extensions veces (para no seguir uno cada vez peor).
+        Un tramo de un camino más corto sigue siendo el más corto, así que recortarlo no empeora nada.
+        Con PathWorker activo, las búsquedas se piden al trabajador y el baddie espera (sin moverse)
+        hasta que AIScheduler le dé turno con el resultado listo.
+        """
+        if not Player.main:
+            return None
+        if not PathFinder.cache_paths:
+            return PathFinder.run(baddie.pos())
+        graph = NavGraph.current()
+        start_pos = baddie.pos()
+        start = util.index(*start_pos)
+        goal = util.index(*Player.main.pos())
+        route = baddie.route
+        use_worker = PathWorker.enabled()
+        if use_worker:
+            path = PathWorker.take(baddie, start)  # Resultado del trabajador, si llegó y sigue valiendo
+            if path is PathWorker.FAILED:
+                use_worker = False  # Falló en el trabajador: esta vez se busca aquí
+            elif path:
+                route = path[::-1]
+                baddie.route_version = Tile.version
+                baddie.route_extensions = 0
+
+        # El baddie tiene que estar justo antes de route[-1]; si cayó sobre su propio camino, lo recorto
+        if route and not graph.has_move(start, route[-1]):
+            route = route[:route.index(start)] if start in route else []
+
+        # Si el terreno cambió, el camino sirve mientras cada paso siga siendo posible
+        if route and baddie.route_version != Tile.version:
+            previous = start
+            for node in reversed(route):
+                if not graph.has_move(previous, node):
+                    route = []
+                    break
+                previous = node
+
+        # Si el jugador se movió: recorto si está sobre el camino, alargo si está a un paso del final
+        if route and route[0] != goal:
+            if goal in route:
+                route = route[route.index(goal):]
+            elif baddie.route_extensions < PathFinder.max_extensions and graph.has_move(route[0], goal):
+                route.insert(0, goal)
+                baddie.route_extensions += 1
+            else:
+                route = []
+
+        if not route and use_worker:
+            if graph.reachable(start, goal):  # Lo inalcanzable se descarta aquí mismo, sin molestar al trabajador
+                PathWorker.submit(baddie, start, goal, PathFinder.mode)
+        elif not route:
+            path = PathFinder.find_path(start, goal)
+            route = path[::-1] if path else []
+            baddie.route_extensions = 0
+        baddie.route = route
+        baddie.route_version = Tile.version
+        if not route:
+            return None
+        return PathFinder.step_to(start_pos, route.pop())
 
     @staticmethod
     def get_valid_initial_moves(pos_from):
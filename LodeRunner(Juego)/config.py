@@ -1,4 +1,5 @@
-import os, csv  # Importa los módulos os y csv para operaciones del sistema y lectura de CSV
+import os  # Para leer el tamaño de celda y el de ventana máximo del entorno
+from level_data import LevelData  # Niveles ya parseados (y precargados en segundo plano)
 
 class Config:
     """
@@ -8,7 +9,15 @@ class Config:
     LEVEL_WIDTH = 35  # Ancho predeterminado del nivel en número de celdas
     LEVEL_HEIGHT = 21  # Alto predeterminado del nivel en número de celdas
 
-    CELL_SIZE = 35  # Tamaño en píxeles de cada celda
+    BASE_CELL_SIZE = 35  # Tamaño de celda para el que están pensados los PNG de 'graphics' (se dibujan tal cual)
+    PREFERRED_CELL_SIZE = int(os.environ.get('LODERUNNER_CELL_SIZE', BASE_CELL_SIZE))  # El que se usa si entra
+    MIN_CELL_SIZE = 8  # Ni para que entre un nivel enorme se achica más que esto
+    # Ventana máxima "ANCHOxALTO" (LODERUNNER_MAX_WINDOW, p.ej. 1280x720): los niveles que no entran
+    # con PREFERRED_CELL_SIZE usan celdas más chicas. Sin la variable no hay límite
+    MAX_WINDOW = tuple(int(side) for side in os.environ['LODERUNNER_MAX_WINDOW'].lower().split('x')) \
+        if os.environ.get('LODERUNNER_MAX_WINDOW') else None
+
+    CELL_SIZE = PREFERRED_CELL_SIZE  # Tamaño en píxeles de cada celda
 
     WINDOW_WIDTH = CELL_SIZE * LEVEL_WIDTH  # Ancho de la ventana del juego en píxeles
     WINDOW_HEIGHT = CELL_SIZE * LEVEL_HEIGHT  # Alto de la ventana del juego en píxeles
@@ -16,21 +25,25 @@ class Config:
     hidden_flag = False  # Bandera para controlar alguna funcionalidad de visibilidad, inicializada en False
 
     @staticmethod
-    def config_level(num):
+    def config_level(num, data=None):
         """
         Configura las dimensiones del nivel y de la ventana basadas en el archivo CSV del nivel especificado.
 
         :param num: Número del nivel a cargar (por ejemplo, 1 para 'level1.csv')
+        :param data: LevelData ya parseado del nivel; si no se da, se lee el archivo
         """
-        # Construye la ruta al archivo CSV del nivel
-        with open(os.path.join('levels', 'level{}.csv').format(num)) as file_data:
-            row_num = 0  # Contador de filas
-            for row in csv.reader(file_data):
-                # Actualiza el ancho del nivel con la longitud de la fila
-                # Nota: Esto asume que todas las filas tienen el mismo número de columnas
-                Config.LEVEL_WIDTH = len(row)
-                row_num += 1  # Incrementa el contador de filas
-            Config.LEVEL_HEIGHT = row_num  # Establece el alto del nivel como el número de filas
+        if data is None:
+            data = LevelData.get(num)
+        # Nota: Esto asume que todas las filas tienen el mismo número de columnas
+        Config.LEVEL_WIDTH = data.width
+        Config.LEVEL_HEIGHT = data.height  # Establece el alto del nivel como el número de filas
+
+        # Achica las celdas si el nivel no entra en la ventana máxima (los sprites se escalan con Drawable.sprite)
+        Config.CELL_SIZE = Config.PREFERRED_CELL_SIZE
+        if Config.MAX_WINDOW:
+            max_width, max_height = Config.MAX_WINDOW
+            fit = min(max_width // max(data.width, 1), max_height // max(data.height, 1))
+            Config.CELL_SIZE = max(Config.MIN_CELL_SIZE, min(Config.CELL_SIZE, fit))
 
         # Recalcula las dimensiones de la ventana basadas en el nuevo tamaño del nivel
         Config.WINDOW_WIDTH = Config.CELL_SIZE * Config.LEVEL_WIDTH
@@ -0,0 +1,194 @@
+# Archivo: cpuprof.py
+
+import os, sys, time, atexit  # os para rutas y configuración, time para la ventana de captura
+import threading  # El perfilador por muestreo mira la pila del hilo del juego desde otro hilo
+import cProfile, pstats  # Perfilado determinista y su resumen
+
+PROFILE_DIR = 'profiles'  # Carpeta (junto a 'levels') donde se guardan los perfiles
+
+
+class _DeterministicCapture:
+    """
+    Captura con cProfile: cuenta cada llamada, pero solo mientras corre código del juego
+    (CpuProfiler.call), así no entran las esperas entre frames, Tk ni los carteles.
+    """
+    extension = 'pstats'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def enter(self):
+        self.profile.enable()
+
+    def exit(self):
+        self.profile.disable()
+
+    def stop(self):
+        pass
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+        stats = pstats.Stats(self.profile, stream=sys.stdout)
+        stats.sort_stats('cumulative').print_stats(12)
+
+
+class _SamplingCapture:
+    """
+    Captura por muestreo: un hilo mira cada `interval` segundos la pila del hilo del juego y,
+    si está dentro de CpuProfiler.call, la cuenta. Cuesta casi nada aunque el juego haga muchas
+    llamadas; el resultado son pilas colapsadas ("a;b;c cuenta"), el formato de los flame graphs.
+    """
+    extension = 'collapsed'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = {}  # "archivo:función;..." (de la raíz hacia adentro) -> muestras
+        self.samples = 0
+        self.inside = False  # True mientras el juego corre código que se perfila
+        self._target = threading.get_ident()
+        # El hilo de muestreo necesita el GIL para mirar la pila: si el juego lo suelta recién cada
+        # 5 ms (el intervalo por defecto), los ticks cortos casi nunca se ven. Lo acorto mientras se mide
+        self._switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch, interval / 4))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if not self.inside:
+                continue
+            frame = sys._current_frames().get(self._target)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def enter(self):
+        self.inside = True
+
+    def exit(self):
+        self.inside = False
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch)
+
+    def dump(self, path):
+        with open(path, 'w') as file_data:
+            for stack, count in sorted(self.stacks.items()):
+                file_data.write(f"{stack} {count}\n")
+        totals = {}  # Muestras en las que cada función estaba en la punta de la pila
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            totals[leaf] = totals.get(leaf, 0) + count
+        print(f"{self.samples} muestras cada {self.interval * 1000:.1f} ms; más frecuentes en la punta:")
+        for leaf, count in sorted(totals.items(), key=lambda item: -item[1])[:12]:
+            print(f"  {count:6d} {count / max(self.samples, 1):6.1%}  {leaf}")
+
+
+class CpuProfiler:
+    """
+    Perfilado de CPU a pedido, por nivel. Se activa de dos maneras:
+    - LODERUNNER_PROFILE=cprofile (determinista) o =sample (por muestreo, cada
+      LODERUNNER_PROFILE_INTERVAL_MS ms): perfila cada nivel, o solo el nivel
+      LODERUNNER_PROFILE_LEVEL si se da;
+    - la tecla 'p' (main.CONTROL_KEYS): empieza o termina una captura en el momento.
+    LODERUNNER_PROFILE_SECONDS limita cada captura a esa cantidad de segundos.
+
+    Solo se mide lo que se corre con CpuProfiler.call() (el tick lógico y el render de los
+    sprites): las esperas del ritmo de frames, el update() de Tk y los carteles no entran.
+    Cada captura se guarda en profiles/level<N>-<fecha>.pstats (abrir con pstats o snakeviz)
+    o .collapsed (para flamegraph.pl / speedscope) y se imprime un resumen.
+    """
+    mode = os.environ.get('LODERUNNER_PROFILE', '')  # '', 'cprofile' o 'sample'
+    only_level = int(os.environ['LODERUNNER_PROFILE_LEVEL']) if os.environ.get('LODERUNNER_PROFILE_LEVEL') else None
+    seconds = float(os.environ['LODERUNNER_PROFILE_SECONDS']) if os.environ.get('LODERUNNER_PROFILE_SECONDS') else None
+    interval = float(os.environ.get('LODERUNNER_PROFILE_INTERVAL_MS', 2)) / 1000
+    _capture = None  # Captura en curso, o None
+    _label = None  # Nombre del archivo de la captura en curso
+    _started = 0.0  # Cuándo empezó la captura en curso (perf_counter)
+    _level = None  # Nivel que se está jugando (None fuera del bucle del juego, p.ej. en replays)
+    _exit_hook = False  # Si ya se registró el volcado al salir
+
+    @staticmethod
+    def call(func, *args):
+        """
+        Llama a `func(*args)` perfilándola si hay una captura en curso.
+        """
+        capture = CpuProfiler._capture
+        if capture is None:
+            return func(*args)
+        capture.enter()
+        try:
+            return func(*args)
+        finally:
+            capture.exit()
+            if CpuProfiler.seconds is not None and time.perf_counter() - CpuProfiler._started >= CpuProfiler.seconds:
+                CpuProfiler.stop()  # Terminó la ventana de tiempo
+
+    @staticmethod
+    def start(label, mode=None):
+        """
+        Empieza una captura llamada `label` (termina la anterior si había una).
+        """
+        CpuProfiler.stop()
+        mode = mode or CpuProfiler.mode or 'cprofile'
+        CpuProfiler._capture = (_SamplingCapture(CpuProfiler.interval) if mode == 'sample'
+                                else _DeterministicCapture())
+        CpuProfiler._label = label
+        CpuProfiler._started = time.perf_counter()
+        if not CpuProfiler._exit_hook:
+            atexit.register(CpuProfiler.stop)  # Perder la última vida o cerrar la ventana también guarda
+            CpuProfiler._exit_hook = True
+        print(f"Perfilando ({mode}): {label}")
+
+    @staticmethod
+    def stop():
+        """
+        Termina la captura en curso, si hay, y la guarda en disco. Devuelve la ruta o None.
+        """
+        capture, CpuProfiler._capture = CpuProfiler._capture, None
+        if capture is None:
+            return None
+        capture.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{CpuProfiler._label}-{time.strftime('%Y%m%d-%H%M%S')}.{capture.extension}")
+        print(f"Perfil de {CpuProfiler._label} ({time.perf_counter() - CpuProfiler._started:.1f} s) en {path}")
+        capture.dump(path)
+        return path
+
+    @staticmethod
+    def level_started(level_num):
+        """
+        El bucle del juego empieza a jugar `level_num`: con LODERUNNER_PROFILE, empieza su captura.
+        """
+        CpuProfiler.stop()  # Lo que quedara del nivel anterior (p.ej. una captura con 'p')
+        CpuProfiler._level = level_num
+        if CpuProfiler.mode and CpuProfiler.only_level in (None, level_num):
+            CpuProfiler.start(f'level{level_num}')
+
+    @staticmethod
+    def level_finished(level_num):
+        """
+        Se completó `level_num`: guarda su captura antes del cartel de nivel superado.
+        """
+        CpuProfiler.stop()
+
+    @staticmethod
+    def toggle():
+        """
+        Tecla 'p': empieza una captura del nivel actual o termina la que está en curso.
+        Fuera del bucle del juego (p.ej. al repetir una sesión grabada) no hace nada.
+        """
+        if CpuProfiler._level is None:
+            return
+        if CpuProfiler._capture is not None:
+            CpuProfiler.stop()
+        else:
+            CpuProfiler.start(f'level{CpuProfiler._level}-tecla')
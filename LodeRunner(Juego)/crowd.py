@@ -0,0 +1,205 @@
+# Archivo: crowd.py
+
+import time, random  # time para medir ticks/s, random para repartir la multitud
+import io, contextlib  # Para callar los print del juego durante benchmark()
+from array import array  # Arreglos compactos de enteros: posiciones y tablas de la multitud
+from collections import deque  # Cola del BFS del campo de distancias
+from level_data import STANDABLE, GRABBABLE, navigable
+from tiles import Tile
+from config import Config
+from pathfinding import NavGraph
+from ai_scheduler import MOVE_PERIOD
+import util
+
+
+class CrowdMember:
+    """
+    Vista de un baddie de la multitud: no guarda nada propio, lee su celda del arreglo de Crowd.
+    """
+    __slots__ = ('crowd', 'slot')
+
+    def __init__(self, crowd, slot):
+        self.crowd = crowd
+        self.slot = slot
+
+    def pos(self):
+        # Igual que Character.pos(): la posición (x, y) actual
+        return util.coord(self.crowd.cells[self.slot])
+
+
+class Crowd:
+    """
+    Modo multitud para pruebas de carga: miles de baddies sin un objeto Baddie (ni Event, ni
+    búsqueda, ni imagen) por cada uno. Las celdas de todos viven en un solo array('i') y en cada
+    frame se mueve en bloque una de las MOVE_PERIOD franjas, igual que el escalonado de AIScheduler.
+
+    Todos persiguen al mismo jugador, así que comparten un solo campo de distancias (un BFS hacia
+    atrás desde el jugador) que se rehace cuando él se mueve o cambia el terreno. De ese campo sale
+    una tabla `step` (celda -> celda tras el próximo movimiento y la caída), y mover una franja es
+    aplicar la tabla a su tramo del arreglo con map(), sin un bucle de Python por baddie.
+    Cuando cambia el terreno (hoyos cavados) se aplica a todos la tabla de caída `land`.
+
+    No hay numpy en el entorno del juego: array + map es lo más cercano en la biblioteca estándar.
+    La multitud no se dibuja ni entra en las fotos/repeticiones; es solo para medir.
+    """
+    active = None  # Multitud del nivel actual, o None
+
+    @staticmethod
+    def start(count, seed=0, lethal=True):
+        """
+        Crea una multitud de `count` baddies en celdas navegables al azar del nivel actual.
+        Si `lethal` es False, alcanzar al jugador solo se cuenta (para medir sin perder vidas).
+        """
+        Crowd.active = Crowd(count, random.Random(seed), lethal)
+        return Crowd.active
+
+    @staticmethod
+    def stop():
+        """
+        Quita la multitud (p.ej. al cargar otro nivel).
+        """
+        Crowd.active = None
+
+    @staticmethod
+    def update_active():
+        """
+        Avanza un frame la multitud activa, si hay.
+        """
+        if Crowd.active is not None:
+            Crowd.active.update()
+
+    def __init__(self, count, rng, lethal=True):
+        width, height = Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT
+        places = [index for index in range(width * height) if navigable(Tile.props, index, width, height)]
+        self.cells = array('i', (rng.choice(places) for _ in range(count)))
+        self.lethal = lethal
+        self.phase = 0  # Franja que se mueve en el próximo frame
+        self.catches = 0  # Veces que un baddie de la multitud alcanzó al jugador
+        self._version = None  # Tile.version con la que se armaron las tablas
+        self._goal = None  # Celda del jugador con la que se armó el campo de distancias
+        self._land = self._reverse = self._step = None
+
+    def __len__(self):
+        return len(self.cells)
+
+    def member(self, slot):
+        """
+        Devuelve la vista (CrowdMember) del baddie número `slot`.
+        """
+        return CrowdMember(self, slot)
+
+    def _refresh_terrain(self, graph):
+        # Tabla de caída: celda -> celda donde termina de caer (misma regla que Character.fall),
+        # armada de abajo hacia arriba para que cada celda reuse la de la de abajo
+        props, width = Tile.props, graph.width
+        size = len(props)
+        land = array('i', range(size))
+        for index in range(size - width - 1, -1, -1):
+            if not props[index + width] & STANDABLE and not props[index] & GRABBABLE:
+                land[index] = land[index + width]
+        reverse = [[] for _ in range(size)]  # Movimientos al revés, para el BFS desde el jugador
+        for index, moves in enumerate(graph.adj):
+            for _, target in moves:
+                reverse[target].append(index)
+        if self._version is not None:
+            self.cells = array('i', map(land.__getitem__, self.cells))  # El terreno cambió: caen todos los que deban
+        self._land, self._reverse = land, reverse
+        self._version = Tile.version
+        self._goal = None  # El campo de distancias también hay que rehacerlo
+
+    def _refresh_goal(self, graph, goal):
+        # Campo de distancias al jugador y, a partir de él, la tabla del próximo paso de cada celda
+        size = len(graph.adj)
+        step = array('i', range(size))
+        if goal is not None:
+            dist = array('i', [-1]) * size
+            dist[goal] = 0
+            queue = deque([goal])
+            reverse = self._reverse
+            while queue:
+                node = queue.popleft()
+                near = dist[node] + 1
+                for previous in reverse[node]:
+                    if dist[previous] < 0:
+                        dist[previous] = near
+                        queue.append(previous)
+            land = self._land
+            for index, moves in enumerate(graph.adj):
+                wanted = dist[index] - 1
+                if wanted >= 0:
+                    for _, target in moves:  # En el orden de MOVES, como PathFinder
+                        if dist[target] == wanted:
+                            step[index] = land[target]
+                            break
+        self._step = step
+        self._goal = goal
+
+    def update(self):
+        """
+        Mueve en bloque la franja de baddies a la que le toca este frame.
+        """
+        from characters import Player  # Import diferido: characters no depende de este módulo
+        graph = NavGraph.current()
+        if self._version != Tile.version:
+            self._refresh_terrain(graph)
+        goal = util.index(*Player.main.pos()) if Player.main else None
+        if goal != self._goal or self._step is None:
+            self._refresh_goal(graph, goal)
+        phase = self.phase
+        self.phase = (phase + 1) % MOVE_PERIOD
+        moved = array('i', map(self._step.__getitem__, self.cells[phase::MOVE_PERIOD]))
+        self.cells[phase::MOVE_PERIOD] = moved
+        if goal is not None and goal in moved:
+            self.catches += 1
+            if self.lethal:
+                Player.main.lose_life()
+
+
+def benchmark(sizes, ticks=600, level=1, objects_max=200):
+    """
+    Mide ticks/s del juego sin ventana con multitudes de cada tamaño de `sizes`. Para tamaños
+    hasta `objects_max` también mide lo mismo con objetos Baddie, para comparar.
+    El jugador camina de un lado a otro con perf.LIVES vidas, repuestas en cada tick para que la
+    prueba no termine antes (infinitas no: reaparecer sobre un baddie termina en RecursionError).
+    """
+    import main  # Import diferido: main importa este módulo
+    from perf import LIVES
+    from drawable import Drawable
+    from characters import Player, Baddie
+    Drawable.headless = True
+    for size in sizes:
+        kinds = ['multitud', 'objetos'] if size <= objects_max else ['multitud']
+        for kind in kinds:
+            # Los print del juego (cargas, vidas perdidas) no se mezclan con los resultados
+            with contextlib.redirect_stdout(io.StringIO()):
+                random.seed(0)
+                main.load_level(level)
+                if kind == 'multitud':
+                    Crowd.start(size, lethal=False)
+                else:
+                    rng = random.Random(0)
+                    width, height = Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT
+                    places = [index for index in range(width * height) if navigable(Tile.props, index, width, height)]
+                    for _ in range(size):
+                        Baddie(*util.coord(rng.choice(places)))
+                player = Player.main
+                start = time.perf_counter()
+                for tick in range(ticks):
+                    player.lives = LIVES
+                    key = ('Left' if tick // 200 % 2 else 'Right') if tick % 15 == 0 else None
+                    main.game_tick(key)
+                elapsed = time.perf_counter() - start
+            print(f"{size:>7} baddies ({kind}): {ticks / elapsed:10.0f} ticks/s")
+    Crowd.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Mide ticks/s del modo multitud según la cantidad de baddies.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--ticks', type=int, default=600, help='Ticks a simular por tamaño')
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--objects-max', type=int, default=200, help='Hasta qué tamaño medir también con objetos Baddie')
+    options = parser.parse_args()
+    import crowd  # Uso el módulo importado (el mismo Crowd que ve main), no este __main__
+    crowd.benchmark(options.sizes, options.ticks, options.level, options.objects_max)
@@ -1,31 +1,235 @@
 # Archivo: drawable.py
 
 import os                # Módulo para operaciones del sistema de archivos (rutas, existencia de archivos, etc.)
+import base64            # Para pasarle a Tk los PNG ya leídos en memoria
 import time              # Para usar funciones de tiempo, como time.sleep() o medir intervalos
+from fractions import Fraction  # Escala de los sprites como zoom/subsample enteros de Tk
 from config import Config  # Importa la clase Config desde config.py, que carga parámetros de configuración del juego
-from graphics import Image, Point, GraphWin, Text, GraphicsError  
+import util              # util.screen_pos: de celda a píxeles
+from hud import Hud      # Vidas y monedas: textos que se actualizan solo cuando cambian
+
+
+def _graphics():
+    """
+    Importo graphics (y con él tkinter) recién la primera vez que hay que crear la ventana,
+    cargar una imagen o dibujar algo. Así los módulos de lógica, las repeticiones y las
+    pruebas sin pantalla importan sin cargar Tk.
+    """
+    import graphics
+    return graphics
+
+
+class GameOver(SystemExit):
+    """
+    La lanza Drawable.lost() cuando el juego corre en el runtime asíncrono: el cartel ya está
+    dibujado y el bucle del juego espera la tecla con await antes de salir. Hereda de SystemExit
+    para que quien ya esperaba la salida de lost() (como las repeticiones) la trate igual.
+    """
+
+
+class Sprite(object):
+    """
+    Imagen de un objeto del juego puesta directo en el lienzo, sin graphics.Image: la posición
+    son dos números (el centro en píxeles) en lugar de un Point con su diccionario de opciones,
+    y moverla es un solo canvas.coords(), sin clonar puntos ni pasar por toScreen()/Transform
+    (el juego nunca usa setCoords, así que las coordenadas del lienzo ya son píxeles).
+    Con __slots__ y sin objetos propios, moverla no reserva memoria en Python.
+
+    Tiene canvas, id, draw() y undraw() como un GraphicsObject, así GraphWin.clear() y
+    GraphWin.redraw() la tratan igual que al resto de lo dibujado.
+    """
+    __slots__ = ('photo', 'x', 'y', 'canvas', 'id')
+
+    def __init__(self, photo, x, y):
+        self.photo = photo  # PhotoImage compartido (Drawable._sprites), que además la mantiene viva
+        self.x = x
+        self.y = y
+        self.canvas = None  # GraphWin donde está dibujada, o None
+        self.id = None  # Id del ítem en el lienzo
+
+    def draw(self, window):
+        """
+        Dibuja la imagen en `window`, salvo que ya esté dibujada en una ventana abierta.
+        """
+        if self.canvas is not None and not self.canvas.isClosed():
+            return
+        self.canvas = window
+        self.id = window.create_image(self.x, self.y, image=self.photo)
+        window.addItem(self)
+
+    def undraw(self):
+        """
+        Saca la imagen del lienzo (si estaba dibujada).
+        """
+        canvas = self.canvas
+        if canvas is None:
+            return
+        if not canvas.isClosed():
+            canvas.delete(self.id)
+            canvas.delItem(self)
+        self.canvas = None
+        self.id = None
+
+    def place(self, x, y):
+        """
+        Pone el centro de la imagen en (x, y) píxeles. Devuelve False si ya estaba ahí.
+        """
+        if x == self.x and y == self.y:
+            return False
+        self.x = x
+        self.y = y
+        if self.id is not None:
+            self.canvas.coords(self.id, x, y)
+        return True
 
 
 class Drawable(object):
     _window = None  # Mi ventana gráfica donde se dibuja todo el juego
-    _lives_text_item = None  # El texto que muestra las vidas, lo guardo para actualizarlo después
-    _coin_counter_text = None  # El texto del contador de monedas, también lo guardo para modificarlo
+    headless = False  # Si es True no cargo imágenes ni dibujo nada (repeticiones sin pantalla)
+    _sprites = {}  # Cache de PhotoImage por archivo: cada PNG se decodifica una sola vez y lo comparten todos
+    _scaled = {}  # Tamaño de celda -> {archivo: PhotoImage escalado a ese tamaño}, compartidos igual que _sprites
+    MAX_SCALE_STEP = 8  # Mayor subsample para aproximar la escala (más da escalas más exactas y zoom intermedios más grandes)
+    async_mode = False  # Si es True (runtime.py), lost() y won() no bloquean: las esperas las hace el runtime
+    _moved = set()  # Objetos que se movieron alguna vez en este nivel; render() ubica los que tienen _pending
+    sprite_moves = 0  # Imágenes reubicadas en el lienzo en total (para medir el trabajo de Tk)
+    _screen_x = []  # Centro en píxeles de cada columna, precalculado con util.screen_pos en recreateWindow()
+    _screen_y = []  # Y de cada fila
+
+    @staticmethod
+    def center(x, y):
+        """
+        Centro en pantalla (píxeles) de la celda (x, y).
+        """
+        screen_x, screen_y = util.screen_pos(x, y)
+        return screen_x + Config.CELL_SIZE / 2, screen_y + Config.CELL_SIZE / 2
+
+    @staticmethod
+    def screen_tables():
+        """
+        Precalcula el centro en píxeles de cada columna y de cada fila del nivel, así ubicar
+        un sprite es leer dos listas (sin cuentas ni tuplas nuevas).
+        """
+        Drawable._screen_x = [Drawable.center(x, 0)[0] for x in range(Config.LEVEL_WIDTH)]
+        Drawable._screen_y = [Drawable.center(0, y)[1] for y in range(Config.LEVEL_HEIGHT)]
+
+    @staticmethod
+    def render():
+        """
+        Lleva al lienzo los movimientos del tick: cada imagen que cambió de celda se ubica una
+        sola vez con coords() en su posición final, sin importar cuántos pasos (caídas, reapariciones)
+        dio en el medio. Las que volvieron a su lugar no se tocan. Devuelve cuántas se movieron.
+        También muestra los cambios del HUD (Hud.flush).
+        """
+        # El set no se vacía en cada frame (vaciarlo libera su tabla y volver a llenarlo la reserva
+        # de nuevo): cada objeto marca con _pending si se movió desde el último render()
+        count = 0
+        if Drawable._window and not Drawable._window.isClosed():
+            for drawable in Drawable._moved:
+                if drawable._pending:
+                    drawable._pending = False
+                    count += drawable._place()
+            Hud.flush(Drawable._window)
+        Drawable.sprite_moves += count
+        return count
 
     @staticmethod
     def recreateWindow():
         """
-        Creo o recreo la ventana del juego desde cero cuando sea necesario.
+        Preparo la ventana para un nivel nuevo. Si ya hay una abierta la reutilizo: le cambio
+        el tamaño y borro todo de una vez salvo el HUD, así no parpadea ni se vuelve a montar Tk.
+        Solo la creo desde cero la primera vez (o si la cerraron).
         """
-        if Drawable._window:
-            try:
-                Drawable._window.close()  # Si ya hay una ventana, la cierro primero
-            except:
-                pass  # No me preocupo si ya estaba cerrada o algo falla
-        # Hago una ventana nueva con el tamaño que definí en Config, más un pequeño margen
-        Drawable._window = GraphWin("LodeRunner", Config.WINDOW_WIDTH + 20, Config.WINDOW_HEIGHT + 20)
+        width = Config.WINDOW_WIDTH + 20  # El tamaño que definí en Config, más un pequeño margen
+        height = Config.WINDOW_HEIGHT + 20
+        Drawable.screen_tables()  # El nivel nuevo puede tener otro tamaño
+        Drawable._moved = set()  # Los objetos del nivel anterior ya no se dibujan
+        if Drawable._window and not Drawable._window.isClosed():
+            Drawable._window.clear(keep=Hud.items())  # Un solo borrado para todos los tiles y personajes
+            Drawable._window.resize(width, height)
+            return
+        # Hago una ventana nueva
+        Drawable._window = _graphics().GraphWin("LodeRunner", width, height)
         Drawable._window.setBackground('lightcyan')  # Le pongo un fondo claro y bonito
-        Drawable._lives_text_item = None  # Reseteo el texto de las vidas
-        Drawable._coin_counter_text = None  # Reseteo el contador de monedas
+        Hud.attach(Drawable._window)  # El HUD se vuelve a dibujar en la ventana nueva
+
+    @staticmethod
+    def raise_hud():
+        """
+        Subo el HUD por encima de todo lo demás; lo llamo después de dibujar un nivel
+        nuevo, porque el HUD reutilizado quedó debajo de los tiles recién dibujados.
+        """
+        if not Drawable._window or Drawable._window.isClosed():
+            return
+        for item in Hud.items():
+            Drawable._window.tag_raise(item.id)
+
+    @staticmethod
+    def sprite(img_path):
+        """
+        Devuelvo el PhotoImage de `img_path` para el Config.CELL_SIZE actual. Cada tamaño se escala
+        una sola vez (la primera vez que se pide) a partir del PNG ya decodificado, y todos los tiles
+        comparten el resultado: cambiar de tamaño de celda no vuelve a leer ni a escalar nada por tile.
+        """
+        cell_size = Config.CELL_SIZE
+        if cell_size == Config.BASE_CELL_SIZE:
+            return Drawable.native_sprite(img_path)  # Tamaño original: no hay nada que escalar
+        scaled = Drawable._scaled.get(cell_size)
+        if scaled is None:
+            scaled = Drawable._scaled[cell_size] = {}
+        if img_path not in scaled:
+            scaled[img_path] = Drawable.scale_photo(Drawable.native_sprite(img_path), cell_size)
+        return scaled[img_path]
+
+    @staticmethod
+    def scale_photo(photo, cell_size):
+        """
+        Escalo `photo` (pensado para Config.BASE_CELL_SIZE) a `cell_size` con zoom() y subsample()
+        de Tk: la escala se aproxima con una fracción de denominador chico (MAX_SCALE_STEP), todo se
+        hace dentro de Tk en dos llamadas y la transparencia se conserva.
+        """
+        if photo is None:
+            return None
+        ratio = Fraction(cell_size, Config.BASE_CELL_SIZE).limit_denominator(Drawable.MAX_SCALE_STEP)
+        if ratio.numerator == 0:
+            ratio = Fraction(1, Drawable.MAX_SCALE_STEP)  # Celdas diminutas: lo más chico que se puede
+        try:
+            if ratio.numerator > 1:
+                photo = photo.zoom(ratio.numerator)
+            if ratio.denominator > 1:
+                photo = photo.subsample(ratio.denominator)
+        except Exception as e:
+            print(f"No pude escalar un sprite a {cell_size} px: {e}")
+        return photo
+
+    @staticmethod
+    def native_sprite(img_path):
+        """
+        Devuelvo el PhotoImage de `img_path` en su tamaño original, cargándolo solo la primera vez que me lo piden.
+        Si falla la carga lo recuerdo también, para no reintentarlo (ni avisarlo) en cada tile.
+        """
+        if img_path not in Drawable._sprites:
+            graphics = _graphics()
+            try:
+                Drawable._sprites[img_path] = graphics.tk.PhotoImage(file=os.path.join('graphics', img_path), master=graphics._get_root())
+            except Exception as e:
+                print(f"No pude cargar la imagen {img_path}: {e}")
+                Drawable._sprites[img_path] = None
+        return Drawable._sprites[img_path]
+
+    @staticmethod
+    def preload_sprites(sprites):
+        """
+        Decodifico los sprites que me pasan ya leídos ({archivo: bytes}, p.ej. los que precargó
+        LevelData en segundo plano), así el hilo de Tk no tiene que ir al disco.
+        """
+        graphics = _graphics()
+        for img_path, data in sprites.items():
+            if img_path not in Drawable._sprites:
+                try:
+                    Drawable._sprites[img_path] = graphics.tk.PhotoImage(data=base64.b64encode(data), master=graphics._get_root())
+                except Exception as e:
+                    print(f"No pude cargar la imagen {img_path}: {e}")
+                    Drawable._sprites[img_path] = None
 
     @staticmethod
     def lost():
@@ -38,18 +242,23 @@ class Drawable(object):
 
         try:
             # Pongo un mensaje grande y rojo en el medio de la pantalla
-            t = Text(Point(Config.WINDOW_WIDTH / 2 + 10, Config.WINDOW_HEIGHT / 2 + 10), 'PERDISTE!')
+            graphics = _graphics()
+            t = graphics.Text(graphics.Point(Config.WINDOW_WIDTH / 2 + 10, Config.WINDOW_HEIGHT / 2 + 10), 'PERDISTE!')
             t.setSize(36)  # Que sea bien grande para que se note
             t.setTextColor('red')  # Rojo para el drama
             t.draw(Drawable._window)  # Lo dibujo en la ventana
+            Drawable.render()  # Los personajes quedan donde terminó el último tick
             Drawable._window.update()  # Refresco la pantalla para que se vea
+            if Drawable.async_mode:
+                raise GameOver(0)  # El runtime espera la tecla con await y cierra
             Drawable._window.getKey()  # Espero a que toquen una tecla antes de cerrar
+        except GameOver:
+            raise
         except Exception as e:
             print(f"Algo salió mal mostrando 'PERDISTE': {e}")
-        finally:
-            if Drawable._window and not Drawable._window.isClosed():
-                Drawable._window.close()  # Cierro la ventana al final
-            exit(0)  # Termino el programa pase lo que pase
+        if Drawable._window and not Drawable._window.isClosed():
+            Drawable._window.close()  # Cierro la ventana al final
+        exit(0)  # Termino el programa pase lo que pase
 
     @staticmethod
     def won():
@@ -60,12 +269,15 @@ class Drawable(object):
 
         try:
             # Escribo un mensaje divertido y lo centro en la pantalla
-            t = Text(Point(Config.WINDOW_WIDTH / 2 + 10, Config.WINDOW_HEIGHT / 2 + 10), 'Ganaste. No fue amor, pero cuenta')
+            graphics = _graphics()
+            t = graphics.Text(graphics.Point(Config.WINDOW_WIDTH / 2 + 10, Config.WINDOW_HEIGHT / 2 + 10), 'Ganaste. No fue amor, pero cuenta')
             t.setSize(36)  # Grande para celebrar
             t.setTextColor('green')  # Verde para la victoria
             t.draw(Drawable._window)  # Lo muestro en la ventana
+            Drawable.render()
             Drawable._window.update()  # Actualizo la pantalla
-            time.sleep(2)  # Dejo que se vea un par de segundos
+            if not Drawable.async_mode:
+                time.sleep(2)  # Dejo que se vea un par de segundos (el runtime asíncrono lo espera con await)
         except Exception as e:
             print(f"No pude mostrar 'GANASTE' por este error: {e}")
 
@@ -79,7 +291,8 @@ class Drawable(object):
             return None  # No dibujo si no hay ventana
 
         try:
-            text_item = Text(Point(x, y), message)  # Creo el texto en la posición que quiero
+            graphics = _graphics()
+            text_item = graphics.Text(graphics.Point(x, y), message)  # Creo el texto en la posición que quiero
             text_item.setSize(size)  # Le doy el tamaño que pedí
             text_item.setTextColor(color)  # Y el color que elegí
             text_item.draw(Drawable._window)  # Lo dibujo en mi ventana
@@ -91,70 +304,27 @@ class Drawable(object):
     @staticmethod
     def update_lives_display(lives_count):
         """
-        Actualizo el texto que muestra cuántas vidas me quedan.
+        Actualizo el texto que muestra cuántas vidas me quedan (se ve en el próximo render()).
         """
-        if not Drawable._window or Drawable._window.isClosed():
-            return  # No hago nada si la ventana no está
-
-        message = f"Vidas: {lives_count}"  # El mensaje con las vidas actuales
-        text_x = 55  # Donde quiero que aparezca en x
-        text_y = 15  # Donde quiero que aparezca en y
-
-        try:
-            if Drawable._lives_text_item:  # Si ya tengo un texto de vidas
-                if Drawable._lives_text_item.canvas and not Drawable._lives_text_item.canvas.isClosed():
-                    try:
-                        Drawable._lives_text_item.setText(message)  # Solo cambio el mensaje
-                    except:
-                        Drawable._lives_text_item.undraw()  # Si falla, lo borro
-                        Drawable._lives_text_item = Drawable.draw_text_utility(message, text_x, text_y, size=23, color='darkorange')
-                else:
-                    Drawable._lives_text_item = Drawable.draw_text_utility(message, text_x, text_y, size=23, color='darkorange')
-            else:
-                # Si no había texto, lo creo desde cero
-                Drawable._lives_text_item = Drawable.draw_text_utility(message, text_x, text_y, size=23, color='darkorange')
-
-            if Drawable._window.autoflush:
-                Drawable._window.update()  # Refresco la pantalla si está en modo automático
-        except Exception as e:
-            print(f"Error actualizando las vidas: {e}")
-            if Drawable._lives_text_item:
-                try:
-                    Drawable._lives_text_item.undraw()  # Borro el texto si algo falla
-                except:
-                    pass
-            Drawable._lives_text_item = None
+        Hud.set('lives', lives_count)
 
     @staticmethod
     def draw_coin_counter(coins):
         """
-        Muestro o actualizo el contador de monedas en la pantalla.
+        Muestro o actualizo el contador de monedas en la pantalla (en el próximo render()).
         """
-        if not Drawable._coin_counter_text:
-            # Si no existe el contador, lo creo
-            Drawable._coin_counter_text = Text(Point(80, 40), f"Monedas: {coins}")
-            Drawable._coin_counter_text.setSize(23)  # Tamaño grande para que se vea
-            Drawable._coin_counter_text.setTextColor('darkorange')  # Naranja para que combine
-            Drawable._coin_counter_text.draw(Drawable._window)  # Lo dibujo
-        else:
-            # Si ya existe, solo cambio el número
-            Drawable._coin_counter_text.setText(f"Monedas: {coins}")
+        Hud.set('coins', coins)
 
     def __init__(self, coords, img_path=None):
         """
         Creo un objeto que se puede dibujar, con una imagen si me dan una ruta.
         """
-        if img_path:
-            # Calculo dónde va a estar el centro de la imagen en la pantalla
-            screen_x = coords[0] * Config.CELL_SIZE + (Config.CELL_SIZE / 2) + 10
-            screen_y = coords[1] * Config.CELL_SIZE + (Config.CELL_SIZE / 2) + 10
-
-            try:
-                # Cargo la imagen desde la carpeta 'graphics'
-                self._img = Image(Point(screen_x, screen_y), os.path.join('graphics', img_path))
-            except Exception as e:
-                print(f"No pude cargar la imagen {img_path}: {e}")
-                self._img = None  # Si falla, no hay imagen
+        self._cx, self._cy = coords  # Celda lógica de la imagen; el lienzo se pone al día en render()
+        self._pending = False  # True si la celda cambió y render() todavía no ubicó la imagen
+        if img_path and not Drawable.headless:
+            # Uso el sprite compartido de la carpeta 'graphics'; si no se pudo cargar, no hay imagen
+            sprite = Drawable.sprite(img_path)
+            self._img = Sprite(sprite, *Drawable.center(*coords)) if sprite else None
         else:
             self._img = None  # Sin ruta, no hay imagen
 
@@ -163,33 +333,113 @@ class Drawable(object):
         Dibujo la imagen del objeto en la ventana si tengo una.
         """
         if self._img and Drawable._window and not Drawable._window.isClosed():
+            self._place()  # Si se movió mientras no estaba dibujada, la dibujo ya en su celda
+            self._pending = False
             try:
-                self._img.draw(Drawable._window)  # Pongo la imagen en la ventana
-            except GraphicsError as e:
-                if "Object currently drawn" in str(e):
-                    pass  # No me preocupo si ya está dibujada
-                else:
-                    print(f"Error gráfico dibujando {self._img}: {e}")
+                self._img.draw(Drawable._window)  # Pongo la imagen en la ventana (si ya estaba, no hace nada)
             except Exception as e:
                 print(f"Algo raro pasó dibujando {self._img}: {e}")
 
+    def lower_img(self):
+        """
+        Mando la imagen al fondo del lienzo (debajo de personajes y HUD) sin borrarla ni redibujarla.
+        """
+        if self._img and self._img.id and Drawable._window and not Drawable._window.isClosed():
+            Drawable._window.tag_lower(self._img.id)
+
     def move_img(self, dx, dy):
         """
-        Muevo la imagen del objeto según las celdas del juego.
+        Muevo la imagen del objeto según las celdas del juego. Durante el tick solo cambio su
+        celda lógica; el lienzo se actualiza una vez por frame en Drawable.render().
         """
-        if self._img and Drawable._window and not Drawable._window.isClosed():
-            try:
-                # Muevo la imagen usando el tamaño de las celdas
-                self._img.move(dx * Config.CELL_SIZE, dy * Config.CELL_SIZE)
-            except Exception as e:
-                print(f"No pude mover la imagen: {e}")
+        if self._img:
+            self._cx += dx  # Dos enteros chicos en lugar de una tupla nueva por paso
+            self._cy += dy
+            self._pending = True
+            Drawable._moved.add(self)  # Si ya estaba, no reserva nada
+
+    def _place(self):
+        # Pongo la imagen (dibujada o no) en el centro de su celda lógica, sacado de las tablas precalculadas
+        try:
+            return self._img.place(Drawable._screen_x[self._cx], Drawable._screen_y[self._cy])
+        except Exception as e:
+            print(f"No pude mover la imagen: {e}")
+            return False
 
     def undraw(self):
         """
         Borro la imagen de la ventana si existe.
         """
+        Drawable._moved.discard(self)  # Si vuelve a dibujarse, draw() la ubica en su celda
         if self._img and Drawable._window and not Drawable._window.isClosed():
             try:
                 self._img.undraw()  # Quito la imagen de la pantalla
             except Exception as e:
-                print(f"Error borrando la imagen: {e}")
\ No newline at end of file
+                print(f"Error borrando la imagen: {e}")
+
+def render_benchmark(count=500, frames=300, level=1):
+    """
+    Mide el costo de mover `count` imágenes un paso por frame durante `frames` frames, con
+    Sprite (Drawable.move_img + render, como el juego) y con graphics.Image (GraphicsObject.move,
+    el camino genérico de antes). Para cada una informa microsegundos por frame y, con tracemalloc,
+    el pico de memoria reservada por frame por encima de lo que ya estaba y los bloques que quedan
+    reservados al final. Necesita ventana (abre la del nivel `level`).
+    """
+    import tracemalloc
+    import main  # Import diferido: main importa este módulo
+    main.load_level(level)
+    window = Drawable._window
+    graphics = _graphics()
+    width = Config.LEVEL_WIDTH
+    sprites = [Drawable((slot % (width - 1), slot // (width - 1) % Config.LEVEL_HEIGHT), 't_red.png')
+               for slot in range(count)]
+    images = [graphics.Image(graphics.Point(*Drawable.center(0, 0)), Drawable.sprite('t_red.png'))
+              for _ in range(count)]
+    for sprite in sprites:
+        sprite.draw()
+    for image in images:
+        image.draw(window)
+    window.autoflush = False  # Que Image.move() no llame a update() en cada paso: medimos solo el movimiento
+
+    def sprite_frame(step):
+        for sprite in sprites:
+            sprite.move_img(step, 0)
+        Drawable.render()
+
+    def image_frame(step):
+        for image in images:
+            image.move(step * Config.CELL_SIZE, 0)
+
+    for name, frame in (('Sprite', sprite_frame), ('graphics.Image', image_frame)):
+        frame(1)
+        frame(-1)
+        start = time.perf_counter()
+        for tick in range(frames):
+            frame(1 if tick % 2 == 0 else -1)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        frame(1)
+        frame(-1)
+        blocks = tracemalloc.take_snapshot()
+        peak = 0
+        for tick in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            frame(1 if tick % 2 == 0 else -1)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        kept = sum(stat.count_diff for stat in tracemalloc.take_snapshot().compare_to(blocks, 'filename'))
+        tracemalloc.stop()
+        print(f"{name:>15}: {count} imágenes, {elapsed / frames * 1e6:8.1f} µs/frame, "
+              f"pico {peak} bytes/frame, {kept} bloques retenidos tras {frames} frames")
+    window.autoflush = True
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Mide tiempo y memoria reservada al mover imágenes por frame.')
+    parser.add_argument('--count', type=int, default=500, help='Imágenes a mover')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--level', type=int, default=1)
+    options = parser.parse_args()
+    import drawable  # Uso el módulo importado (el mismo Drawable que ven main y los personajes), no este __main__
+    drawable.render_benchmark(options.count, options.frames, options.level)
@@ -9,14 +9,15 @@ class Event:
     _frame = 0   # Contador del frame actual
 
     @staticmethod
-    def _enqueue(obj):
+    def _enqueue(obj, frames=None):
         """
         Agrega un evento a la cola para ser ejecutado en un frame futuro.
 
         :param obj: Instancia de Event a encolar.
+        :param frames: Delay en frames; por defecto, el del evento.
         """
         # Calcula el frame en el que el evento debe ejecutarse sumando el frame actual y el delay en frames
-        target_frame = Event._frame + obj.frames
+        target_frame = Event._frame + (obj.frames if frames is None else frames)
         if target_frame in Event._queue:
             # Si ya hay eventos para ese frame, agrega el nuevo evento a la lista
             Event._queue[target_frame].append(obj)
@@ -42,6 +43,14 @@ class Event:
         # Avanza al siguiente frame
         Event._frame += 1
 
+    @staticmethod
+    def reset():
+        """
+        Vacía la cola de eventos pendientes. Se usa al cargar un nivel para que
+        ningún evento del nivel anterior (p.ej. un relleno de hoyo) se dispare en el nuevo.
+        """
+        Event._queue = {}
+
     @staticmethod
     def delete(event):
         """
@@ -55,7 +64,7 @@ class Event:
                 # Si encuentra el evento, lo elimina de la lista
                 event_list.remove(event)
 
-    def __init__(self, func, frames, args=[], recurring=None):
+    def __init__(self, func, frames, args=[], recurring=None, delay=None):
         """
         Inicializa un nuevo evento.
 
@@ -65,6 +74,8 @@ class Event:
         :param recurring: Si es True, el evento se repetirá indefinidamente.
                           Si es un entero, especifica el número de repeticiones.
                           Por defecto, None (no recurrente).
+        :param delay: Frames hasta la primera ejecución, si debe ser distinto de `frames`
+                      (p.ej. para desfasar eventos recurrentes que se crean juntos).
         """
         self.func = func          # Función a llamar
         self.args = args          # Argumentos para la función
@@ -75,7 +86,7 @@ class Event:
         else:
             self.recurring = None
         # Agrega el evento a la cola inmediatamente
-        Event._enqueue(self)
+        Event._enqueue(self, delay)
 
     def execute(self):
         """
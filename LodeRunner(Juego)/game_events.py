@@ -0,0 +1,43 @@
+# Archivo: game_events.py
+
+class GameEvents:
+    """
+    Bus de eventos del juego. Los sistemas se suscriben a un tipo de evento y son avisados
+    en el momento en que ocurre, en lugar de revisar el estado en cada frame.
+    A diferencia de Event (event.py), aquí no hay demora: emit() llama a los suscriptores ya.
+    """
+
+    GOLD_TAKEN = 'gold_taken'                  # args: la moneda tomada
+    ALL_GOLD_COLLECTED = 'all_gold_collected'  # sin args: se tomó la última moneda del nivel
+    TILE_DUG = 'tile_dug'                      # args: el tile cavado
+    TILE_REFILLED = 'tile_refilled'            # args: el tile que se volvió a llenar
+    CHARACTER_DIED = 'character_died'          # args: el personaje (Player que pierde una vida o Baddie)
+    PLAYER_RESPAWNED = 'player_respawned'      # args: el jugador, ya de vuelta en su posición inicial
+    TERRAIN_CHANGED = 'terrain_changed'        # args: versión del terreno y celdas (índices) que cambiaron,
+                                               #       o None si cambió toda la grilla (carga de nivel)
+
+    _subscribers = {}  # Tipo de evento -> lista de funciones suscritas
+
+    @staticmethod
+    def subscribe(kind, func):
+        """
+        Suscribe `func` al evento `kind`; se llamará con los argumentos del evento.
+        """
+        GameEvents._subscribers.setdefault(kind, []).append(func)
+
+    @staticmethod
+    def unsubscribe(kind, func):
+        """
+        Quita la suscripción de `func` al evento `kind`, si existía.
+        """
+        subscribers = GameEvents._subscribers.get(kind, [])
+        if func in subscribers:
+            subscribers.remove(func)
+
+    @staticmethod
+    def emit(kind, *args):
+        """
+        Avisa a todos los suscriptores de `kind`, en el orden en que se suscribieron.
+        """
+        for func in list(GameEvents._subscribers.get(kind, ())):
+            func(*args)
@@ -1,6 +1,8 @@
 # graphics.py
 
 import time, os, sys  # Importa módulos básicos: 'time' para pausas, 'os' para operaciones del sistema y 'sys' para compatibilidad.
+import zlib, struct, base64  # Para armar PNG en memoria (photo_from_rgba) y pasárselos a Tk de una vez.
+import operator, itertools  # Para recuperar el alfa en toBytes con map sobre canales enteros, sin bucles por píxel.
 
 try:  # Intenta importar 'tkinter' según la versión de Python (2.x o 3.x).
    import tkinter as tk  # Para Python 3.x, usa 'tkinter'.
@@ -19,11 +21,18 @@ UNSUPPORTED_METHOD = "Object doesn't support operation"  # Error para métodos n
 BAD_OPTION = "Illegal option value"  # Error por valores de opción inválidos.
 DEAD_THREAD = "Graphics thread quit unexpectedly"  # Error si el hilo gráfico termina inesperadamente.
 
-_root = tk.Tk()  # Crea la ventana raíz de Tkinter, base para todas las ventanas gráficas.
-_root.withdraw()  # Oculta la ventana raíz para que no sea visible al usuario.
+_root = None  # Ventana raíz de Tkinter; se crea recién cuando hace falta (ver _get_root).
+
+def _get_root():  # Devuelve la ventana raíz, creándola la primera vez que se necesita.
+    """Create the hidden Tk root lazily so importing this module never starts Tk"""
+    global _root
+    if _root is None:  # Solo la primera vez...
+        _root = tk.Tk()  # Crea la ventana raíz de Tkinter, base para todas las ventanas gráficas.
+        _root.withdraw()  # Oculta la ventana raíz para que no sea visible al usuario.
+    return _root
 
 def update():  # Función global para actualizar la interfaz gráfica.
-    _root.update()  # Llama al método 'update' de Tkinter para refrescar la ventana raíz.
+    _get_root().update()  # Llama al método 'update' de Tkinter para refrescar la ventana raíz.
 
         
 class GraphWin(tk.Canvas):  # Clase para crear una ventana gráfica, hereda de 'tk.Canvas'.
@@ -31,7 +40,7 @@ class GraphWin(tk.Canvas):  # Clase para crear una ventana gráfica, hereda de '
 
 
     def __init__(self, title="Graphics Window", width=200, height=200, autoflush=True):  # Constructor de la ventana.
-        master = tk.Toplevel(_root)  # Crea una ventana secundaria (toplevel) sobre la raíz.
+        master = tk.Toplevel(_get_root())  # Crea una ventana secundaria (toplevel) sobre la raíz.
         master.protocol("WM_DELETE_WINDOW", self.close)  # Asocia el cierre de la ventana al método 'close'.
         tk.Canvas.__init__(self, master, width=width, height=height)  # Inicializa el lienzo con dimensiones dadas.
         self.master.title(title)  # Establece el título de la ventana.
@@ -191,6 +200,32 @@ class GraphWin(tk.Canvas):  # Clase para crear una ventana gráfica, hereda de '
     def delItem(self, item):  # Elimina un objeto gráfico de la lista de ítems.
         self.items.remove(item)  # Remueve el ítem de la lista.
 
+    def clear(self, keep=()):  # Borra de una sola vez todos los objetos salvo los de 'keep'.
+        """Delete every drawn object except those in keep with one canvas call"""
+        self.__checkOpen()  # Verifica que la ventana esté abierta.
+        kept = [item for item in self.items if item in keep]  # Objetos que sobreviven (p.ej. el HUD).
+        self.addtag_all("_clear")  # Marca todos los ítems del lienzo...
+        for item in kept:
+            self.dtag(item.id, "_clear")  # ...menos los que se conservan.
+        self.delete("_clear")  # Un único delete para todo lo demás.
+        for item in self.items:
+            if item not in kept:
+                if isinstance(item, Image):
+                    Image.imageCache.pop(item.imageId, None)  # Suelta la referencia como haría 'undraw'.
+                item.canvas = None  # El objeto queda sin dibujar y se puede volver a dibujar.
+                item.id = None
+        self.items = kept  # Solo quedan los objetos conservados.
+        self.__autoflush()  # Actualiza la ventana si 'autoflush' está activado.
+
+    def resize(self, width, height):  # Cambia el tamaño del lienzo sin recrear la ventana.
+        """Resize the canvas (and its window) in place"""
+        self.__checkOpen()  # Verifica que la ventana esté abierta.
+        if (width, height) != (self.width, self.height):  # Solo si realmente cambia.
+            self.config(width=width, height=height)  # La ventana se ajusta sola al lienzo empaquetado.
+            self.width = width  # Actualiza el ancho almacenado.
+            self.height = height  # Actualiza la altura almacenada.
+        self.__autoflush()  # Actualiza la ventana si 'autoflush' está activado.
+
     def redraw(self):  # Redibuja todos los objetos en la ventana.
         for item in self.items[:]:  # Itera sobre una copia de la lista de ítems.
             item.undraw()  # Borra el ítem actual.
@@ -595,7 +630,7 @@ class Entry(GraphicsObject):
         GraphicsObject.__init__(self, [])
         self.anchor = p.clone()
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = tk.StringVar(_get_root())
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -691,11 +726,13 @@ class Image(GraphicsObject):
         self.anchor = p.clone()
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
-        if len(pixmap) == 1:  # Si se pasa un nombre de archivo
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+        if len(pixmap) == 1 and isinstance(pixmap[0], tk.PhotoImage):  # Si se pasa un PhotoImage ya cargado
+            self.img = pixmap[0]  # Se comparte: varias imágenes pueden usar el mismo PhotoImage
+        elif len(pixmap) == 1:  # Si se pasa un nombre de archivo
+            self.img = tk.PhotoImage(file=pixmap[0], master=_get_root())
         else:  # Si se pasan ancho y alto para crear imagen en blanco
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = tk.PhotoImage(master=_get_root(), width=width, height=height)
 
     def _draw(self, canvas, options):
         # Dibuja la imagen en las coordenadas convertidas
@@ -753,6 +790,79 @@ class Image(GraphicsObject):
         """Establece el píxel (x, y) al color dado en formato hexadecimal o nombre."""
         self.img.put("{" + color + "}", (x, y))
 
+    def _region(self, x, y, width, height):
+        # Completa el ancho y alto que falten hasta el borde de la imagen
+        if width is None:
+            width = self.getWidth() - x
+        if height is None:
+            height = self.getHeight() - y
+        return width, height
+
+    def _rgbRows(self, x, y, width, height, background=None):
+        # Bytes RGB de cada fila de la región, pidiéndole todo a Tk en un solo 'data'
+        options = ('-background', background) if background else ()
+        rows = self.img.tk.call(self.img.name, 'data', *options, '-from', x, y, x + width, y + height)
+        split = self.img.tk.splitlist
+        return [bytes.fromhex(''.join(color[1:] for color in split(row))) for row in split(rows)]
+
+    def getPixels(self, x=0, y=0, width=None, height=None):
+        """
+        Retorna los píxeles de la región (toda la imagen si no se indica) como una lista de filas,
+        cada una una lista de tuplas (r, g, b). A diferencia de getPixel, es una sola llamada a Tk.
+        """
+        width, height = self._region(x, y, width, height)
+        return [list(zip(row[0::3], row[1::3], row[2::3])) for row in self._rgbRows(x, y, width, height)]
+
+    def putPixels(self, rows, x=0, y=0):
+        """
+        Pinta a partir de (x, y) una lista de filas de colores (cadenas como "#ff8000" o tuplas
+        (r, g, b)) con una sola llamada a Tk, en lugar de un setPixel por píxel.
+        Los píxeles quedan opacos; para conservar transparencia usar photo_from_rgba.
+        """
+        data = tuple(' '.join(color if isinstance(color, str) else "#%02x%02x%02x" % tuple(color)
+                              for color in row) for row in rows)
+        if data:
+            self.img.put(data, to=(x, y))
+
+    _unpremultiply = None  # Tabla de toBytes: índice alfa * 256 + color sobre negro -> color original
+
+    def toBytes(self):
+        """
+        Retorna la imagen como bytes RGBA (4 por píxel, fila por fila), lista para transformarla
+        en bloque (o para numpy.frombuffer) y volver con photo_from_rgba.
+        Tk 8.6 no da el canal alfa con 'data', así que pido la imagen sobre fondo negro y sobre
+        fondo blanco: donde difieren, el píxel es (parcialmente) transparente. Todo se calcula
+        por canales enteros (slices, map y translate), sin recorrer los píxeles en Python.
+        El alfa es exacto si es 0 o 255 (el caso de los sprites). Con alfa intermedio es
+        aproximado: Tk redondea los colores compuestos a enteros, así que el alfa puede errar en
+        una unidad y el color, que se recupera dividiendo por el alfa (división entera, recortada
+        a 255), en hasta 255 / alfa unidades.
+        """
+        width, height = self.getWidth(), self.getHeight()
+        black = b''.join(self._rgbRows(0, 0, width, height, '#000000'))
+        white = b''.join(self._rgbRows(0, 0, width, height, '#ffffff'))
+        out = bytearray(b'\xff' * (width * height * 4))
+        if black == white:  # Sin transparencia: alfa 255 en todos
+            out[0::4], out[1::4], out[2::4] = black[0::3], black[1::3], black[2::3]
+            return bytes(out)
+        # Sobre negro c = a*p, sobre blanco c = a*p + (1-a)*255: la diferencia da el alfa
+        diffs = [map(operator.sub, white[channel::3], black[channel::3]) for channel in range(3)]
+        alpha = bytes(map(max, *diffs, itertools.repeat(0))).translate(bytes(range(255, -1, -1)))
+        out[3::4] = alpha
+        if not alpha.translate(None, b'\x00\xff'):
+            # Alfa de 1 bit: sobre negro los opacos tienen su color y los transparentes quedan en 0
+            out[0::4], out[1::4], out[2::4] = black[0::3], black[1::3], black[2::3]
+            return bytes(out)
+        table = Image._unpremultiply
+        if table is None:
+            table = Image._unpremultiply = bytes(min(255, color * 255 // a) if a else 0
+                                                 for a in range(256) for color in range(256))
+        for channel in range(3):
+            # Índice en la tabla: alfa * 256 + color del canal sobre negro
+            keys = map(operator.or_, map(operator.lshift, alpha, itertools.repeat(8)), black[channel::3])
+            out[channel::4] = bytes(map(table.__getitem__, keys))
+        return bytes(out)
+
     def save(self, filename):
         """
         Guarda la imagen en disco. El formato se deduce de la extensión del nombre de archivo.
@@ -763,6 +873,29 @@ class Image(GraphicsObject):
         self.img.write(filename, format=ext)
 
 
+def rgba_to_png(width, height, data):
+    """
+    Codifica bytes RGBA (4 por píxel, fila por fila) como PNG sin pérdida, sin depender de PIL.
+    """
+    if len(data) != width * height * 4:
+        raise GraphicsError("Se esperaban %d bytes RGBA" % (width * height * 4))
+    stride = width * 4
+    raw = b''.join(b'\x00' + bytes(data[row * stride:(row + 1) * stride]) for row in range(height))  # Filtro 0 por fila
+
+    def chunk(kind, payload):
+        return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload) & 0xffffffff)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 1)) + chunk(b'IEND', b''))
+
+
+def photo_from_rgba(width, height, data):
+    """
+    Crea un PhotoImage a partir de bytes RGBA (p.ej. los de Image.toBytes ya transformados),
+    con transparencia, en una sola llamada a Tk: se le pasan como un PNG en memoria.
+    """
+    return tk.PhotoImage(data=base64.b64encode(rgba_to_png(width, height, data)), master=_get_root())
+
+
 def color_rgb(r, g, b):
     """
     Convierte tres valores enteros (0-255) de rojo, verde y azul a una cadena
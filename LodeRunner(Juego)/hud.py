@@ -0,0 +1,129 @@
+# Archivo: hud.py
+
+
+class HudField(object):
+    """
+    Un texto del HUD puesto directo en el lienzo, con el mismo trato que drawable.Sprite: tiene
+    canvas, id, draw() y undraw(), así GraphWin.clear(keep=...) lo conserva entre niveles y
+    GraphWin.redraw() lo redibuja. El ítem se crea una vez por ventana y después solo se le
+    cambia el texto.
+    """
+    __slots__ = ('template', 'x', 'y', 'font', 'color', 'value', 'text', 'dirty', 'canvas', 'id')
+
+    def __init__(self, template, x, y, size, color):
+        self.template = template  # Formato del texto, p.ej. "Vidas: {}"
+        self.x = x
+        self.y = y
+        self.font = ('helvetica', size, 'normal')  # La misma fuente que graphics.Text
+        self.color = color
+        self.value = None  # Último valor recibido (None: todavía no hay nada que mostrar)
+        self.text = None  # Texto que tiene el ítem en el lienzo
+        self.dirty = False  # True si el valor cambió y Hud.flush() todavía no lo llevó al lienzo
+        self.canvas = None  # GraphWin donde está dibujado, o None
+        self.id = None  # Id del ítem en el lienzo
+
+    def draw(self, window):
+        """
+        Dibuja el texto en `window`, salvo que ya esté dibujado en una ventana abierta.
+        """
+        if self.canvas is not None and not self.canvas.isClosed():
+            return
+        self.canvas = window
+        self.id = window.create_text(self.x, self.y, text=self.text or '', font=self.font, fill=self.color)
+        window.addItem(self)
+
+    def undraw(self):
+        """
+        Saca el texto del lienzo (si estaba dibujado).
+        """
+        canvas = self.canvas
+        if canvas is None:
+            return
+        if not canvas.isClosed():
+            canvas.delete(self.id)
+            canvas.delItem(self)
+        self.canvas = None
+        self.id = None
+
+
+class Hud:
+    """
+    HUD del juego (vidas, monedas y lo que se agregue con add(), p.ej. nivel, tiempo o FPS).
+    set() solo guarda el valor: si es igual al anterior no hace nada, y si cambió marca el campo.
+    Los cambios se llevan al lienzo todos juntos en flush(), que Drawable.render() llama una vez
+    por frame, con un itemconfigure() por texto que realmente cambió y sin update() propio.
+    Así un campo que se actualiza en cada tick (un reloj, los FPS) cuesta una comparación.
+    """
+    fields = {}  # Nombre -> HudField, en el orden en que se agregaron
+    _dirty = []  # Campos con un valor nuevo que flush() todavía no mostró
+    updates = 0  # Textos cambiados en el lienzo en total (para medir el trabajo de Tk)
+
+    @staticmethod
+    def add(name, template, x, y, size=23, color='darkorange'):
+        """
+        Agrega el campo `name`, que se muestra como `template.format(valor)` centrado en (x, y).
+        No aparece hasta el primer set().
+        """
+        Hud.fields[name] = HudField(template, x, y, size, color)
+
+    @staticmethod
+    def set(name, value):
+        """
+        Nuevo valor del campo `name`. No toca Tk: si cambió, flush() lo muestra en el próximo frame.
+        """
+        field = Hud.fields[name]
+        if value == field.value:
+            return
+        field.value = value
+        if not field.dirty:
+            field.dirty = True
+            Hud._dirty.append(field)
+
+    @staticmethod
+    def flush(window):
+        """
+        Lleva a `window` los campos que cambiaron desde el último flush. Devuelve cuántos textos
+        cambiaron en el lienzo. Sin ventana abierta no hace nada y los cambios esperan.
+        """
+        if not Hud._dirty or window is None or window.isClosed():
+            return 0
+        count = 0
+        for field in Hud._dirty:
+            field.dirty = False
+            text = field.template.format(field.value)
+            if field.canvas is window and text == field.text:
+                continue  # Volvió al valor que ya se ve
+            field.text = text
+            if field.canvas is window:
+                window.itemconfigure(field.id, text=text)
+            else:
+                field.undraw()  # Si estaba en una ventana anterior, ya no sirve
+                field.draw(window)
+            count += 1
+        Hud._dirty.clear()
+        Hud.updates += count
+        return count
+
+    @staticmethod
+    def attach(window):
+        """
+        Hay una ventana nueva: los campos que ya tenían valor se vuelven a dibujar en el próximo flush().
+        """
+        for field in Hud.fields.values():
+            field.canvas = None  # Su ítem era de la ventana anterior
+            field.id = None
+            if field.value is not None and not field.dirty:
+                field.dirty = True
+                Hud._dirty.append(field)
+
+    @staticmethod
+    def items():
+        """
+        Los campos dibujados, para conservarlos al limpiar la ventana (GraphWin.clear(keep=...)).
+        """
+        return [field for field in Hud.fields.values() if field.canvas is not None]
+
+
+# Campos del juego, en el mismo lugar y con el mismo aspecto que los textos que reemplazan
+Hud.add('lives', 'Vidas: {}', 55, 15)
+Hud.add('coins', 'Monedas: {}', 80, 40)
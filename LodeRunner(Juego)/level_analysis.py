@@ -0,0 +1,177 @@
+# Archivo: level_analysis.py
+
+import sys, time  # sys para los argumentos, time para medir cuántos niveles por segundo se validan
+from level_data import (LevelData, PASSABLE, TAKABLE, STANDABLE, CLIMBABLE, GRABBABLE, DIGGABLE,
+                        MOVES, Components, strong_components)
+
+
+def player_moves(props, width, height):
+    """
+    Para cada celda, las celdas a las que el jugador puede pasar en un paso, con las mismas reglas
+    que Character.move/fall y Player.dig:
+    - si no tiene dónde pararse ni de qué agarrarse, el único paso es caer a la celda de abajo;
+    - si no, moverse a una vecina transitable (subir solo desde escalera o cuerda);
+    - y cavar en diagonal hacia abajo un ladrillo y meterse en el hoyo (sin contar el tiempo que
+      tarda en rellenarse, así que con hoyos el análisis es optimista).
+    """
+    size = width * height
+    moves = [()] * size
+    for index in range(size):
+        bits = props[index]
+        x, y = index % width, index // width
+        below = index + width
+        if y + 1 < height and not props[below] & STANDABLE and not bits & GRABBABLE:
+            moves[index] = (below,)  # Cae: no hay otra opción
+            continue
+        targets = []
+        for dx, dy in MOVES:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            if dy < 0 and not bits & (CLIMBABLE | GRABBABLE):
+                continue  # Solo se sube desde una escalera o cuerda
+            target = nx + ny * width
+            if props[target] & PASSABLE:
+                targets.append(target)
+        if y + 1 < height and not bits & (CLIMBABLE | GRABBABLE):
+            for dx in (-1, 1):  # Cavar a la izquierda o a la derecha y entrar al hoyo
+                if 0 <= x + dx < width and props[below + dx] & DIGGABLE and props[index + dx] & PASSABLE:
+                    targets.append(below + dx)
+        moves[index] = tuple(targets)
+    return moves
+
+
+def visit(moves, sources):
+    """
+    Marca (bytearray de 0/1) todas las celdas por las que se puede pasar saliendo de `sources`.
+    """
+    seen = bytearray(len(moves))
+    stack = []
+    for source in sources:
+        if not seen[source]:
+            seen[source] = 1
+            stack.append(source)
+    while stack:
+        for target in moves[stack.pop()]:
+            if not seen[target]:
+                seen[target] = 1
+                stack.append(target)
+    return seen
+
+
+class LevelAnalysis:
+    """
+    Análisis estático de un nivel, hecho una vez al leerlo (dentro de LevelData, así que también
+    en el hilo de precarga). Responde lo que antes solo se descubría jugando:
+    - qué celdas puede pisar el jugador desde su posición inicial (`reachable`),
+    - qué monedas no se pueden juntar (y entonces las escaleras ocultas nunca aparecen),
+    - si se puede llegar a la fila 0 (Player.at_exit), antes o después de revelar las escaleras,
+    - las zonas (`regions`): componentes fuertemente conexas del grafo de movimientos del jugador
+      (level_data.Components), con las que `can_reach(a, b)` contesta si se puede ir de una celda a otra.
+    Los hoyos se cuentan de forma optimista, así que lo que se marca como problema lo es seguro.
+    Solo usa la grilla de bits, nada de Tk ni de objetos Tile.
+    """
+
+    def __init__(self, rows, characters=()):
+        initial, shown = LevelData._tile_table(), LevelData._shown_bits
+        self.width = len(rows[-1]) if rows else 0
+        self.height = len(rows)
+        self.problems = []  # Descripciones de lo que anda mal, vacía si el nivel se puede ganar
+        cells = [value for row in rows for value in row]
+        if len(cells) != self.width * self.height:
+            self.problems.append("las filas no tienen todas el mismo largo")
+            self.start = None
+            self.reachable = self.reachable_after_reveal = bytearray(len(cells))
+            self.regions = Components([-1] * len(cells), [0], [])
+            self.uncollectable_gold, self.exit_reachable = [], False
+            return
+
+        empty = initial[None]
+        props = bytearray(initial.get(value, empty) for value in cells)
+        # Con las escaleras ocultas ya visibles y las monedas tomadas (Tile.clear las vuelve Empty)
+        revealed = bytearray(empty if props[index] & TAKABLE else shown.get(value, empty)
+                             for index, value in enumerate(cells))
+
+        players = [col + row * self.width for code, col, row in characters if code == 'P']
+        self.start = players[0] if players else None
+        if self.start is None:
+            self.problems.append("no hay jugador ('P')")
+
+        moves = player_moves(props, self.width, self.height)
+        self.regions = strong_components(moves)
+        self.reachable = visit(moves, [self.start] if self.start is not None else [])
+
+        gold = [index for index in range(len(props)) if props[index] & TAKABLE]
+        self.uncollectable_gold = [self.coord(index) for index in gold if not self.reachable[index]]
+        after, after_props = self.reachable, props  # Si falta oro, las escaleras nunca aparecen
+        if not self.uncollectable_gold and self.start is not None:
+            # Sin oro aparecen al cargar; si no, al juntar la última moneda, estando en cualquier lugar alcanzable
+            after = visit(player_moves(revealed, self.width, self.height),
+                          [index for index in range(len(props)) if self.reachable[index]])
+            after_props = revealed
+        self.reachable_after_reveal = after
+        # Salida: una celda de la fila 0 donde el jugador quede parado (si cae, at_exit() no llega a verlo),
+        # antes de revelar las escaleras o después
+        width = self.width
+        # (en un nivel de una sola fila no hay fila de abajo: toda celda alcanzable es salida)
+        self.exit_reachable = any(seen[x] and (self.height == 1 or bits[x + width] & STANDABLE
+                                               or bits[x] & GRABBABLE)
+                                  for seen, bits in ((self.reachable, props), (after, after_props))
+                                  for x in range(width))
+
+        for x, y in self.uncollectable_gold:
+            self.problems.append(f"la moneda en ({x},{y}) no se puede juntar")
+        if self.start is not None and not self.exit_reachable:
+            self.problems.append("no se puede llegar a la salida (fila 0)")
+
+    @staticmethod
+    def restore(**fields):
+        """
+        Rearma un análisis ya hecho a partir de sus campos (p.ej. leídos de LevelCache), sin recalcularlo.
+        """
+        analysis = LevelAnalysis.__new__(LevelAnalysis)
+        analysis.__dict__.update(fields)
+        return analysis
+
+    def coord(self, index):
+        # (x, y) de la celda `index` en la grilla de este nivel
+        return index % self.width, index // self.width
+
+    def ok(self):
+        """
+        True si el análisis no encontró problemas.
+        """
+        return not self.problems
+
+    def can_reach(self, start, goal):
+        """
+        Dice si el jugador puede ir de la celda `start` a la celda `goal` (índices) en el terreno
+        inicial, usando las zonas precalculadas (ver Components.reaches).
+        """
+        return self.regions.reaches(start, goal)
+
+
+def validate(paths):
+    """
+    Analiza cada CSV de `paths`, imprime sus problemas y devuelve cuántos niveles tienen alguno.
+    """
+    import csv
+    broken = 0
+    start = time.perf_counter()
+    for path in paths:
+        with open(path) as file_data:
+            rows = [row for row in csv.reader(file_data)]
+        characters = [(value, col, row_num) for row_num, row in enumerate(rows)
+                      for col, value in enumerate(row) if value == 'P']
+        analysis = LevelAnalysis(rows, characters)
+        if not analysis.ok():
+            broken += 1
+            print(f"{path}: {'; '.join(analysis.problems)}")
+    elapsed = time.perf_counter() - start
+    rate = len(paths) / elapsed if elapsed > 0 else float('inf')
+    print(f"{len(paths)} niveles analizados en {elapsed * 1000:.1f} ms ({rate:.0f} por segundo), {broken} con problemas")
+    return broken
+
+
+if __name__ == '__main__':
+    sys.exit(1 if validate(sys.argv[1:]) else 0)
@@ -0,0 +1,253 @@
+# Archivo: level_cache.py
+
+import os, sys, json, glob  # os/glob para los archivos del caché, sys para el orden de bytes, json para el encabezado
+import mmap, struct, hashlib, tempfile  # Lectura mapeada, formato binario, clave por contenido, escritura atómica
+from array import array  # Secciones de enteros del archivo
+
+MAGIC = b'LRLC'  # Primeros bytes de todo archivo del caché
+PREFIX = struct.Struct('<4sII')  # MAGIC, versión de formato, largo del encabezado JSON
+ALIGN = 8  # Cada sección empieza alineada, para poder leer sus enteros directamente del mapa
+
+
+def _ints(values):
+    # Bytes de una secuencia de enteros, en el formato nativo que luego lee memoryview.cast('i')
+    return array('i', values).tobytes()
+
+
+class CacheMapping:
+    """
+    Dueño del mmap de un archivo del caché y de las vistas (memoryview) que se sacaron de él.
+    close() suelta las vistas y cierra el mapa: mientras un archivo está mapeado, en Windows no
+    se lo puede reemplazar ni borrar. Lo cierra LevelCache.load si rechaza el archivo, y si no
+    el LevelData que lo usa, cuando deja de existir.
+    """
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+        self._views = []
+        self.closed = False
+
+    def section(self, offset, size, typecode):
+        """
+        Vista de `size` bytes desde `offset`, leída como enteros de tipo `typecode`, sin copiar.
+        """
+        base = memoryview(self.mapped)
+        self._views.append(base)
+        view = base[offset:offset + size].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.mapped.close()
+
+
+class LevelCache:
+    """
+    Caché en disco de los datos derivados de cada nivel (grilla de códigos, personajes, grilla de
+    bits, grafo de navegación con sus componentes y el LevelAnalysis), para no recalcularlos en
+    cada arranque. Un archivo por nivel en DIR (junto a levels/), con nombre según la clave:
+    un hash del CSV, de las tablas de bits de tiles.py y de FORMAT_VERSION. Si cambia cualquiera
+    de las tres, la clave es otra y el archivo viejo simplemente no se encuentra (y se borra al
+    guardar el nuevo).
+
+    - Se escribe en un archivo temporal que después se renombra, así nunca queda uno a medias.
+    - Se lee con mmap: las componentes del grafo de navegación se usan directamente como
+      memoryview del mapa, sin copiarlas (Components las lee así). El mapa es de un CacheMapping
+      que load() devuelve en el campo '_mapping' y que cierra el LevelData dueño de esos datos.
+      El análisis (LevelAnalysis) se copia, para que siga valiendo aunque el LevelData ya no esté.
+    - Cualquier problema (sin permisos, archivo roto) hace que se recalcule como antes.
+
+    Se desactiva con LODERUNNER_LEVEL_CACHE=0.
+    """
+    FORMAT_VERSION = 2  # Subirla cuando cambie el formato o lo que se guarda
+    DIR = 'cache'
+    enabled = os.environ.get('LODERUNNER_LEVEL_CACHE', '1') not in ('', '0')
+    hits = 0  # Niveles leídos del caché
+    misses = 0  # Niveles calculados (y guardados) por no estar en el caché
+
+    @staticmethod
+    def key(raw, tile_bits, shown_bits):
+        """
+        Clave de un nivel: hash de los bytes del CSV `raw` junto con todo lo que cambia el
+        resultado sin cambiar el CSV (tablas de bits de los tiles, formato, orden de bytes).
+        """
+        digest = hashlib.sha256()
+        tables = sorted((str(code), bits, shown_bits.get(code)) for code, bits in tile_bits.items())
+        digest.update(repr((LevelCache.FORMAT_VERSION, sys.byteorder, array('i').itemsize, tables)).encode())
+        digest.update(raw)
+        return digest.hexdigest()
+
+    @staticmethod
+    def path(name, key):
+        """
+        Archivo del caché para el nivel `name` (p.ej. 'level1') con la clave `key`.
+        """
+        return os.path.join(LevelCache.DIR, f'{name}-{key[:32]}.bin')
+
+    @staticmethod
+    def load(name, key):
+        """
+        Devuelve los campos guardados del nivel (diccionario, ver store()) o None si no están
+        en el caché o no se pueden leer. Si los devuelve, el campo '_mapping' es el CacheMapping
+        del que dependen las secciones grandes: quien se queda con los campos debe cerrarlo.
+        """
+        if not LevelCache.enabled:
+            return None
+        owner = None
+        try:
+            with open(LevelCache.path(name, key), 'rb') as cache_file:
+                owner = CacheMapping(mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ))
+            mapped = owner.mapped
+            magic, version, header_size = PREFIX.unpack_from(mapped)
+            if magic != MAGIC or version != LevelCache.FORMAT_VERSION:
+                owner.close()
+                return None
+            header = json.loads(mapped[PREFIX.size:PREFIX.size + header_size])
+            if header['key'] != key:
+                owner.close()
+                return None
+            sections = {}
+            for section, (offset, size, typecode) in header['sections'].items():
+                if offset + size > len(mapped):
+                    owner.close()
+                    return None  # Archivo truncado
+                sections[section] = owner.section(offset, size, typecode)
+            fields = LevelCache._unpack(header, sections)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            if owner is not None:
+                owner.close()  # Sin el mapa abierto se puede reemplazar el archivo roto al guardar
+            return None
+        fields['_mapping'] = owner
+        LevelCache.hits += 1
+        return fields
+
+    @staticmethod
+    def store(name, key, data):
+        """
+        Guarda los datos derivados del LevelData `data` de forma atómica y borra los archivos
+        viejos del mismo nivel. Si no se puede escribir, sigue sin caché, pero avisa: un archivo
+        viejo que no se pudo reemplazar o borrar (p.ej. porque sigue mapeado) no debe pasar callado.
+        """
+        LevelCache.misses += 1
+        if not LevelCache.enabled:
+            return
+        target = LevelCache.path(name, key) if data.nav is not None else None  # Sin grilla rectangular no se guarda
+        temp_path = None
+        try:
+            if target is not None:
+                os.makedirs(LevelCache.DIR, exist_ok=True)
+                blob = LevelCache._pack(key, data)
+                fd, temp_path = tempfile.mkstemp(dir=LevelCache.DIR, prefix=f'{name}-', suffix='.tmp')
+                with os.fdopen(fd, 'wb') as cache_file:
+                    cache_file.write(blob)
+                    cache_file.flush()
+                    os.fsync(cache_file.fileno())
+                os.replace(temp_path, target)  # Atómico: quien lea ve el archivo viejo o el nuevo completo
+                temp_path = None
+            for old in glob.glob(os.path.join(LevelCache.DIR, f'{name}-*.bin')):
+                if old != target:
+                    os.remove(old)  # Otra versión del CSV o del formato: ya no sirve
+        except OSError as e:
+            print(f"Aviso: no pude actualizar el caché del nivel {name}: {e}")
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _pack(key, data):
+        # Arma el archivo: PREFIX, encabezado JSON con los campos chicos y las secciones binarias alineadas
+        analysis = data.analysis
+        offsets, targets = [0], []
+        for moves in data.nav:
+            targets.extend(target for _, target in moves)
+            offsets.append(len(targets))
+        nav, regions = data.nav_components, analysis.regions
+        sections = [
+            ('props', 'B', bytes(data.props)),
+            ('nav_offsets', 'i', _ints(offsets)),
+            ('nav_targets', 'i', _ints(targets)),
+            ('nav_comp', 'i', _ints(nav.comp)),
+            ('nav_starts', 'i', _ints(nav.starts)),
+            ('nav_sources', 'i', _ints(nav.sources)),
+            ('region_comp', 'i', _ints(regions.comp)),
+            ('region_starts', 'i', _ints(regions.starts)),
+            ('region_sources', 'i', _ints(regions.sources)),
+            ('reachable', 'B', bytes(analysis.reachable)),
+            ('reachable_after_reveal', 'B', bytes(analysis.reachable_after_reveal)),
+        ]
+        header = {
+            'key': key,
+            'width': data.width,
+            'height': data.height,
+            'rows': data.rows,
+            'characters': data.characters,
+            'problems': analysis.problems,
+            'start': analysis.start,
+            'uncollectable_gold': analysis.uncollectable_gold,
+            'exit_reachable': analysis.exit_reachable,
+        }
+        # El encabezado dice dónde está cada sección, y su largo cambia el lugar de las secciones:
+        # lo armo con posiciones relativas y después las corro hasta que coincidan
+        base = 0
+        while True:
+            layout, position = {}, base
+            for section, typecode, payload in sections:
+                position += -position % ALIGN
+                layout[section] = (position, len(payload), typecode)
+                position += len(payload)
+            header['sections'] = layout
+            encoded = json.dumps(header, separators=(',', ':')).encode()
+            start = PREFIX.size + len(encoded)
+            start += -start % ALIGN
+            if start == base:
+                break
+            base = start
+        parts = [PREFIX.pack(MAGIC, LevelCache.FORMAT_VERSION, len(encoded)), encoded]
+        position = PREFIX.size + len(encoded)
+        for section, _, payload in sections:
+            offset = layout[section][0]
+            parts.append(bytes(offset - position))
+            parts.append(payload)
+            position = offset + len(payload)
+        return b''.join(parts)
+
+    @staticmethod
+    def _unpack(header, sections):
+        # Inversa de _pack: devuelve los campos de LevelData listos para usar
+        from level_data import MOVES, Components  # Import diferido: level_data importa este módulo
+        from level_analysis import LevelAnalysis
+        width, height = header['width'], header['height']
+        step = {dx + dy * width: (dx, dy) for dx, dy in MOVES}  # Diferencia de índices -> movimiento
+        offsets, targets = sections['nav_offsets'].tolist(), sections['nav_targets'].tolist()
+        nav = [[(step[target - index], target) for target in targets[begin:end]]
+               for index, (begin, end) in enumerate(zip(offsets, offsets[1:]))]
+        # El análisis se copia fuera del mapa: es chico (lineal en las celdas) y quien lo use no
+        # tiene por qué saber que el mapa se cierra junto con el LevelData
+        analysis = LevelAnalysis.restore(
+            width=width, height=height, problems=header['problems'], start=header['start'],
+            regions=Components(sections['region_comp'].tolist(), sections['region_starts'].tolist(),
+                               sections['region_sources'].tolist()),
+            reachable=bytearray(sections['reachable']),
+            reachable_after_reveal=bytearray(sections['reachable_after_reveal']),
+            uncollectable_gold=[tuple(cell) for cell in header['uncollectable_gold']],
+            exit_reachable=header['exit_reachable'])
+        return {
+            'rows': header['rows'],
+            'width': width,
+            'height': height,
+            'characters': [tuple(character) for character in header['characters']],
+            'props': bytearray(sections['props']),  # Se copia por si se modifica
+            'nav': nav,
+            # Lo único que sigue en el mapa: solo lo usa NavGraph, que retiene al LevelData (NavGraph.seed)
+            'nav_components': Components(sections['nav_comp'], sections['nav_starts'], sections['nav_sources']),
+            'analysis': analysis,
+        }
@@ -0,0 +1,312 @@
+# Archivo: level_data.py
+
+import os, io, csv  # os para rutas, io y csv para leer los niveles
+import asyncio  # Para esperar la precarga con await desde el runtime asíncrono
+import weakref  # weakref.finalize cierra el archivo mapeado del caché cuando el nivel deja de usarse
+from concurrent.futures import ThreadPoolExecutor  # Un hilo de fondo para precargar el siguiente nivel
+
+# Cada propiedad de un tile ocupa un bit, así la grilla de propiedades cabe en un bytearray
+PASSABLE = 1
+TAKABLE = 2
+STANDABLE = 4
+CLIMBABLE = 8
+GRABBABLE = 16
+DIGGABLE = 32
+
+PROPERTY_BITS = {
+    'passable':  PASSABLE,
+    'takable':   TAKABLE,
+    'standable': STANDABLE,
+    'climbable': CLIMBABLE,
+    'grabbable': GRABBABLE,
+    'diggable':  DIGGABLE
+}
+
+CHARACTER_CODES = ('P', 'B')  # Celdas del CSV que son personajes (sobre un tile vacío)
+
+MOVES = ((-1, 0), (1, 0), (0, 1), (0, -1))  # Izquierda, derecha, abajo, arriba (mismo orden que PathFinder)
+
+
+def pack_properties(properties):
+    """
+    Convierte un diccionario de propiedades de tile en su máscara de bits.
+    """
+    bits = 0
+    for name, bit in PROPERTY_BITS.items():
+        if properties.get(name):
+            bits |= bit
+    return bits
+
+
+def navigable(props, index, width, height):
+    """
+    Dice si un baddie puede estar en la celda `index` según la grilla de bits `props`:
+    tiene que ser transitable y, o bien agarrable, o bien tener algo donde pararse debajo
+    (en la última fila se mira la propia celda). Es la misma regla que PathFinder.
+    """
+    bits = props[index]
+    if not bits & PASSABLE:
+        return False
+    if bits & GRABBABLE:
+        return True
+    if index + width < width * height:
+        return bool(props[index + width] & STANDABLE)
+    return bool(bits & STANDABLE)
+
+
+def neighbors(props, index, width, height):
+    """
+    Devuelve los movimientos ((dx, dy), índice destino) que un baddie puede hacer desde `index`.
+    """
+    x, y = index % width, index // width
+    result = []
+    for dx, dy in MOVES:
+        nx, ny = x + dx, y + dy
+        if not (0 <= nx < width and 0 <= ny < height):
+            continue
+        if dy < 0 and not props[index] & (CLIMBABLE | GRABBABLE):
+            continue  # Solo se sube desde una escalera o cuerda
+        target = nx + ny * width
+        if navigable(props, target, width, height):
+            result.append(((dx, dy), target))
+    return result
+
+
+class Components:
+    """
+    Componentes fuertemente conexas de un grafo (las arma strong_components) y su condensación:
+    para cada componente, las componentes con alguna arista hacia ella, en dos listas planas
+    (`sources[starts[c]:starts[c + 1]]`). Ocupa lo mismo que el grafo, no el cuadrado de la
+    cantidad de componentes. reaches() recorre la condensación hacia atrás desde el objetivo y
+    guarda el resultado: los baddies persiguen todos al mismo jugador, así que las consultas de
+    un tick comparten un solo recorrido.
+    """
+    CACHE_SIZE = 16  # Objetivos recordados; al llenarse se olvidan todos
+
+    def __init__(self, comp, starts, sources):
+        self.comp = comp  # Componente de cada celda
+        self.starts = starts
+        self.sources = sources
+        self._ancestors = {}  # Componente objetivo -> bytearray con 1 en las componentes que llegan a ella
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def reaches(self, start, goal):
+        """
+        Dice si desde la celda `start` se llega a la celda `goal` (índices); una celda se alcanza a sí misma.
+        """
+        comp = self.comp
+        source, target = comp[start], comp[goal]
+        if source == target:
+            return True
+        if source < target:
+            return False  # Tarjan numera las sucesoras antes: solo se llega a componentes de número menor
+        seen = self._ancestors.get(target)
+        if seen is None:
+            seen = self._ancestors_of(target)
+        return bool(seen[source])
+
+    def _ancestors_of(self, target):
+        # DFS hacia atrás por la condensación desde `target`
+        starts, sources = self.starts, self.sources
+        seen = bytearray(len(self))
+        seen[target] = 1
+        stack = [target]
+        while stack:
+            component = stack.pop()
+            for other in sources[starts[component]:starts[component + 1]]:
+                if not seen[other]:
+                    seen[other] = 1
+                    stack.append(other)
+        if len(self._ancestors) >= Components.CACHE_SIZE:
+            self._ancestors.clear()
+        self._ancestors[target] = seen
+        return seen
+
+
+def strong_components(successors):
+    """
+    Componentes fuertemente conexas de un grafo dado como lista de sucesores por celda, como
+    Components: la componente de cada celda y las aristas entre componentes.
+    """
+    # Tarjan iterativo: emite las componentes en orden topológico inverso, así que toda arista
+    # entre componentes va de un número mayor a uno menor (Components.reaches lo aprovecha)
+    size = len(successors)
+    comp = [-1] * size
+    low = [0] * size
+    order = [-1] * size
+    stack, on_stack = [], [False] * size
+    count = 0  # Componentes emitidas
+    counter = 0
+    for root in range(size):
+        if order[root] != -1:
+            continue
+        work = [(root, 0)]
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, i = work[-1]
+            moves = successors[node]
+            if i < len(moves):
+                work[-1] = (node, i + 1)
+                nxt = moves[i]
+                if order[nxt] == -1:
+                    order[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack[nxt] = True
+                    work.append((nxt, 0))
+                elif on_stack[nxt]:
+                    low[node] = min(low[node], order[nxt])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    comp[member] = count
+                    if member == node:
+                        break
+                count += 1
+    # Condensación: (destino, origen) de cada arista entre componentes distintas, sin repetir
+    edges = sorted({(comp[nxt], comp[node]) for node, moves in enumerate(successors)
+                    for nxt in moves if comp[nxt] != comp[node]})
+    starts = [0] * (count + 1)
+    for target, _ in edges:
+        starts[target + 1] += 1
+    for component in range(count):
+        starts[component + 1] += starts[component]
+    return Components(comp, starts, [source for _, source in edges])
+
+
+class LevelData:
+    """
+    Un nivel ya leído y con sus datos derivados listos: filas de códigos, tamaño,
+    posiciones de los personajes, grilla de propiedades (bits), grafo de navegación
+    y los bytes de los sprites que aún no estaban cargados.
+
+    No toca Tk, así que se puede construir en un hilo de fondo mientras se juega el
+    nivel anterior; en el hilo de Tk solo queda usar los datos. Lo que sale del CSV se
+    guarda en disco con LevelCache y, mientras el archivo no cambie, se lee de ahí.
+    """
+    _executor = None  # Hilo de fondo, se crea la primera vez que se precarga algo
+    _pending = {}  # Nivel -> Future con el LevelData que se está precargando
+    _tile_bits = {}  # Código del CSV -> bits iniciales (se llena desde tiles.py en el hilo principal)
+    _shown_bits = {}  # Código del CSV -> bits con el tile visible (difiere de _tile_bits en las escaleras ocultas)
+
+    @staticmethod
+    def path(num):
+        """
+        Ruta del archivo CSV del nivel `num`.
+        """
+        return os.path.join('levels', f'level{num}.csv')
+
+    @staticmethod
+    def prefetch(num, skip_sprites=()):
+        """
+        Empieza a preparar el nivel `num` en segundo plano. Los sprites de `skip_sprites`
+        ya están decodificados, así que no hace falta leerlos.
+        """
+        if num in LevelData._pending:
+            return
+        LevelData._tile_table()  # Se calcula aquí, en el hilo principal, antes de usar el hilo de fondo
+        if LevelData._executor is None:
+            LevelData._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-prefetch')
+        LevelData._pending[num] = LevelData._executor.submit(LevelData, num, set(skip_sprites))
+
+    @staticmethod
+    def get(num):
+        """
+        Devuelve el LevelData del nivel `num`: el precargado si lo hay (esperándolo solo si
+        todavía no terminó) o uno leído en el momento.
+        """
+        future = LevelData._pending.pop(num, None)
+        if future is not None:
+            return future.result()
+        return LevelData(num)
+
+    @staticmethod
+    async def get_async(num):
+        """
+        Como get(), pero si la precarga no terminó la espera con await, así el pump de Tk
+        sigue andando mientras tanto.
+        """
+        future = LevelData._pending.pop(num, None)
+        if future is not None:
+            return await asyncio.wrap_future(future)
+        return LevelData(num)
+
+    @staticmethod
+    def _tile_table():
+        # Bits iniciales de cada código del CSV, sacados de las clases de tiles.py
+        if not LevelData._tile_bits:
+            import tiles  # Import diferido: tiles.py importa este módulo
+            for code, tile_class in tiles.Tile.tile_map.items():
+                LevelData._tile_bits[code] = pack_properties(tiles.Tile.initial_properties(code))
+                LevelData._shown_bits[code] = pack_properties(dict(tiles.Tile.DEFAULT_PROPERTIES, **tile_class.PROPERTIES))
+            LevelData._tile_bits[None] = LevelData._shown_bits[None] = pack_properties(tiles.Tile.DEFAULT_PROPERTIES)
+        return LevelData._tile_bits
+
+    def __init__(self, num, skip_sprites=()):
+        self.num = num
+        with open(LevelData.path(num), 'rb') as file_data:
+            raw = file_data.read()
+        # Los datos derivados del CSV se guardan en disco: si el archivo no cambió, se leen de ahí
+        from level_cache import LevelCache  # Import diferido: level_cache importa este módulo
+        table = LevelData._tile_table()
+        cache_name = f'level{num}'
+        key = LevelCache.key(raw, table, LevelData._shown_bits)
+        cached = LevelCache.load(cache_name, key)
+        self._mapping = None  # CacheMapping del archivo del caché, si los datos vienen de ahí
+        if cached is not None:
+            for field, value in cached.items():
+                setattr(self, field, value)
+            # Las componentes de navegación siguen en el archivo mapeado: se cierra
+            # cuando este LevelData deja de existir (NavGraph.seed lo retiene mientras las usa)
+            weakref.finalize(self, self._mapping.close)
+        else:
+            self._derive(raw.decode())
+            LevelCache.store(cache_name, key, self)
+
+        # Bytes de los sprites que todavía no están cargados; decodificarlos queda para el hilo de Tk
+        self.sprites = {}
+        for name in sorted(os.listdir('graphics')):
+            if name.endswith('.png') and name not in skip_sprites:
+                with open(os.path.join('graphics', name), 'rb') as image_file:
+                    self.sprites[name] = image_file.read()
+
+    def _derive(self, text):
+        # Calcula todo lo que sale del CSV (lo que LevelCache guarda)
+        self.rows = [row for row in csv.reader(io.StringIO(text))]
+        # Nota: como antes, el ancho es el de la última fila (todas deberían medir lo mismo)
+        self.width = len(self.rows[-1]) if self.rows else 0
+        self.height = len(self.rows)
+
+        # Personajes: (código, x, y) en el orden del archivo
+        self.characters = [(value, col, row_num)
+                           for row_num, row in enumerate(self.rows)
+                           for col, value in enumerate(row)
+                           if value in CHARACTER_CODES]
+
+        # Grilla de propiedades con el estado inicial del nivel (escaleras ocultas sin revelar)
+        table = LevelData._tile_table()
+        empty = table[None]
+        self.props = bytearray(table.get(value, empty) for row in self.rows for value in row)
+
+        # Grafo de navegación inicial: para cada celda, los movimientos posibles de un baddie
+        size = self.width * self.height
+        if len(self.props) == size:
+            self.nav = [neighbors(self.props, index, self.width, self.height) for index in range(size)]
+            self.nav_components = strong_components([[nxt for _, nxt in moves] for moves in self.nav])
+        else:
+            self.nav = self.nav_components = None  # Filas de distinto largo: no hay grilla sobre la que navegar
+
+        # Análisis estático: zonas alcanzables, oro que no se puede juntar, salida inalcanzable
+        from level_analysis import LevelAnalysis  # Import diferido: level_analysis importa este módulo
+        self.analysis = LevelAnalysis(self.rows, self.characters)
@@ -1,17 +1,28 @@
 import time                # Para usar funciones de tiempo, como time.sleep() o medir intervalos
+import asyncio             # El bucle del juego es una corrutina (ver runtime.py)
+STARTUP_START = time.perf_counter() # Momento en que empieza a importarse el juego, para medir el arranque
 from config import Config  # Importa la clase Config definida en config.py para cargar parámetros de configuración
-from graphics import *     # Importa todas las clases y funciones del módulo graphics (p.ej. GraphWin, Point, Rectangle, etc.)
 
 
- # GraphWin, Point, etc. graphics.py ya maneja tk
-from drawable import Drawable
-from tiles import Tile, Gold, HiddenLadder
+# Tk (graphics.py) se carga recién al crear la ventana, a través de Drawable
+from drawable import Drawable, GameOver
+from tiles import Tile
 from characters import Player, Baddie, Character # Importar Player y Baddie explícitamente
 from event import Event
+from ai_scheduler import AIScheduler
+from crowd import Crowd
+from replay import Recorder
+from level_data import LevelData
+from pathfinding import NavGraph
+from runtime import Runtime
+from pacing import FramePacer
+from memprof import MemoryProfiler
+from cpuprof import CpuProfiler
+from metrics import Metrics
 
+# Marcas del arranque en frío: (etapa, instante). Se imprimen una vez, al mostrar el primer frame.
+startup_marks = [('inicio', STARTUP_START), ('imports', time.perf_counter())]
 
-# La función load_level la definiremos dentro de main o antes, para que tenga acceso a Player, etc.
-# Ya no necesitamos una función load_level global aquí si la integramos en el bucle de main.
 
 move_cooldown = 0.15  # segundos entre movimientos
 last_move_time = 0
@@ -27,6 +38,12 @@ KEYMAP = {
     # 'escape':   lambda: exit_game() 
 }
 
+# Teclas de control: se atienden en el bucle de frames apenas llegan, sin cooldown, y no pasan
+# por Recorder ni por game_tick, así una repetición no las vuelve a ejecutar
+CONTROL_KEYS = {
+    'p':        lambda: CpuProfiler.toggle(), # Empieza/termina una captura del perfilador de CPU
+}
+
 LEVELS = [1, 2] 
 
 # ### NUEVA FUNCIÓN ###
@@ -35,150 +52,178 @@ def exit_game():
         Drawable._window.close()
     exit(0)
 
-def main_game_loop():
+def mark_startup(stage):
+    """
+    Registra una etapa del arranque. Al llegar al primer frame imprime el desglose
+    (imports, primer nivel, primer frame) para poder seguir el costo del arranque en frío.
+    """
+    if startup_marks[-1][0] == 'primer frame':
+        return # El arranque ya se midió
+    startup_marks.append((stage, time.perf_counter()))
+    if stage == 'primer frame':
+        parts = [f"{name} {(t - startup_marks[i][1]) * 1000:.0f} ms" for i, (name, t) in enumerate(startup_marks[1:])]
+        total = (startup_marks[-1][1] - STARTUP_START) * 1000
+        print(f"Arranque: {', '.join(parts)} (total {total:.0f} ms)")
+
+def load_level(level_num, data=None):
+    """
+    Carga el nivel `level_num` completo: dimensiones, ventana (si no estamos en modo
+    headless), tiles y personajes. La usan tanto el juego como las repeticiones.
+    Si el nivel se precargó en segundo plano, aquí solo se usan sus datos ya listos
+    (`data`, si quien llama ya los esperó).
+    """
+    if data is None:
+        data = LevelData.get(level_num) # Precargado (LevelData.prefetch) o leído ahora
+    Config.config_level(level_num, data)
+    for problem in data.analysis.problems: # Analizado al leer el CSV (LevelAnalysis), así que no cuesta nada aquí
+        print(f"Aviso: nivel {level_num}: {problem}")
+    Event.reset() # Ningún evento del nivel anterior debe sobrevivir al cambio de nivel
+    AIScheduler.reset() # Ni turnos de baddies pendientes
+    Crowd.stop() # Ni la multitud de prueba, si la había
+    if not Drawable.headless:
+        Drawable.preload_sprites(data.sprites)
+        Drawable.recreateWindow() # Esto crea/recrea la ventana
+    Tile.load_level(level_num, data)
+    NavGraph.seed(data) # El grafo de navegación ya viene armado en el LevelData
+
+    # Cargar personajes. Player.main se creará o actualizará aquí.
+    # Si Player.main ya existe de un nivel anterior, sus vidas se mantienen.
+    # Si es la primera vez, se inicializarán.
+    Character.load_characters(level_num, data)
+    Drawable.raise_hud() # El HUD se reutiliza entre niveles y quedó debajo de los tiles nuevos
+    MemoryProfiler.mark(f'nivel {level_num}: inicio') # Solo si el perfilado de memoria está activo
+
+def game_tick(key=None):
+    """
+    Avanza un tick lógico del juego: aplica la tecla ya filtrada por el cooldown
+    (o None si no hubo) y procesa los eventos programados. Las escaleras ocultas ya
+    no se revisan aquí: se revelan al emitirse GameEvents.ALL_GOLD_COLLECTED.
+    No duerme ni lee el teclado, así que las repeticiones pueden llamarla tan rápido
+    como dé la CPU.
+    """
+    if key in KEYMAP:
+        KEYMAP[key]() # Llamar a la lambda
+
+    if Metrics.active:
+        Metrics.tick(Event.update) # Lo mismo, midiendo el despacho, la cola y las búsquedas (LODERUNNER_METRICS)
+    else:
+        Event.update() # Actualizar eventos programados (turnos de los baddies, relleno de hoyos)
+    AIScheduler.update() # Mover a los baddies cuyo turno llegó, dentro del presupuesto del frame
+    Crowd.update_active() # Y a la franja de la multitud de prueba, si hay una
+
+async def game_over():
+    """
+    Drawable.lost() ya mostró el cartel de derrota: espero una tecla sin trabar la ventana y salgo.
+    """
+    await Runtime.wait_key()
+    exit_game()
+
+async def main_game_loop():
+    """
+    Bucle del juego como corrutina del Runtime: un tick lógico por frame, y las esperas
+    (entre frames, carteles, tecla de fin) son `await`, así el pump de Tk sigue andando.
+    """
     global last_move_time
-    frame_duration = 1.0/60.0 # Apunta a 60 FPS
-    
-
-    # Inicialización de la ventana la primera vez
-    
-    
-    # El jugador mantiene sus vidas entre niveles en esta implementación
-    # Player.main se crea en Character.load_characters
-    # Nos aseguraremos de que las vidas se inicialicen correctamente la primera vez.
+    pacer = FramePacer.from_env() # Apunta a 60 FPS (o sin límite, para medir)
+    MemoryProfiler.start() # Solo con LODERUNNER_MEMPROF=1
+    Metrics.start() # Solo con LODERUNNER_METRICS; exporta cada tanto con Runtime.every()
 
-    current_player_lives = Player.INITIAL_LIVES # Se usará para la primera creación del jugador
-
-    for level_num in LEVELS:
+    for level_index, level_num in enumerate(LEVELS):
         print(f"Loading level {level_num}...")
         # Configurar y cargar el nivel
-        Config.config_level(level_num)
-        Drawable.recreateWindow() # Esto crea/recrea la ventana
-        Tile.load_level(level_num)
-        
-        # Cargar personajes. Player.main se creará o actualizará aquí.
-        # Si Player.main ya existe de un nivel anterior, sus vidas se mantienen.
-        # Si es la primera vez, se inicializarán.
-        Character.load_characters(level_num)
+        load_level(level_num, await LevelData.get_async(level_num))
+        mark_startup('primer nivel')
+
+        # Mientras se juega este nivel, el siguiente se lee y prepara en segundo plano
+        if level_index + 1 < len(LEVELS):
+            LevelData.prefetch(LEVELS[level_index + 1], skip_sprites=Drawable._sprites)
 
         if not Player.main:
             print("Error: Player.main no fue creado después de load_characters.")
             return # Salir si no hay jugador
 
-        # Si es el primer nivel, o si queremos resetear las vidas al inicio de cada nivel (opcional):
-        # if level_num == LEVELS[0]: # O simplemente siempre al cargar nivel
-        # Player.main.lives = Player.INITIAL_LIVES # Esto ya se maneja en Player.__init__ con is_initial_load
-
         print(f"Starting level {level_num} with {Player.main.lives} lives.")
+        Recorder.start_level(level_num)
+        CpuProfiler.level_started(level_num) # Con LODERUNNER_PROFILE se perfila cada nivel por separado
 
         level_running = True
         while level_running: # Bucle para el nivel actual, permite reintentos si se pierde una vida
             
             if Player.main.lives <= 0: # Si el jugador se quedó sin vidas en un intento anterior
                 print("Game Over - No lives left.")
-                Drawable.lost() # Esto llamará a la pantalla de Game Over y saldrá
+                try:
+                    Drawable.lost() # Esto llamará a la pantalla de Game Over y saldrá
+                except GameOver:
+                    await game_over()
                 return # Salir de la función main_game_loop
 
             # Mostrar vidas al inicio del intento de nivel o después de respawn
             Drawable.update_lives_display(Player.main.lives)
 
             # Bucle principal del juego para el intento actual del nivel
+            pacer.reset() # La carga del nivel y los carteles no cuentan como atraso
+            Metrics.pause() # Ni como un frame largo
             while not Player.main.at_exit():
-                frame_start_time = time.time()
-
                 if Drawable._window.isClosed(): # Si la ventana se cierra externamente
                     print("Window closed, exiting game.")
                     return
 
-                key = Drawable._window.checkKey()
+                key = Runtime.poll_key()
+                if Runtime.pumps:
+                    mark_startup('primer frame') # El pump ya refrescó la ventana con el nivel dibujado
+                if key in CONTROL_KEYS:
+                    CONTROL_KEYS[key]()
+                    key = None # No es una tecla del juego: no gasta el cooldown ni se graba
 
                 now = time.time()
                 if key in KEYMAP and (now - last_move_time) > move_cooldown:
-                     KEYMAP[key]()
-
-                     last_move_time = now
- # Llamar a la lambda
-
-                Event.update() # Actualizar eventos programados (movimiento de baddies, relleno de hoyos)
+                    last_move_time = now
+                else:
+                    key = None # La tecla no se aplica en este tick (cooldown o tecla desconocida)
 
-                # Lógica de HiddenLadder y redraws
-                if not Config.hidden_flag:
-                    if Gold.all_taken():
-                        HiddenLadder.showAll()
-                        if Player.main: Player.main.redraw() # Redibujar jugador
-                        for baddie in Baddie.baddies: # Redibujar baddies
-                            baddie.redraw()
-                        Config.hidden_flag = True
+                Recorder.record(key) # Se graba antes de aplicarla: 'q' o perder la última vida salen del programa
+                try:
+                    CpuProfiler.call(game_tick, key) # Solo se perfila el tick, no las esperas ni Tk
+                except GameOver:
+                    await game_over()
                 
-                # Comprobar si el jugador ha perdido una vida
-                # La lógica de perder vida ya está en Player y Baddie,
-                # y Player.lose_life() maneja el respawn o Drawable.lost()
-                # Necesitamos una forma de romper este bucle interno si el jugador
-                # pierde una vida para reiniciar el intento del nivel (respawn).
-                # La función Player.lose_life() llama a respawn() o Drawable.lost().
-                # Si llama a respawn(), el juego continúa en este mismo bucle.
-                # Si llama a Drawable.lost(), el juego termina.
-                
-                # Si el jugador se quedó sin vidas, Player.lose_life() habrá llamado a Drawable.lost(),
-                # lo que termina el juego. Así que no necesitamos un chequeo explícito aquí para eso.
-
-                # Si el jugador fue "muerto" (ej. por un baddie o cayendo en hoyo rellenado),
-                # el método lose_life() del Player ya habrá sido llamado.
-                # Si tenía vidas, habrá llamado a respawn(). El juego sigue.
-                # Si no tenía vidas, Drawable.lost() habrá terminado el juego.
-
-                # Actualizar display de vidas en cada frame, por si cambia
-                # (aunque solo cambia cuando se pierde una vida)
-                # Es más eficiente llamarlo solo cuando `player.lives` cambia,
-                # pero para simplificar, lo podemos llamar aquí.
-                # O, mejor aún, Player.lose_life() podría encargarse de llamar a update_lives_display.
-                # Drawable.update_lives_display(Player.main.lives) # Ya lo hace Player.lose_life/respawn
-
-                frame_time = time.time() - frame_start_time
-                if frame_time < frame_duration:
-                    time.sleep(frame_duration - frame_time)
-                
-                # Si el jugador se quedó sin vidas y Drawable.lost() fue llamado, el programa ya habrá salido.
-                # Si el jugador perdió una vida y respawneó, el bucle continúa.
-                # Si el jugador llegó a la salida, el bucle `while not Player.main.at_exit()` termina.
+                await pacer.end_frame() # Espera hasta el deadline del frame (o sigue de largo si va atrasado)
+                Metrics.frame()
 
             # Si salimos del bucle `while not Player.main.at_exit()`:
             if Player.main.at_exit():
                 print(f"Level {level_num} completed!")
+                print(pacer.report())
+                MemoryProfiler.mark(f'nivel {level_num}: fin')
+                CpuProfiler.level_finished(level_num) # Antes del cartel de nivel superado
+                Recorder.end_level()
                 level_running = False # Salir del bucle del nivel actual para pasar al siguiente
                 if level_num == LEVELS[-1]: # Si es el último nivel
                     Drawable.won() # Mostrar pantalla de victoria final
                     # Esperar un poco antes de cerrar o permitir que el jugador cierre
-                    time.sleep(2)
+                    await asyncio.sleep(2)
                     exit_game() 
                 else:
-                    temp_text = Text(Point(Config.WINDOW_WIDTH/2+10, Config.WINDOW_HEIGHT/2+10), f'1 Superado')
-                    temp_text.setSize(24)
-                    temp_text.setTextColor('Red')
-                    if Drawable._window and not Drawable._window.isClosed():
-                        temp_text.draw(Drawable._window)
-                        Drawable._window.update()
-                        time.sleep(2) # Mostrar mensaje por 2 segundos
+                    temp_text = Drawable.draw_text_utility(f'1 Superado', Config.WINDOW_WIDTH/2+10, Config.WINDOW_HEIGHT/2+10, size=24, color='Red')
+                    if temp_text:
+                        await asyncio.sleep(2) # Mostrar mensaje por 2 segundos (el pump lo dibuja)
                         temp_text.undraw()
-            # else: # Si no está en la salida, implica que perdió todas las vidas y Drawable.lost() ya manejó
 
     # Si el bucle de niveles termina (porque se completaron todos)
     print("Ganaste.")
-    # Drawable.won() ya se llamó si fue el último nivel.
-    # Si no hubo niveles, o por alguna otra razón, asegurar cierre limpio.
-    if Drawable._window and not Drawable._window.isClosed():
-       
-        pass
 
 # Punto de entrada
 if __name__ == '__main__':
     try:
-        main_game_loop()
+        Recorder.start_session()
+        Runtime.run(main_game_loop())
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         import traceback
         traceback.print_exc()
     finally:
+        # Guardar la grabación de la sesión, incluso si se salió con 'q' o por Game Over
+        Recorder.save()
         # Asegurarse de que la ventana se cierre si no se hizo ya
         if Drawable._window and not Drawable._window.isClosed():
             Drawable._window.close()
@@ -0,0 +1,185 @@
+# Archivo: memprof.py
+
+import os, io, sys, random  # os para la configuración, sys para salir con error en el soak, random para el soak
+import contextlib  # Para callar los print del juego durante el soak
+import tracemalloc  # Quién reservó cada bloque de memoria que sigue vivo
+from game_events import GameEvents
+
+# Archivos cuyas reservas no cuentan: tracemalloc (las fotos mismas), este módulo y los imports
+_IGNORED = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>',
+            '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+def _counted(stats):
+    # Estadísticas sin las de _IGNORED. Filtro los resultados ya agrupados y no la foto con
+    # Snapshot.filter_traces(), que compara cada bloque con fnmatch y tarda casi un segundo por foto
+    return [stat for stat in stats if stat.traceback[0].filename not in _IGNORED]
+
+
+class MemoryProfiler:
+    """
+    Modo de perfilado de memoria con tracemalloc, para ver si la memoria crece entre niveles y
+    reapariciones. Se activa con LODERUNNER_MEMPROF=1 (LODERUNNER_MEMPROF_FRAMES: cuántos frames de
+    la pila guardar por bloque, 1 por defecto; más da mejores sitios pero es más lento).
+
+    Toma una foto (snapshot) al empezar y al terminar cada nivel y después de cada reaparición del
+    jugador, y en cada una informa:
+    - la memoria viva total y su cambio desde la foto anterior,
+    - los sitios (archivo:línea) que más crecieron,
+    - el crecimiento por subsistema (por archivo) y el tamaño de las estructuras de clase que
+      pueden retener cosas: Image.imageCache, GraphWin.items, Baddie.baddies, Event._queue...
+    """
+    enabled = os.environ.get('LODERUNNER_MEMPROF', '0') not in ('', '0')
+    frames = int(os.environ.get('LODERUNNER_MEMPROF_FRAMES', 1))
+    TOP = 8  # Sitios y subsistemas que se muestran por foto
+    marks = []  # (etiqueta, bytes vivos, tamaños de estructuras) de cada foto
+    quiet = False  # Si es True solo junta los datos, sin imprimir cada foto
+    _previous = None  # Snapshot de la foto anterior
+
+    @staticmethod
+    def start():
+        """
+        Empieza a rastrear reservas (si el modo está activo y no se empezó ya).
+        """
+        if not MemoryProfiler.enabled or tracemalloc.is_tracing():
+            return
+        tracemalloc.start(MemoryProfiler.frames)
+        MemoryProfiler.marks = []
+        MemoryProfiler._previous = None
+        GameEvents.subscribe(GameEvents.PLAYER_RESPAWNED, MemoryProfiler._on_respawn)
+
+    @staticmethod
+    def stop():
+        """
+        Deja de rastrear y suelta la última foto.
+        """
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        GameEvents.unsubscribe(GameEvents.PLAYER_RESPAWNED, MemoryProfiler._on_respawn)
+        MemoryProfiler._previous = None
+
+    @staticmethod
+    def _on_respawn(player):
+        MemoryProfiler.mark('reaparición')
+
+    @staticmethod
+    def structures():
+        """
+        Tamaño de las estructuras de clase que viven entre niveles y pueden retener objetos.
+        """
+        from characters import Baddie  # Imports diferidos: todos estos módulos importan game_events
+        from event import Event
+        from tiles import Tile
+        from drawable import Drawable
+        sizes = {
+            'Baddie.baddies': len(Baddie.baddies),
+            'Event._queue': sum(len(events) for events in Event._queue.values()),
+            'Tile.level': len(Tile.level),
+            'Drawable._sprites': len(Drawable._sprites),
+            'Drawable._scaled': sum(len(photos) for photos in Drawable._scaled.values()),
+            'Drawable._moved': len(Drawable._moved),
+            'GameEvents': sum(len(funcs) for funcs in GameEvents._subscribers.values()),
+        }
+        graphics = sys.modules.get('graphics')  # Solo si ya se cargó Tk: no lo importo para medir
+        if graphics is not None:
+            sizes['Image.imageCache'] = len(graphics.Image.imageCache)
+        if Drawable._window is not None:
+            sizes['GraphWin.items'] = len(Drawable._window.items)
+        return sizes
+
+    @staticmethod
+    def mark(label):
+        """
+        Toma una foto etiquetada `label` y, salvo en modo `quiet`, imprime lo que creció desde
+        la anterior. Devuelve los bytes vivos.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        current = sum(stat.size for stat in _counted(snapshot.statistics('filename')))
+        sizes = MemoryProfiler.structures()
+        previous = MemoryProfiler._previous
+        MemoryProfiler._previous = snapshot
+        last = MemoryProfiler.marks[-1] if MemoryProfiler.marks else None
+        MemoryProfiler.marks.append((label, current, sizes))
+        if MemoryProfiler.quiet:
+            return current
+        print(f"[memoria] {label}: {current / 1024:.1f} KiB vivos", end='')
+        if last is None:
+            print()
+            return current
+        print(f" ({(current - last[1]) / 1024:+.1f} KiB desde '{last[0]}')")
+        changed = {name: size - last[2].get(name, 0) for name, size in sizes.items() if size != last[2].get(name, 0)}
+        if changed:
+            print("  estructuras: " + ', '.join(f"{name} {delta:+d}" for name, delta in changed.items()))
+        for title, key_type in (('subsistemas', 'filename'), ('sitios', 'lineno')):
+            growth = [stat for stat in _counted(snapshot.compare_to(previous, key_type)) if stat.size_diff > 0]
+            if growth:
+                print(f"  {title} que más crecieron:")
+                for stat in growth[:MemoryProfiler.TOP]:
+                    frame = stat.traceback[0]
+                    where = os.path.basename(frame.filename) + (f":{frame.lineno}" if key_type == 'lineno' else '')
+                    print(f"    {where:<32} {stat.size_diff / 1024:+8.1f} KiB ({stat.count_diff:+d} bloques)")
+        return current
+
+
+def soak(cycles=20, ticks=1500, threshold_kib=256, seed=0):
+    """
+    Prueba de resistencia sin ventana: juega `cycles` veces todos los niveles (teclas al azar,
+    muertes incluidas), con el perfilado activo. Como cada vuelta vuelve al mismo estado, la
+    memoria viva al empezar el primer nivel debería quedar plana; si desde la segunda vuelta
+    (la primera llena cachés) crece más de `threshold_kib`, falla. Devuelve True si pasa.
+    """
+    import main  # Import diferido: main carga todo el juego
+    from drawable import Drawable
+    from characters import Player
+    Drawable.headless = True
+    MemoryProfiler.enabled = True
+    MemoryProfiler.quiet = True
+    MemoryProfiler.start()
+    rng = random.Random(seed)
+    keys = ['Left', 'Right', 'Up', 'Down', 'z', 'c', None, None, None]
+    first = main.LEVELS[0]
+    for cycle in range(cycles):
+        with contextlib.redirect_stdout(io.StringIO()):  # Los print del juego no son parte del informe
+            Player.main = None
+            for level in main.LEVELS:
+                main.load_level(level)
+                Player.main.lives = 50  # Muchas, pero no infinitas: reaparecer sobre un baddie vuelve a matarlo
+                try:
+                    for tick in range(ticks):
+                        if Player.main.at_exit():
+                            break
+                        main.game_tick(rng.choice(keys) if tick % 9 == 0 else None)
+                        if tick % 500 == 499:
+                            Player.main.respawn()  # Reapariciones forzadas además de las del juego
+                except SystemExit:
+                    pass  # Se quedó sin vidas: el nivel termina ahí, como en el juego
+                MemoryProfiler.mark(f'nivel {level}: fin')
+        current = [mark[1] for mark in MemoryProfiler.marks if mark[0] == f'nivel {first}: inicio'][-1]
+        print(f"vuelta {cycle + 1}: {current / 1024:.1f} KiB vivos al empezar el nivel {first}")
+    # La primera vuelta no cuenta: llena los cachés (sprites, niveles, grafos) que después se reusan
+    starts = [current for label, current, _ in MemoryProfiler.marks if label == f'nivel {first}: inicio'][1:]
+    growth = starts[-1] - starts[0] if len(starts) > 1 else 0
+    top = _counted(MemoryProfiler._previous.statistics('lineno'))[:MemoryProfiler.TOP]
+    MemoryProfiler.stop()
+    print("Sitios con más memoria viva al final:")
+    for stat in top:
+        frame = stat.traceback[0]
+        print(f"  {os.path.basename(frame.filename)}:{frame.lineno:<6} {stat.size / 1024:8.1f} KiB ({stat.count} bloques)")
+    ok = growth <= threshold_kib * 1024
+    print(f"Crecimiento retenido: {growth / 1024:+.1f} KiB en {len(starts) - 1} vueltas "
+          f"(umbral {threshold_kib} KiB) -> {'OK' if ok else 'FALLA'}")
+    return ok
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Soak de memoria: juega los niveles muchas veces y mide si la memoria crece.')
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--ticks', type=int, default=1500, help='Ticks por nivel en cada vuelta')
+    parser.add_argument('--threshold-kib', type=int, default=256, help='Crecimiento retenido máximo')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args()
+    import memprof  # Uso el módulo importado (el mismo MemoryProfiler que ve main), no este __main__
+    sys.exit(0 if memprof.soak(options.cycles, options.ticks, options.threshold_kib, options.seed) else 1)
@@ -0,0 +1,254 @@
+# Archivo: metrics.py
+
+import os, json, time, atexit  # os/json para exportar, time.perf_counter para medir
+import tempfile  # El formato de texto se reescribe entero: temporal + rename, como en level_cache.py
+from array import array  # Los anillos guardan floats en un array fijo, sin crear listas
+from game_events import GameEvents
+
+METRICS_DIR = 'metrics'  # Carpeta (junto a 'levels') donde se exportan, salvo que se diga otro archivo
+PREFIX = 'loderunner_'  # Prefijo de los nombres en el formato de texto
+QUANTILES = (0.5, 0.9, 0.99)  # Cuantiles que se exportan de cada histograma
+
+
+class Ring:
+    """
+    Histograma sobre las últimas `size` muestras: un anillo de tamaño fijo (reservado una vez)
+    más la cuenta y la suma de todas las que se vieron. Agregar una muestra no reserva memoria;
+    ordenar para los cuantiles se hace recién al exportar.
+    """
+    __slots__ = ('data', 'next', 'filled', 'count', 'total')
+
+    def __init__(self, size):
+        self.data = array('d', bytes(8 * size))
+        self.next = 0  # Dónde va la próxima muestra
+        self.filled = 0  # Muestras válidas en el anillo (hasta size)
+        self.count = 0  # Muestras vistas desde el arranque
+        self.total = 0.0  # Suma de todas las muestras vistas
+
+    def add(self, value):
+        data = self.data
+        data[self.next] = value
+        self.next = (self.next + 1) % len(data)
+        if self.filled < len(data):
+            self.filled += 1
+        self.count += 1
+        self.total += value
+
+    def summary(self):
+        """
+        Cuantiles (QUANTILES), mínimo y máximo de las muestras del anillo, y cuenta/suma totales.
+        """
+        values = sorted(self.data[:self.filled])
+        result = {'count': self.count, 'sum': self.total}
+        if values:
+            result['min'], result['max'] = values[0], values[-1]
+            for quantile in QUANTILES:
+                result[f'p{round(quantile * 100)}'] = values[min(len(values) - 1, int(quantile * len(values)))]
+        return result
+
+
+class Metrics:
+    """
+    Métricas del juego para mirar corridas largas sin depurador. Se activa con LODERUNNER_METRICS:
+    'prom' (o '1'), 'csv' o 'json'. Cada LODERUNNER_METRICS_INTERVAL segundos (10) se exportan a
+    LODERUNNER_METRICS_FILE (por defecto metrics/loderunner.<formato>):
+    - prom: texto de exposición de Prometheus, reescrito entero cada vez (lo puede leer el
+      textfile collector de node_exporter o cualquier scraper);
+    - csv: una fila "hora,métrica,valor" por métrica y exportación, agregadas al final;
+    - json: un objeto por exportación, una por línea.
+
+    Contadores: ticks, frames, eventos despachados, nodos expandidos por las búsquedas, hoyos
+    cavados y rellenados, vidas perdidas. Histogramas (Ring, las últimas LODERUNNER_METRICS_WINDOW
+    muestras): duración de los frames, lo que tarda Event.update en despachar los eventos del tick,
+    largo de la cola de Event y nodos expandidos por tick. Al exportar se leen además los objetos
+    vivos del canvas y los baddies.
+    Sin la variable, game_tick no llama a nada de esto y el costo es leer `active` en cada tick.
+    """
+    mode = {'1': 'prom'}.get(os.environ.get('LODERUNNER_METRICS', ''), os.environ.get('LODERUNNER_METRICS', ''))
+    enabled = mode in ('prom', 'csv', 'json')
+    interval = float(os.environ.get('LODERUNNER_METRICS_INTERVAL', 10))
+    window = int(os.environ.get('LODERUNNER_METRICS_WINDOW', 1024))
+    path = os.environ.get('LODERUNNER_METRICS_FILE') or os.path.join(METRICS_DIR, f'loderunner.{mode}')
+    QUEUE_EVERY = 8  # Cada cuántos ticks se mide el largo de la cola de Event (recorre sus listas)
+    counters = {name: 0 for name in ('ticks', 'frames', 'events_dispatched', 'path_nodes_expanded',
+                                     'tiles_dug', 'tiles_refilled', 'lives_lost')}
+    histograms = {}  # Nombre -> Ring
+    active = False  # True desde start(): game_tick mide con tick() en lugar de llamar a Event.update() directo
+    _expanded = 0  # NavGraph.expanded en el tick anterior
+    _player_class = None  # characters.Player, para contar solo las vidas perdidas
+    _last_frame = None  # perf_counter del fin del frame anterior (None tras una pausa)
+    _started = None  # Cuándo se llamó a start()
+
+    @staticmethod
+    def histogram(name):
+        """
+        El Ring de `name`, creado la primera vez.
+        """
+        ring = Metrics.histograms.get(name)
+        if ring is None:
+            ring = Metrics.histograms[name] = Ring(Metrics.window)
+        return ring
+
+    @staticmethod
+    def start():
+        """
+        Empieza a juntar métricas (si están activas): se suscribe a los eventos del juego, programa
+        la exportación periódica en el Runtime y una última al salir.
+        """
+        if not Metrics.enabled or Metrics._started is not None:
+            return
+        from characters import Player  # Imports diferidos: characters y runtime cargan medio juego
+        from runtime import Runtime
+        Metrics._started = time.perf_counter()
+        Metrics.active = True
+        for name in ('frame_seconds', 'event_dispatch_seconds', 'event_queue_depth', 'path_nodes_per_tick'):
+            Metrics.histogram(name)
+        Metrics._player_class = Player
+        GameEvents.subscribe(GameEvents.TILE_DUG, Metrics._on_dug)
+        GameEvents.subscribe(GameEvents.TILE_REFILLED, Metrics._on_refilled)
+        GameEvents.subscribe(GameEvents.CHARACTER_DIED, Metrics._on_died)
+        Runtime.every(Metrics.interval, Metrics.export)
+        atexit.register(Metrics.export)
+        print(f"Métricas ({Metrics.mode}) cada {Metrics.interval:g} s en {Metrics.path}")
+
+    @staticmethod
+    def _on_dug(tile):
+        Metrics.counters['tiles_dug'] += 1
+
+    @staticmethod
+    def _on_refilled(tile):
+        Metrics.counters['tiles_refilled'] += 1
+
+    @staticmethod
+    def _on_died(character):
+        if isinstance(character, Metrics._player_class):
+            Metrics.counters['lives_lost'] += 1
+
+    @staticmethod
+    def tick(update):
+        """
+        Corre `update` (Event.update) midiendo el tick: cuánto tarda el despacho, cuántos eventos
+        despacha, el largo de la cola y los nodos que expandieron las búsquedas desde el tick anterior.
+        """
+        from event import Event  # Import diferido: solo se usa con las métricas activas
+        from pathfinding import NavGraph
+        counters = Metrics.counters
+        queue = Event._queue
+        counters['events_dispatched'] += len(queue.get(Event._frame, ()))
+        if counters['ticks'] % Metrics.QUEUE_EVERY == 0:
+            Metrics.histograms['event_queue_depth'].add(sum(map(len, queue.values())))
+        start = time.perf_counter()
+        update()
+        Metrics.histograms['event_dispatch_seconds'].add(time.perf_counter() - start)
+        counters['ticks'] += 1
+        # Las búsquedas de AIScheduler.update() corren después de Event.update(): cuento las del tick anterior
+        expanded = NavGraph.expanded - Metrics._expanded
+        Metrics._expanded = NavGraph.expanded
+        counters['path_nodes_expanded'] += expanded
+        Metrics.histograms['path_nodes_per_tick'].add(expanded)
+
+    @staticmethod
+    def frame():
+        """
+        Terminó un frame del bucle del juego (después de la espera del FramePacer).
+        """
+        if not Metrics.active:
+            return
+        now = time.perf_counter()
+        if Metrics._last_frame is not None:
+            Metrics.histograms['frame_seconds'].add(now - Metrics._last_frame)
+        Metrics._last_frame = now
+        Metrics.counters['frames'] += 1
+
+    @staticmethod
+    def pause():
+        """
+        Pausa a propósito (carga de nivel, carteles): el próximo frame no cuenta el tiempo parado.
+        """
+        Metrics._last_frame = None
+
+    @staticmethod
+    def gauges():
+        """
+        Valores que se leen al exportar: objetos vivos en el canvas, baddies y segundos corriendo.
+        """
+        from drawable import Drawable  # Imports diferidos, como en MemoryProfiler.structures()
+        from characters import Baddie
+        values = {'baddies': len(Baddie.baddies),
+                  'uptime_seconds': time.perf_counter() - (Metrics._started or time.perf_counter())}
+        window = Drawable._window
+        if window is not None and not window.isClosed():
+            values['canvas_items'] = len(window.find_all())  # Incluye los Sprite, que no van en window.items
+        return values
+
+    @staticmethod
+    def snapshot():
+        """
+        Todas las métricas en un diccionario: contadores, valores del momento e histogramas resumidos.
+        """
+        return {
+            'time': time.time(),
+            'counters': dict(Metrics.counters),
+            'gauges': Metrics.gauges(),
+            'histograms': {name: ring.summary() for name, ring in Metrics.histograms.items()},
+        }
+
+    @staticmethod
+    def export():
+        """
+        Escribe las métricas en Metrics.path con el formato elegido. Si no se puede, sigue sin exportar.
+        """
+        if not Metrics.active:
+            return
+        data = Metrics.snapshot()
+        try:
+            folder = os.path.dirname(Metrics.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            if Metrics.mode == 'prom':
+                fd, temp_path = tempfile.mkstemp(dir=folder or '.', suffix='.tmp')
+                with os.fdopen(fd, 'w') as file_data:
+                    file_data.write(Metrics.exposition(data))
+                os.replace(temp_path, Metrics.path)  # El scraper nunca lee un archivo a medias
+            elif Metrics.mode == 'csv':
+                new = not os.path.exists(Metrics.path)
+                with open(Metrics.path, 'a') as file_data:
+                    if new:
+                        file_data.write('time,metric,value\n')
+                    file_data.writelines(f"{data['time']:.3f},{name},{value}\n" for name, value in Metrics.flatten(data))
+            else:
+                with open(Metrics.path, 'a') as file_data:
+                    file_data.write(json.dumps(data, separators=(',', ':')) + '\n')
+        except OSError as e:
+            print(f"No se pudieron exportar las métricas: {e}")
+
+    @staticmethod
+    def flatten(data):
+        """
+        (nombre, valor) de cada número de `data` (ver snapshot()), p.ej. ('frame_seconds.p99', 0.017).
+        """
+        for group in ('counters', 'gauges'):
+            yield from data[group].items()
+        for name, summary in data['histograms'].items():
+            for stat, value in summary.items():
+                yield f'{name}.{stat}', value
+
+    @staticmethod
+    def exposition(data):
+        """
+        `data` (ver snapshot()) en el formato de texto de Prometheus: contadores como *_total,
+        valores del momento como gauge e histogramas como summary con sus cuantiles.
+        """
+        lines = []
+        for name, value in data['counters'].items():
+            lines += [f'# TYPE {PREFIX}{name}_total counter', f'{PREFIX}{name}_total {value}']
+        for name, value in data['gauges'].items():
+            lines += [f'# TYPE {PREFIX}{name} gauge', f'{PREFIX}{name} {value}']
+        for name, summary in data['histograms'].items():
+            lines.append(f'# TYPE {PREFIX}{name} summary')
+            for quantile in QUANTILES:
+                value = summary.get(f'p{round(quantile * 100)}')
+                if value is not None:
+                    lines.append(f'{PREFIX}{name}{{quantile="{quantile}"}} {value}')
+            lines += [f'{PREFIX}{name}_sum {summary["sum"]}', f'{PREFIX}{name}_count {summary["count"]}']
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,112 @@
+# Archivo: pacing.py
+
+import os, time  # os para la configuración, time.perf_counter como reloj de alta resolución
+import asyncio  # Las esperas entre frames son await, para que el pump de Tk siga andando
+
+
+class FramePacer:
+    """
+    Marca el ritmo del bucle del juego con time.perf_counter.
+
+    - Deadlines absolutos: el frame n termina en inicio + n * periodo, así que si un frame
+      se pasa un poco, el siguiente espera menos (no se acumula deriva). Si el atraso supera
+      MAX_BEHIND frames, re-sincronizo en lugar de correr para alcanzarlo.
+    - Espera híbrida: await asyncio.sleep() hasta SPIN segundos antes del deadline y el resto
+      en un bucle activo, porque el sleep del sistema se suele pasar por más de un milisegundo.
+    - Frame-skip: si al terminar un frame ya pasó el deadline del siguiente, sigo con la lógica
+      sin ceder al pump de Tk (no se redibuja), hasta `max_skip` frames seguidos.
+    - Sin límite (`uncapped`): no espera nada, para medir cuánto da el juego.
+
+    Lleva estadísticas de deadlines perdidos (stats() / report()).
+    """
+    SPIN = 0.0015  # Segundos finales de cada espera que se hacen en bucle activo
+    MAX_BEHIND = 5  # Frames de atraso a partir de los cuales se re-sincroniza
+
+    @staticmethod
+    def from_env():
+        """
+        Crea el pacer según LODERUNNER_FPS (60), LODERUNNER_UNCAPPED (0) y LODERUNNER_FRAME_SKIP (2).
+        """
+        return FramePacer(fps=float(os.environ.get('LODERUNNER_FPS', 60)),
+                          uncapped=os.environ.get('LODERUNNER_UNCAPPED', '0') not in ('', '0'),
+                          max_skip=int(os.environ.get('LODERUNNER_FRAME_SKIP', 2)))
+
+    def __init__(self, fps=60, uncapped=False, max_skip=2):
+        self.period = 1.0 / fps
+        self.uncapped = uncapped
+        self.max_skip = max_skip
+        self.deadline = None  # Instante en que debía empezar el frame en curso; termina un periodo después
+        self._skipped_in_row = 0
+        self._last = None  # Fin del frame anterior (None tras un reset)
+        self._active = 0.0  # Tiempo entre frames consecutivos, sin contar las pausas (para los FPS reales)
+        self.frames = 0  # Frames terminados
+        self.missed = 0  # Frames que terminaron después de su deadline
+        self.skipped = 0  # Frames sin redibujar por ir atrasado
+        self.resyncs = 0  # Veces que el atraso fue tan grande que se re-sincronizó
+        self.worst_overrun = 0.0  # Mayor atraso de un frame respecto a su deadline (segundos)
+
+    def reset(self):
+        """
+        Olvida el deadline en curso. Se llama después de una pausa a propósito (carga de nivel,
+        carteles) para que no cuente como atraso.
+        """
+        self.deadline = None
+        self._skipped_in_row = 0
+        self._last = None
+
+    async def end_frame(self):
+        """
+        Termina el frame: espera hasta su deadline (o no espera, si va atrasado o sin límite).
+        """
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = now  # Primer frame tras un reset: lo tomo como recién empezado
+        if self._last is not None:
+            self._active += now - self._last
+        self._last = now
+        self.frames += 1
+        self.deadline += self.period  # Deadline de este frame, que es donde empieza el siguiente
+        overrun = now - self.deadline
+        if overrun > 0:
+            self.missed += 1
+            self.worst_overrun = max(self.worst_overrun, overrun)
+
+        if self.uncapped:
+            self.deadline = now
+            await asyncio.sleep(0)  # Sin espera, pero le doy turno al pump
+            return
+        if now - self.deadline > self.MAX_BEHIND * self.period:
+            self.deadline = now  # Demasiado atrasado: no intento recuperar esos frames
+            self.resyncs += 1
+        if now >= self.deadline and self._skipped_in_row < self.max_skip:
+            self._skipped_in_row += 1  # Ya es hora del próximo frame: lógica ya, sin redibujar
+            self.skipped += 1
+            return
+        self._skipped_in_row = 0
+        remaining = self.deadline - time.perf_counter()
+        await asyncio.sleep(max(0, remaining - self.SPIN))  # Aunque no sobre tiempo, cedo al pump
+        while time.perf_counter() < self.deadline:
+            pass  # Tramo final en bucle activo: más preciso que el sleep del sistema
+
+    def stats(self):
+        """
+        Estadísticas de ritmo hasta ahora, en un diccionario.
+        """
+        return {
+            'frames': self.frames,
+            'fps': self.frames / self._active if self._active > 0 else 0.0,
+            'missed': self.missed,
+            'missed_ratio': self.missed / self.frames if self.frames else 0.0,
+            'skipped_renders': self.skipped,
+            'resyncs': self.resyncs,
+            'worst_overrun_ms': self.worst_overrun * 1000,
+        }
+
+    def report(self):
+        """
+        Resumen de stats() en una línea.
+        """
+        s = self.stats()
+        return (f"Ritmo: {s['frames']} frames a {s['fps']:.1f} FPS, {s['missed']} deadlines perdidos "
+                f"({s['missed_ratio']:.1%}), {s['skipped_renders']} sin redibujar, {s['resyncs']} re-sincronizaciones, "
+                f"peor atraso {s['worst_overrun_ms']:.1f} ms")
@@ -0,0 +1,115 @@
+# Archivo: path_worker.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # El trabajador: un hilo o un proceso
+from pathfinding import NavGraph
+from tiles import Tile
+from config import Config
+
+_graph = None  # Grafo que usa el trabajador, armado desde la última foto de terreno que recibió
+
+
+def search(props, width, height, version, start, goal, mode):
+    """
+    Corre en el trabajador: busca el camino de `start` a `goal` sobre la foto de terreno `props`
+    (bytes, no cambia mientras se usa) y devuelve (version, start, camino, nodos expandidos).
+    El grafo se reusa mientras lleguen pedidos con la misma versión de terreno. No toca
+    NavGraph.expanded: ese contador es del hilo del juego (presupuesto de AIScheduler).
+    """
+    global _graph
+    if _graph is None or _graph[0] != version:
+        _graph = (version, NavGraph(props, width, height, counted=False))
+    graph = _graph[1]
+    before = graph.expanded
+    path = graph.find(start, goal, mode)
+    return version, start, path, graph.expanded - before
+
+
+class PathWorker:
+    """
+    Búsquedas de camino fuera del hilo de Tk. El juego le pasa una foto inmutable del terreno
+    (bytes de Tile.props con su Tile.version) y sigue sin esperar; cuando el resultado está listo,
+    AIScheduler le da turno al baddie en el tick siguiente. Un resultado se descarta si el terreno
+    cambió desde la foto o si el baddie ya no está donde empezaba la búsqueda.
+
+    Se activa con LODERUNNER_PATH_WORKER=thread o =process. Como el momento en que termina una
+    búsqueda depende de la máquina, las partidas con trabajador no se pueden repetir con replay.py.
+    """
+    mode = os.environ.get('LODERUNNER_PATH_WORKER', '')  # '', 'thread' o 'process'
+    _executor = None  # Se crea con el primer pedido
+    _jobs = {}  # Baddie -> Future de su búsqueda en curso o terminada
+    _snapshot = None  # (Tile.version, bytes de Tile.props) de la última foto tomada
+    dropped = 0  # Resultados descartados por viejos (para medir)
+    failed = 0  # Búsquedas que terminaron con una excepción en el trabajador
+    FAILED = object()  # Lo que devuelve take() si la búsqueda falló: el baddie busca en el hilo del juego
+    expanded = 0  # Nodos expandidos por el trabajador (se suman en el hilo del juego, al tomar cada resultado)
+
+    @staticmethod
+    def enabled():
+        return PathWorker.mode in ('thread', 'process')
+
+    @staticmethod
+    def submit(baddie, start, goal, search_mode):
+        """
+        Pide en segundo plano el camino de `baddie` de `start` a `goal`, si no tiene uno en curso.
+        Si el trabajador ya no acepta pedidos (p.ej. su proceso murió), se apaga y el juego sigue
+        buscando en su propio hilo.
+        """
+        if baddie in PathWorker._jobs:
+            return
+        if PathWorker._executor is None:
+            executor = ProcessPoolExecutor if PathWorker.mode == 'process' else ThreadPoolExecutor
+            PathWorker._executor = executor(max_workers=1)
+        if PathWorker._snapshot is None or PathWorker._snapshot[0] != Tile.version:
+            PathWorker._snapshot = (Tile.version, bytes(Tile.props))  # Una copia por versión del terreno
+        version, props = PathWorker._snapshot
+        try:
+            PathWorker._jobs[baddie] = PathWorker._executor.submit(
+                search, props, Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT, version, start, goal, search_mode)
+        except RuntimeError as e:  # BrokenExecutor (hilo o proceso) o executor ya cerrado
+            print(f"Aviso: el trabajador de caminos no responde ({e}); sigo sin él")
+            PathWorker.mode = ''
+            PathWorker._executor = None
+            PathWorker._jobs.clear()
+
+    @staticmethod
+    def ready():
+        """
+        Devuelve los baddies cuya búsqueda ya terminó (sin esperar a las que siguen corriendo).
+        """
+        return [baddie for baddie, future in PathWorker._jobs.items() if future.done()]
+
+    @staticmethod
+    def take(baddie, start):
+        """
+        Si la búsqueda de `baddie` terminó, la saca y devuelve su camino; None si no terminó,
+        si no encontró camino o si el resultado es viejo (otro terreno u otra posición de partida).
+        Si la búsqueda lanzó una excepción devuelve PathWorker.FAILED: una falla del trabajador no
+        debe llegar a game_tick, así que el pedido se descarta y el baddie busca por su cuenta.
+        """
+        future = PathWorker._jobs.get(baddie)
+        if future is None or not future.done():
+            return None
+        del PathWorker._jobs[baddie]
+        try:
+            version, searched_from, path, expanded = future.result()
+        except Exception as e:  # Incluye CancelledError y BrokenProcessPool
+            PathWorker.failed += 1
+            if PathWorker.failed == 1:  # Una vez alcanza: la misma falla suele repetirse
+                print(f"Aviso: falló una búsqueda de camino en segundo plano: {e!r}")
+            return PathWorker.FAILED
+        PathWorker.expanded += expanded
+        if version != Tile.version or searched_from != start:
+            PathWorker.dropped += 1
+            return None
+        return path
+
+    @staticmethod
+    def cancel(baddie):
+        """
+        Olvida la búsqueda de `baddie` (p.ej. porque murió o el jugador no tiene vidas); si ya
+        estaba corriendo, su resultado se ignora.
+        """
+        future = PathWorker._jobs.pop(baddie, None)
+        if future is not None:
+            future.cancel()
@@ -0,0 +1,325 @@
+# Archivo: pathfinding.py
+
+import heapq  # Cola de prioridad para A*
+from bisect import bisect_left  # Columna con escalera más cercana, para la heurística de A*
+from collections import deque  # Cola para los BFS sobre el grafo de clusters
+from level_data import neighbors, strong_components
+from game_events import GameEvents
+from tiles import Tile
+from config import Config
+
+CLUSTER_SIZE = 8  # Lado (en celdas) de cada cluster del modo jerárquico
+
+
+class NavGraph:
+    """
+    Grafo de navegación de los baddies construido sobre Tile.props, con:
+    - la lista de movimientos posibles desde cada celda (misma regla que PathFinder),
+    - sus componentes fuertemente conexas y la condensación (level_data.Components), para
+      saber casi al instante si un objetivo es inalcanzable,
+    - un grafo de clusters de CLUSTER_SIZE x CLUSTER_SIZE con caminos abstractos cacheados
+      para el modo jerárquico.
+
+    Se mantiene uno solo (NavGraph.current()) y se actualiza con GameEvents.TERRAIN_CHANGED:
+    los movimientos se recalculan solo alrededor de las celdas que cambiaron y las
+    componentes/clusters se rehacen la próxima vez que se consultan.
+    """
+    _current = None  # Grafo del terreno actual
+    _dirty = set()  # Celdas cambiadas desde la última consulta
+    expanded = 0  # Nodos expandidos en el hilo del juego (presupuesto de AIScheduler, métricas)
+
+    @staticmethod
+    def current():
+        """
+        Devuelve el grafo del terreno actual, poniéndolo al día si el terreno cambió.
+        """
+        graph = NavGraph._current
+        if graph is None or len(graph.adj) != len(Tile.props) or graph.width != Config.LEVEL_WIDTH:
+            graph = NavGraph._current = NavGraph(Tile.props, Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT)
+            NavGraph._dirty = set()
+        elif NavGraph._dirty:
+            graph.update(NavGraph._dirty)
+            NavGraph._dirty = set()
+        return graph
+
+    @staticmethod
+    def seed(data):
+        """
+        Al cargar un nivel, arma el grafo actual con el grafo y las componentes que ya trae su
+        LevelData (calculados en la precarga o leídos de LevelCache), si el terreno sigue igual
+        al inicial. Si no (p.ej. ya se revelaron las escaleras), se calcula como siempre.
+        El grafo retiene a `data` mientras usa sus componentes, que pueden ser vistas del archivo
+        mapeado del caché (ver LevelCache.load).
+        """
+        if data.nav is not None and Tile.props == data.props:
+            NavGraph._current = NavGraph(Tile.props, data.width, data.height, data.nav, data.nav_components, owner=data)
+            NavGraph._dirty = set()
+
+    @staticmethod
+    def on_terrain_changed(version, cells):
+        # Suscriptor de TERRAIN_CHANGED: solo anoto qué cambió, el trabajo se hace al consultar
+        if cells is None:
+            NavGraph._current = None
+        else:
+            NavGraph._dirty.update(cells)
+
+    def __init__(self, props, width, height, adj=None, components=None, counted=True, owner=None):
+        self.props = props
+        # Si es False (el grafo de PathWorker) sus búsquedas no suman a NavGraph.expanded, que es
+        # del hilo del juego: solo a self.expanded, que lee quien lo usa
+        self.counted = counted
+        self.expanded = 0
+        self.width = width
+        self.height = height
+        if adj is None:
+            adj = [neighbors(props, index, width, height) for index in range(width * height)]
+        self.adj = list(adj)  # Copia: update() reemplaza entradas y `adj` puede ser el de un LevelData
+        self._components = components  # Si no vienen ya hechas, se calculan al primer uso
+        self._owner = owner  # Quien mantiene vivas las componentes recibidas (el LevelData del caché)
+        self._clusters = None
+        self._heuristics = {}  # Columna del objetivo -> tablas de heuristic(), hasta el próximo cambio de terreno
+
+    def update(self, cells):
+        """
+        Recalcula los movimientos afectados por el cambio de `cells`: una celda cambia su
+        propia navegabilidad, la de la celda de arriba (que se apoyaba en ella) y los
+        movimientos que entran desde sus vecinas.
+        """
+        width, size = self.width, len(self.adj)
+        touched = set()
+        for index in cells:
+            for center in (index, index - width):
+                if 0 <= center < size:
+                    touched.add(center)
+                    for other in (center - 1, center + 1, center - width, center + width):
+                        if 0 <= other < size:
+                            touched.add(other)
+        for index in touched:
+            self.adj[index] = neighbors(self.props, index, width, self.height)
+        self._components = None
+        self._owner = None
+        self._clusters = None
+        self._heuristics = {}
+
+    # --- Alcanzabilidad -------------------------------------------------------------
+
+    def _compute_components(self):
+        # Componentes y alcanzabilidad entre ellas (Tarjan, en level_data) sobre los destinos de cada celda
+        self._components = strong_components([[nxt for _, nxt in moves] for moves in self.adj])
+
+    def reachable(self, start, goal):
+        """
+        Dice si un baddie en `start` puede llegar a `goal` (índices). Después de calcular las
+        componentes cuesta un recorrido de la condensación por objetivo nuevo y O(1) los demás,
+        así que una búsqueda hacia un objetivo inalcanzable (p.ej. el jugador en un lugar donde
+        un baddie no puede estar) termina al instante.
+        """
+        if start == goal:
+            return False  # Ya está en el objetivo: no hay camino que buscar
+        if self._components is None:
+            self._compute_components()
+        return self._components.reaches(start, goal)
+
+    def has_move(self, start, target):
+        """
+        Dice si un baddie puede pasar en un solo movimiento de `start` a `target`.
+        """
+        return any(nxt == target for _, nxt in self.adj[start])
+
+    # --- BFS ------------------------------------------------------------------------
+
+    def bfs(self, start, goal):
+        """
+        Camino de `start` a `goal` con el mismo BFS que usaba PathFinder (mismo orden de
+        vecinos, primera vez que aparece el objetivo), pero guardando el camino completo.
+        Devuelve la lista de celdas (sin `start`, terminando en `goal`) o None.
+        """
+        adj = self.adj
+        came_from = {start: None}
+        queue = deque([start])
+        expanded = 0
+        while queue:
+            node = queue.popleft()
+            expanded += 1
+            for _, nxt in adj[node]:
+                if nxt in came_from:
+                    continue
+                came_from[nxt] = node
+                if nxt == goal:
+                    self._count(expanded)
+                    path = [goal]
+                    while came_from[path[-1]] != start:
+                        path.append(came_from[path[-1]])
+                    path.reverse()
+                    return path
+                queue.append(nxt)
+        self._count(expanded)
+        return None
+
+    # --- A* -------------------------------------------------------------------------
+
+    def heuristic(self, goal):
+        """
+        Cota inferior de los movimientos horizontales que faltan hasta `goal`, por columna:
+        devuelve (flat, climb), para celdas que no tienen que subir y para las que sí. Cada
+        movimiento cuesta 1 y mueve una celda, así que se parte de la distancia Manhattan y se le
+        suma lo que exigen las reglas verticales: bajar (cayendo o por escalera) no pide nada,
+        pero para subir hay que pasar por una columna desde la que se pueda subir (escalera o
+        cuerda); si no hay ninguna entre la celda y el objetivo, el rodeo hasta la más cercana se
+        cuenta ida y vuelta. Sigue siendo admisible, así que A* da caminos igual de cortos que el BFS.
+        Las tablas dependen solo de la columna del objetivo y se guardan hasta que cambie el terreno.
+        """
+        width = self.width
+        gx = goal % width
+        tables = self._heuristics.get(gx)
+        if tables is not None:
+            return tables
+        columns = self._heuristics.get('columns')
+        if columns is None:
+            columns = self._heuristics['columns'] = sorted({index % width for index, moves in enumerate(self.adj)
+                                                            for _, nxt in moves if nxt == index - width})
+        flat = [abs(x - gx) for x in range(width)]
+        climb = flat
+        if columns:  # Si nadie puede subir, el objetivo de arriba no se alcanza igual
+            climb = []
+            for x in range(width):
+                low, high = (x, gx) if x < gx else (gx, x)
+                i = bisect_left(columns, low)
+                if i < len(columns) and columns[i] <= high:
+                    climb.append(high - low)  # Hay por dónde subir en el camino
+                else:
+                    detour = min(columns[i] - high if i < len(columns) else width, low - columns[i - 1] if i else width)
+                    climb.append(high - low + 2 * detour)
+        tables = self._heuristics[gx] = (flat, climb)
+        return tables
+
+    def astar(self, start, goal, allowed=None):
+        """
+        Camino más corto de `start` a `goal` con A*: devuelve la lista de celdas (sin `start`,
+        terminando en `goal`) o None. La cota es heuristic(): Manhattan más el rodeo hasta una
+        escalera cuando hay que subir. Entre empates se prefiere la celda más cercana al
+        objetivo, lo que en pasillos, escaleras y caídas va casi en línea recta.
+        `allowed`, si se da, es el conjunto de clusters por los que se puede pasar.
+        """
+        width = self.width
+        gy = goal // width
+        flat, climb = self.heuristic(goal)
+        adj = self.adj
+        cluster = self._cluster_of if allowed is not None else None
+        best = {start: 0}
+        came_from = {}
+        y = start // width
+        h = (climb if y > gy else flat)[start - y * width] + abs(y - gy)
+        heap = [(h, h, 0, start)]  # (f, h, g, celda): a igual f sale primero la de menor h
+        expanded = 0
+        while heap:
+            _, _, g, node = heapq.heappop(heap)
+            if g > best[node]:
+                continue  # Entrada vieja: ya encontré un camino mejor a este nodo
+            expanded += 1
+            if node == goal:
+                break
+            for _, nxt in adj[node]:
+                if cluster is not None and cluster(nxt) not in allowed:
+                    continue
+                cost = g + 1
+                if cost < best.get(nxt, cost + 1):
+                    best[nxt] = cost
+                    came_from[nxt] = node
+                    y = nxt // width
+                    h = (climb if y > gy else flat)[nxt - y * width] + abs(y - gy)
+                    heapq.heappush(heap, (cost + h, h, cost, nxt))
+        else:
+            self._count(expanded)
+            return None
+        self._count(expanded)
+        path = [goal]
+        while came_from[path[-1]] != start:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    def _count(self, expanded):
+        # Suma los nodos de una búsqueda a este grafo y, si corre en el hilo del juego, al total de clase
+        self.expanded += expanded
+        if self.counted:
+            NavGraph.expanded += expanded
+
+    # --- Modo jerárquico ------------------------------------------------------------
+
+    def _cluster_of(self, index):
+        return (index % self.width) // CLUSTER_SIZE + (index // self.width) // CLUSTER_SIZE * self._clusters_x
+
+    def _compute_clusters(self):
+        # Grafo de clusters: hay arista A -> B si algún movimiento cruza de A a B
+        self._clusters_x = (self.width + CLUSTER_SIZE - 1) // CLUSTER_SIZE
+        links = {}
+        for index, moves in enumerate(self.adj):
+            here = self._cluster_of(index)
+            for _, nxt in moves:
+                there = self._cluster_of(nxt)
+                if there != here:
+                    links.setdefault(here, set()).add(there)
+        self._clusters = (links, {})  # (aristas, caché de caminos abstractos)
+
+    def abstract_path(self, start_cluster, goal_cluster):
+        """
+        Camino de clusters (BFS sobre el grafo de clusters) de `start_cluster` a `goal_cluster`,
+        cacheado hasta el próximo cambio de terreno. None si no hay.
+        """
+        if self._clusters is None:
+            self._compute_clusters()
+        links, cache = self._clusters
+        key = (start_cluster, goal_cluster)
+        if key not in cache:
+            came_from = {start_cluster: None}
+            queue = deque([start_cluster])
+            while queue:
+                here = queue.popleft()
+                if here == goal_cluster:
+                    break
+                for there in links.get(here, ()):
+                    if there not in came_from:
+                        came_from[there] = here
+                        queue.append(there)
+            if goal_cluster in came_from:
+                path = [goal_cluster]
+                while came_from[path[-1]] is not None:
+                    path.append(came_from[path[-1]])
+                cache[key] = path[::-1]
+            else:
+                cache[key] = None
+        return cache[key]
+
+    def hierarchical(self, start, goal):
+        """
+        Busca primero un camino de clusters y luego corre A* solo dentro de esos clusters
+        (y sus vecinos, para no quedar encerrado por la forma del corredor). Si el corredor no
+        alcanza a nivel de celdas, repite A* sobre todo el mapa.
+        """
+        if self._clusters is None:
+            self._compute_clusters()
+        corridor = self.abstract_path(self._cluster_of(start), self._cluster_of(goal))
+        if corridor is None:
+            return None
+        links = self._clusters[0]
+        allowed = set(corridor)
+        for cluster in corridor:
+            allowed.update(links.get(cluster, ()))
+        return self.astar(start, goal, allowed) or self.astar(start, goal)
+
+    def find(self, start, goal, mode='astar'):
+        """
+        Camino de `start` a `goal` según `mode` ('bfs', 'astar' o 'hierarchical'), o None
+        (sin buscar) si el objetivo es inalcanzable.
+        """
+        if not self.reachable(start, goal):
+            return None
+        if mode == 'bfs':
+            return self.bfs(start, goal)
+        if mode == 'hierarchical':
+            return self.hierarchical(start, goal)
+        return self.astar(start, goal)
+
+
+GameEvents.subscribe(GameEvents.TERRAIN_CHANGED, NavGraph.on_terrain_changed)
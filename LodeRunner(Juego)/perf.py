@@ -0,0 +1,327 @@
+# Archivo: perf.py
+
+import os, io, gc, sys, json, time, random  # json para los resultados, time.perf_counter para medir
+import statistics  # Mediana y desvío absoluto de las muestras
+import subprocess  # Para preguntarle a git en qué commit estamos
+import contextlib  # Para callar los print del juego mientras se mide
+
+RESULTS_DIR = 'perf_results'  # Carpeta (junto a 'levels') con un JSON por commit y el baseline
+BASELINE = 'baseline.json'
+MIN_CHANGE = 0.05  # Cambio relativo mínimo para hablar de regresión o mejora, aunque el ruido sea menor
+NOISE_FACTOR = 3.0  # Cuántas veces el ruido relativo (MAD) tiene que superar el cambio para contarlo
+LIVES = 50  # Vidas del jugador en los escenarios, como en MemoryProfiler.soak: muchas, pero no infinitas
+
+
+def _quiet():
+    # Los escenarios cargan niveles y pierden vidas: sus print no deben mezclarse con el informe
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _headless_level(level):
+    # Nivel cargado sin ventana y con LIVES vidas. No se le dan infinitas: reaparecer sobre un baddie
+    # lo vuelve a matar enseguida, y con vidas de sobra eso termina en RecursionError
+    import main  # Import diferido: main carga todo el juego
+    from drawable import Drawable
+    from characters import Player
+    Drawable.headless = True
+    random.seed(0)
+    Player.main = None
+    main.load_level(level)
+    Player.main.lives = LIVES
+    return main
+
+
+def _walk_key(tick):
+    # Recorrido fijo del jugador: de un lado a otro, una tecla cada 15 ticks
+    return ('Left' if tick // 200 % 2 else 'Right') if tick % 15 == 0 else None
+
+
+class Scenario:
+    """
+    Un caso de medición: `setup()` prepara todo (sin medir) y devuelve la función que se mide;
+    `ops` dice cuántas operaciones (ticks, cargas, frames) hace cada medición, para informar
+    también la tasa. Si la función devuelve cuántas hizo de verdad y son menos (p.ej. el jugador
+    llegó a la salida), la medición no vale. `modules` son los archivos cuyo código ejercita.
+    """
+    scenarios = []  # Todos los escenarios registrados, en orden
+
+    def __init__(self, name, ops, unit, modules, setup):
+        self.name = name
+        self.ops = ops
+        self.unit = unit
+        self.modules = modules
+        self.setup = setup
+        Scenario.scenarios.append(self)
+
+    @staticmethod
+    def find(names):
+        """
+        Los escenarios con esos nombres (todos si `names` está vacío).
+        """
+        if not names:
+            return list(Scenario.scenarios)
+        return [scenario for scenario in Scenario.scenarios if scenario.name in names]
+
+
+def _setup_level_load():
+    from drawable import Drawable
+    import main
+    Drawable.headless = True
+
+    def run():
+        for level in main.LEVELS:
+            main.load_level(level)
+    _headless_level(1)  # Calienta imports y el caché de niveles
+    return run
+
+
+def _setup_ai_ticks(count=60, ticks=600):
+    def setup():
+        from tiles import Tile
+        from config import Config
+        from characters import Baddie, Player
+        from level_data import navigable
+        import util
+        main = _headless_level(1)
+        rng = random.Random(0)
+        width, height = Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT
+        places = [index for index in range(width * height) if navigable(Tile.props, index, width, height)]
+        for _ in range(count):
+            Baddie(*util.coord(rng.choice(places)))
+
+        def run():
+            player = Player.main
+            done = 0
+            try:
+                for tick in range(ticks):
+                    if player.at_exit():
+                        break
+                    player.lives = LIVES  # Con 60 baddies se pierden más de LIVES vidas en la corrida
+                    main.game_tick(_walk_key(tick))
+                    done += 1
+            except SystemExit:
+                pass  # Más de LIVES muertes en un solo tick (GameOver): measure() rechaza la medición corta
+            return done
+        return run
+    return setup
+
+
+def _setup_replay(ticks=3000):
+    def setup():
+        from replay import Recorder, Replay
+        from characters import Player
+        main = _headless_level(1)
+        # Sesión grabada en memoria con teclas al azar (semilla fija), siempre la misma
+        Recorder.start_session(seed=5)
+        random.seed(5)
+        Player.main = None
+        main.load_level(1)
+        Player.main.lives = LIVES
+        Recorder.start_level(1)
+        keys = random.Random(1)
+        choices = ['Left', 'Right', 'Up', 'Down', 'z', 'c', None, None, None]
+        try:
+            for tick in range(ticks):
+                key = keys.choice(choices) if tick % 9 == 0 else None
+                Recorder.record(key)
+                main.game_tick(key)
+        except SystemExit:
+            pass
+        Recorder.end_level()
+        segment = Recorder._session['levels'][0]
+        seed = Recorder._session['seed']
+        Recorder._session = None
+
+        def run():
+            replay = Replay(segment, seed)
+            replay.run()  # Perder la última vida solo termina la repetición (Replay.step)
+            return replay.tick
+        return run
+    return setup
+
+
+def _setup_render_burst(count=150, frames=120):
+    def setup():
+        from drawable import Drawable
+        from config import Config
+        import main
+        Drawable.headless = False
+        try:
+            main.load_level(1)  # Abre (o reusa) la ventana; sin pantalla falla y el escenario se omite
+        except Exception as e:
+            Drawable.headless = True
+            raise RuntimeError(f"sin ventana ({e})")
+        width = Config.LEVEL_WIDTH - 1
+        sprites = [Drawable((slot % width, slot // width % Config.LEVEL_HEIGHT), 't_red.png') for slot in range(count)]
+        for sprite in sprites:
+            sprite.draw()
+        window = Drawable._window
+
+        def run():
+            for frame in range(frames):
+                step = 1 if frame % 2 == 0 else -1
+                for sprite in sprites:
+                    sprite.move_img(step, 0)
+                Drawable.render()
+                window.update()
+        return run
+    return setup
+
+
+Scenario('carga_nivel', 2, 'niveles', ['level_data.py', 'level_cache.py', 'tiles.py', 'characters.py', 'event.py'],
+         _setup_level_load)
+Scenario('ia_60_baddies', 600, 'ticks', ['characters.py', 'event.py', 'pathfinding.py', 'ai_scheduler.py'],
+         _setup_ai_ticks())
+Scenario('replay_largo', 3000, 'ticks', ['replay.py', 'snapshot.py', 'characters.py', 'event.py', 'tiles.py'],
+         _setup_replay())
+Scenario('render_rafaga', 120, 'frames', ['drawable.py', 'graphics.py'],
+         _setup_render_burst())
+
+
+def git_commit():
+    """
+    Commit actual (hash corto), con '-dirty' si hay cambios sin commitear; 'sin-git' si no hay repo.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no', '--', '.'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'sin-git'
+    return commit + ('-dirty' if dirty else '')
+
+
+def measure(scenario, repeat=7, warmup=1):
+    """
+    Corre `scenario` `warmup` + `repeat` veces (cada una con su propio setup) y devuelve sus
+    estadísticas: muestras en segundos, mediana, MAD (desvío absoluto mediano) y tasa por segundo.
+    """
+    samples = []
+    for attempt in range(warmup + repeat):
+        with _quiet():
+            run = scenario.setup()
+            gc.collect()  # Que la basura del setup no se cobre dentro de la medición
+            start = time.perf_counter()
+            done = run()
+            elapsed = time.perf_counter() - start
+        if done is not None and done < scenario.ops:
+            # Terminó antes (sin vidas, en la salida): sería más rápida sin ser comparable
+            raise RuntimeError(f"la medición terminó antes: {done} de {scenario.ops} {scenario.unit}")
+        if attempt >= warmup:
+            samples.append(elapsed)
+    median = statistics.median(samples)
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    return {
+        'samples': samples,
+        'median': median,
+        'mad': mad,
+        'rate': scenario.ops / median if median > 0 else 0.0,
+        'unit': scenario.unit,
+        'modules': scenario.modules,
+    }
+
+
+def run_all(names=(), repeat=7):
+    """
+    Mide los escenarios pedidos (todos si no se dice) y devuelve el resultado completo del commit actual.
+    """
+    results = {}
+    for scenario in Scenario.find(names):
+        try:
+            results[scenario.name] = measure(scenario, repeat)
+        except Exception as e:
+            print(f"{scenario.name}: omitido, {e}")
+            continue
+        stats = results[scenario.name]
+        print(f"{scenario.name:>15}: {stats['median'] * 1000:9.2f} ms ± {stats['mad'] * 1000:.2f} "
+              f"({stats['rate']:.0f} {scenario.unit}/s)")
+    return {
+        'commit': git_commit(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+
+def save(report, as_baseline=False):
+    """
+    Guarda `report` en perf_results/<commit>.json (y como baseline si se pide). Devuelve la ruta.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    paths = [os.path.join(RESULTS_DIR, f"{report['commit']}.json")]
+    if as_baseline:
+        paths.append(os.path.join(RESULTS_DIR, BASELINE))
+    for path in paths:
+        with open(path, 'w') as file_data:
+            json.dump(report, file_data, indent=1)
+    return paths[0]
+
+
+def load(name):
+    """
+    Lee un resultado guardado: 'baseline', un commit o la ruta de un JSON.
+    """
+    if os.path.exists(name):
+        path = name
+    elif name == 'baseline':
+        path = os.path.join(RESULTS_DIR, BASELINE)
+    else:
+        path = os.path.join(RESULTS_DIR, f'{name}.json')
+    with open(path) as file_data:
+        return json.load(file_data)
+
+
+def compare(base, current):
+    """
+    Compara dos resultados escenario por escenario. Un cambio de mediana cuenta si supera a la vez
+    MIN_CHANGE y NOISE_FACTOR veces el ruido relativo (el mayor MAD / mediana de las dos mediciones).
+    Imprime el informe y devuelve los nombres de los escenarios que empeoraron.
+    """
+    print(f"Comparando {current['commit']} contra {base['commit']} ({base['time']})")
+    regressions = []
+    for name, now in current['results'].items():
+        before = base['results'].get(name)
+        if before is None:
+            print(f"{name:>15}: nuevo, sin baseline")
+            continue
+        change = now['median'] / before['median'] - 1
+        noise = max(before['mad'] / before['median'], now['mad'] / now['median'])
+        threshold = max(MIN_CHANGE, NOISE_FACTOR * noise)
+        if change > threshold:
+            verdict = 'REGRESIÓN'
+            regressions.append(name)
+        elif change < -threshold:
+            verdict = 'mejora'
+        else:
+            verdict = 'igual (dentro del ruido)'
+        print(f"{name:>15}: {before['median'] * 1000:9.2f} -> {now['median'] * 1000:9.2f} ms "
+              f"({change:+.1%}, umbral ±{threshold:.1%}) {verdict}")
+        if verdict == 'REGRESIÓN':
+            print(f"{'':>15}  ejercita: {', '.join(now['modules'])}")
+    for name in base['results']:
+        if name not in current['results']:
+            print(f"{name:>15}: no se midió esta vez")
+    print(f"{len(regressions)} regresiones" if regressions else "Sin regresiones")
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Mide escenarios fijos de rendimiento y los compara con un baseline.')
+    parser.add_argument('scenarios', nargs='*', help=f"Escenarios a medir (todos: {', '.join(s.name for s in Scenario.scenarios)})")
+    parser.add_argument('--repeat', type=int, default=9, help='Mediciones por escenario')
+    parser.add_argument('--against', default='baseline', help="Con qué comparar: 'baseline', un commit o un JSON")
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar esta medición como el nuevo baseline')
+    options = parser.parse_args()
+    import perf  # Uso el módulo importado, como crowd.py, para que el juego vea las mismas clases
+    report = perf.run_all(options.scenarios, options.repeat)
+    print(f"Resultados en {perf.save(report, options.save_baseline)}")
+    if options.save_baseline:
+        sys.exit(0)
+    try:
+        base = perf.load(options.against)
+    except (OSError, ValueError) as e:
+        print(f"No hay con qué comparar ({e}); guardá uno con --save-baseline")
+        sys.exit(0)
+    sys.exit(1 if perf.compare(base, report) else 0)
@@ -0,0 +1,227 @@
+# Archivo: replay.py
+
+import os, sys, json, time, random  # json para el log, time para medir y nombrar archivos, random para la semilla
+from config import Config
+from drawable import Drawable
+from tiles import Gold
+from characters import Player, Baddie
+from snapshot import Snapshot
+
+LOG_VERSION = 4  # Versión del formato del log; si cambia, las repeticiones viejas no se aceptan
+REPLAY_DIR = 'replays'  # Carpeta (junto a 'levels') donde guardo las sesiones grabadas
+CHECKPOINT_EVERY = 600  # Cada cuántos ticks guardo un punto de control para poder saltar (10 s a 60 FPS)
+
+
+def state_digest():
+    """
+    Resume el estado de la partida en un diccionario serializable a JSON.
+    Es lo que se compara al final de una repetición para saber si coincide con la sesión original.
+    """
+    player = Player.main
+    return {
+        'player': list(player.pos()) if player else None,
+        'lives': player.lives if player else 0,
+        'coins': player.get_coins_collected() if player else 0,
+        'gold_left': Gold._num_gold,
+        'baddies': [list(baddie.pos()) for baddie in Baddie.baddies],
+        'hidden_revealed': Config.hidden_flag,
+    }
+
+
+class Recorder:
+    """
+    Graba la sesión en curso: semilla, y por cada nivel jugado las vidas y monedas iniciales,
+    las teclas aplicadas en cada tick (solo los ticks con tecla, para que el log sea compacto)
+    y el estado final.
+    """
+    _session = None  # Diccionario de la sesión que se está grabando
+    _segment = None  # Tramo del nivel actual dentro de la sesión
+
+    @staticmethod
+    def start_session(seed=None):
+        """
+        Empieza a grabar una sesión nueva. La semilla sale de LODERUNNER_SEED o del reloj,
+        y se usa para inicializar `random` y que la repetición sea idéntica.
+        """
+        if seed is None:
+            seed = int(os.environ.get('LODERUNNER_SEED', time.time_ns() % 2 ** 32))
+        random.seed(seed)
+        Recorder._session = {'version': LOG_VERSION, 'seed': seed, 'levels': []}
+        Recorder._segment = None
+
+    @staticmethod
+    def start_level(level_num):
+        """
+        Abre el tramo de un nivel recién cargado, guardando el estado con el que empieza.
+        """
+        if Recorder._session is None:
+            return  # No hay sesión grabándose
+        Recorder.end_level()  # Cierro el tramo anterior si quedó abierto
+        player = Player.main
+        Recorder._segment = {
+            'level': level_num,
+            'lives': player.lives,
+            'coins': player.get_coins_collected(),
+            'start': list(player.pos()),
+            'ticks': 0,
+            'inputs': [],
+        }
+        Recorder._session['levels'].append(Recorder._segment)
+
+    @staticmethod
+    def record(key):
+        """
+        Registra el tick actual y, si hubo, la tecla que se aplicó en él.
+        """
+        segment = Recorder._segment
+        if segment is None:
+            return
+        if key:
+            segment['inputs'].append([segment['ticks'], key])
+        segment['ticks'] += 1
+
+    @staticmethod
+    def end_level():
+        """
+        Cierra el tramo del nivel actual guardando el estado final para verificarlo al repetir.
+        """
+        if Recorder._segment is not None:
+            Recorder._segment['end'] = state_digest()
+            Recorder._segment = None
+
+    @staticmethod
+    def save(path=None):
+        """
+        Escribe la sesión a disco (por defecto en replays/session-<fecha>.json) y devuelve la ruta.
+        """
+        if Recorder._session is None or not Recorder._session['levels']:
+            return None  # Nada que guardar
+        Recorder.end_level()
+        if path is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            path = os.path.join(REPLAY_DIR, time.strftime('session-%Y%m%d-%H%M%S.json'))
+        with open(path, 'w') as file_data:
+            json.dump(Recorder._session, file_data, separators=(',', ':'))
+        print(f"Sesión grabada en {path}")
+        return path
+
+
+class Replay:
+    """
+    Re-simula sin ventana el tramo de un nivel grabado por Recorder, tan rápido como dé la CPU.
+    Guarda puntos de control cada `checkpoint_every` ticks para poder hacer seek().
+    """
+
+    def __init__(self, segment, seed=0, checkpoint_every=CHECKPOINT_EVERY):
+        self.segment = segment
+        self.seed = seed
+        self.inputs = {tick: key for tick, key in segment['inputs']}
+        self.checkpoint_every = checkpoint_every
+        self.checkpoints = {}  # tick -> Snapshot
+        self.tick = 0
+        self.finished = False
+        self._load()
+
+    def _load(self):
+        # Cargo el nivel sin ventana y dejo al jugador como estaba al empezar el tramo
+        import main  # Import diferido: main importa este módulo para grabar
+        Drawable.headless = True
+        random.seed(self.seed)
+        Player.main = None  # El jugador de la repetición se crea desde cero
+        main.load_level(self.segment['level'])
+        player = Player.main
+        player.lives = self.segment['lives']
+        player._coins_collected = self.segment['coins']
+        if list(player.pos()) != self.segment['start']:
+            player.respawn()  # En niveles posteriores al primero el juego lo hace reaparecer (y caer)
+        self.checkpoints[0] = Snapshot.take()
+
+    def step(self):
+        """
+        Simula un tick con la tecla grabada para él. Perder la última vida o pulsar 'q'
+        llaman a exit(); aquí eso solo marca el final de la repetición.
+        """
+        import main
+        try:
+            main.game_tick(self.inputs.get(self.tick))
+        except SystemExit:
+            self.finished = True
+        self.tick += 1
+        if self.tick >= self.segment['ticks'] or Player.main.at_exit():
+            self.finished = True
+        elif self.tick % self.checkpoint_every == 0 and self.tick not in self.checkpoints:
+            self.checkpoints[self.tick] = Snapshot.take()
+
+    def run(self, until=None):
+        """
+        Simula hasta el tick `until` (o hasta el final del tramo) y devuelve los ticks simulados.
+        """
+        until = self.segment['ticks'] if until is None else min(until, self.segment['ticks'])
+        start = self.tick
+        while not self.finished and self.tick < until:
+            self.step()
+        return self.tick - start
+
+    def seek(self, tick):
+        """
+        Salta al tick `tick`: restaura el punto de control más cercano anterior y simula desde ahí.
+        """
+        base = max(t for t in self.checkpoints if t <= tick)
+        if base > self.tick or tick < self.tick or self.finished:
+            self.checkpoints[base].restore()
+            self.tick = base
+            self.finished = False
+        self.run(until=tick)
+
+    def matches(self):
+        """
+        Devuelve True si el estado actual coincide con el estado final grabado.
+        """
+        return state_digest() == self.segment.get('end')
+
+
+def load_session(path):
+    """
+    Lee una sesión grabada y comprueba que su formato sea compatible.
+    """
+    with open(path) as file_data:
+        session = json.load(file_data)
+    if session.get('version') != LOG_VERSION:
+        raise ValueError(f"Versión de log no soportada: {session.get('version')}")
+    return session
+
+
+def replay_session(session, seek=None, checkpoint_every=CHECKPOINT_EVERY):
+    """
+    Repite todos los tramos de una sesión, imprime la velocidad de simulación y
+    devuelve True si todos terminan en el mismo estado que el original.
+    """
+    all_ok = True
+    for segment in session['levels']:
+        replay = Replay(segment, session['seed'], checkpoint_every)
+        start = time.perf_counter()
+        ticks = replay.run()
+        elapsed = time.perf_counter() - start
+        ok = replay.matches()
+        all_ok = all_ok and ok
+        rate = ticks / elapsed if elapsed > 0 else float('inf')
+        print(f"Nivel {segment['level']}: {ticks} ticks en {elapsed:.3f} s ({rate:.0f} ticks/s) -> {'OK' if ok else 'DISTINTO'}")
+        if not ok:
+            print(f"  esperado: {segment.get('end')}")
+            print(f"  obtenido: {state_digest()}")
+        if seek is not None:
+            start = time.perf_counter()
+            replay.seek(seek)
+            elapsed = time.perf_counter() - start
+            print(f"  seek a tick {replay.tick} en {elapsed * 1000:.2f} ms")
+    return all_ok
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Repite sin ventana una sesión grabada de LodeRunner.')
+    parser.add_argument('session', help='Archivo .json grabado en replays/')
+    parser.add_argument('--seek', type=int, default=None, help='Tick al que saltar después de cada tramo')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY, help='Ticks entre puntos de control')
+    options = parser.parse_args()
+    sys.exit(0 if replay_session(load_session(options.session), options.seek, options.checkpoint_every) else 1)
@@ -0,0 +1,108 @@
+# Archivo: runtime.py
+
+import asyncio  # Bucle de eventos: el pump de Tk, el tick lógico y las tareas de fondo son corrutinas
+from drawable import Drawable
+from cpuprof import CpuProfiler
+
+
+class Runtime:
+    """
+    Runtime asíncrono del juego. En lugar de un while que mezcla checkKey(), la lógica y
+    time.sleep(), cada cosa es una corrutina en el mismo bucle de asyncio:
+    - tk_pump(): procesa los eventos de Tk y redibuja la ventana PUMP_INTERVAL veces por segundo,
+    - el bucle del juego (main.main_game_loop): un tick lógico por frame y `await` en las esperas,
+    - las tareas de fondo que se registren con spawn() o every().
+    Como las esperas son `await`, la ventana sigue respondiendo mientras se muestra un cartel
+    o se espera una tecla, y nada del juego se ejecuta en otro hilo que Tk.
+    """
+    PUMP_INTERVAL = 1 / 120  # Segundos entre dos pasadas del pump de Tk
+    pumps = 0  # Pasadas del pump hechas (la primera marca que la ventana ya se dibujó)
+    _tasks = []  # Tareas de fondo, se cancelan al terminar el juego
+
+    @staticmethod
+    def run(game):
+        """
+        Corre la corrutina `game` junto al pump de Tk hasta que termine, y devuelve su resultado.
+        """
+        Drawable.async_mode = True  # Drawable.lost()/won() dejan las esperas al runtime
+        try:
+            return asyncio.run(Runtime._main(game))
+        finally:
+            Drawable.async_mode = False
+
+    @staticmethod
+    async def _main(game):
+        pump = asyncio.ensure_future(Runtime.tk_pump())
+        try:
+            return await game
+        finally:
+            pump.cancel()
+            for task in Runtime._tasks:
+                task.cancel()
+            Runtime._tasks = []
+
+    @staticmethod
+    def pump():
+        """
+        Una pasada del pump: ubica los sprites que se movieron, procesa eventos de Tk (teclas,
+        cierre) y redibuja lo pendiente.
+        """
+        window = Drawable._window
+        if window is not None and not window.isClosed():
+            CpuProfiler.call(Drawable.render)  # Un coords() por personaje que se movió desde la pasada anterior
+            window.update()
+            Runtime.pumps += 1
+
+    @staticmethod
+    async def tk_pump():
+        # Corrutina del pump: mantiene la ventana viva aunque la lógica esté esperando
+        while True:
+            Runtime.pump()
+            await asyncio.sleep(Runtime.PUMP_INTERVAL)
+
+    @staticmethod
+    def poll_key():
+        """
+        Devuelve la última tecla que recibió la ventana (o None) y la consume. A diferencia de
+        GraphWin.checkKey() no llama a update(): de eso se encarga el pump.
+        """
+        window = Drawable._window
+        if window is None or window.isClosed():
+            return None
+        key, window.lastKey = window.lastKey, ""
+        return key or None
+
+    @staticmethod
+    async def wait_key():
+        """
+        Espera (sin bloquear el bucle) a que se pulse una tecla o se cierre la ventana, y la devuelve.
+        """
+        Runtime.poll_key()  # Descarto lo que se haya pulsado antes de empezar a esperar
+        while True:
+            window = Drawable._window
+            if window is None or window.isClosed():
+                return None
+            key = Runtime.poll_key()
+            if key:
+                return key
+            await asyncio.sleep(Runtime.PUMP_INTERVAL)
+
+    @staticmethod
+    def spawn(coroutine):
+        """
+        Lanza `coroutine` como tarea de fondo; se cancela sola cuando termina el juego.
+        """
+        task = asyncio.ensure_future(coroutine)
+        Runtime._tasks.append(task)
+        return task
+
+    @staticmethod
+    def every(seconds, func, *args):
+        """
+        Tarea de fondo que llama a `func(*args)` cada `seconds` segundos (p.ej. exportar métricas).
+        """
+        async def repeat():
+            while True:
+                await asyncio.sleep(seconds)
+                func(*args)
+        return Runtime.spawn(repeat())
@@ -0,0 +1,105 @@
+# Archivo: snapshot.py
+
+from config import Config
+from drawable import Drawable
+from tiles import Tile, Gold, HiddenLadder
+from characters import Player, Baddie
+from event import Event
+from ai_scheduler import AIScheduler
+
+
+class Snapshot:
+    """
+    Foto del estado de la partida: grilla de tiles, oro restante, escaleras ocultas,
+    posiciones de los personajes, vidas y cola de eventos pendientes.
+
+    Tomarla es barato porque solo guardo referencias: los tiles no se modifican por dentro
+    salvo al ocultarse/mostrarse (y de esos llevo la lista en Tile._hidden_tiles), así que
+    basta copiar la lista del nivel y la de tiles ocultos. Restaurarla tampoco recarga nada:
+    solo deshace las diferencias con el estado actual. Sirve para reintentar un nivel,
+    saltar dentro de una repetición o simular jugadas por adelantado.
+    """
+
+    @staticmethod
+    def take():
+        """
+        Toma una foto del estado actual y la devuelve.
+        """
+        return Snapshot()
+
+    def __init__(self):
+        self._grid = Tile.level  # La lista viva del nivel: Tile.load_level crea otra en cada carga
+        self._level = list(Tile.level)  # Referencias a los tiles (Gold se reemplaza por Empty al tomarla)
+        self._hidden_tiles = tuple(Tile._hidden_tiles)  # Tiles cavados o escaleras aún ocultas
+        self._num_gold = Gold._num_gold
+        self._hidden_ladders = tuple(HiddenLadder._hidden)
+        self._hidden_flag = Config.hidden_flag
+        player = Player.main
+        self._player = (player, player._x, player._y, player.lives, player._coins_collected) if player else None
+        self._baddies = tuple((baddie, baddie._x, baddie._y, list(baddie.route), baddie.route_extensions)
+                              for baddie in Baddie.baddies)
+        self._queue = {frame: list(events) for frame, events in Event._queue.items()}
+        self._frame = Event._frame
+        self._pending = tuple(AIScheduler._pending)
+
+    def restore(self):
+        """
+        Deja la partida exactamente como estaba al tomar la foto, redibujando solo lo que cambió
+        (tiles, personajes y los contadores de vidas y monedas del HUD).
+        """
+        # Tiles reemplazados (monedas tomadas): cambio la grilla y, si hay ventana, las imágenes
+        current = Tile.level
+        if current is not self._grid:
+            raise ValueError("La foto es de otro nivel; solo se puede restaurar en el nivel donde se tomó")
+        Tile.batch_terrain_changes()  # Todo lo que cambie al restaurar se notifica como un solo cambio
+        for idx, (old, now) in enumerate(zip(self._level, current)):
+            if old is not now:
+                now.undraw()
+                current[idx] = old
+                if old not in self._hidden_tiles:
+                    old.draw()
+                Tile.terrain_changed((idx,))
+
+        # Tiles ocultos: muestro los que no estaban ocultos y vuelvo a ocultar los que sí
+        for tile in list(Tile._hidden_tiles):
+            if tile not in self._hidden_tiles:
+                tile.show()
+        for tile in self._hidden_tiles:
+            if tile not in Tile._hidden_tiles:
+                tile.hide()
+        Tile.flush_terrain_changes()
+
+        Gold._num_gold = self._num_gold
+        HiddenLadder._hidden = list(self._hidden_ladders)
+        Config.hidden_flag = self._hidden_flag
+
+        # Personajes: muevo cada imagen de una sola vez a la posición guardada
+        if self._player:
+            player, x, y, lives, coins = self._player
+            Player.main = player
+            player.move_img(x - player._x, y - player._y)
+            player._x, player._y = x, y
+            player.lives = lives
+            Drawable.update_lives_display(lives)  # El HUD descarta el valor si no cambió
+            if coins != player._coins_collected:
+                Drawable.draw_coin_counter(coins)  # Si no cambió no lo toco: sin monedas no se muestra
+            player._coins_collected = coins
+        alive = [baddie for baddie, *_ in self._baddies]
+        for baddie in Baddie.baddies:
+            if baddie not in alive:
+                baddie.undraw()  # Nació después de la foto
+        for baddie, x, y, route, extensions in self._baddies:
+            baddie.move_img(x - baddie._x, y - baddie._y)
+            baddie._x, baddie._y = x, y
+            baddie.route = list(route)  # Camino cacheado: se revalida porque el terreno pudo cambiar
+            baddie.route_version = -1
+            baddie.route_extensions = extensions
+            if baddie not in Baddie.baddies:
+                baddie.draw()  # Había muerto después de la foto
+        Baddie.baddies = alive
+
+        # Eventos pendientes: copio las listas porque Event las modifica en su sitio
+        Event._queue = {frame: list(events) for frame, events in self._queue.items()}
+        Event._frame = self._frame
+        AIScheduler._pending.clear()
+        AIScheduler._pending.extend(self._pending)
@@ -0,0 +1,54 @@
+# Archivo: tests/conftest.py
+
+import os, sys, random
+import pytest
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Carpeta del juego (la de 'levels')
+sys.path.insert(0, GAME_DIR)
+os.environ.setdefault('LODERUNNER_LEVEL_CACHE', '0')  # Las pruebas no escriben en cache/ (test_level_cache lo activa)
+
+
+@pytest.fixture(autouse=True)
+def game_dir(monkeypatch):
+    # El juego abre 'levels/...' y 'graphics/...' con rutas relativas, y todo corre sin ventana
+    from drawable import Drawable
+    monkeypatch.chdir(GAME_DIR)
+    monkeypatch.setattr(Drawable, 'headless', True)
+    return GAME_DIR
+
+
+@pytest.fixture
+def level():
+    """
+    Carga un nivel sin ventana con el jugador recién creado y la semilla fija; devuelve main.
+    """
+    def load(num=1, seed=0, lives=50):
+        import main
+        from characters import Player
+        random.seed(seed)
+        Player.main = None
+        main.load_level(num)
+        Player.main.lives = lives  # Muchas, pero no infinitas: reaparecer sobre un baddie vuelve a matarlo
+        return main
+    return load
+
+
+def play(main, ticks, seed=1, record=None):
+    """
+    Juega `ticks` ticks con teclas al azar (semilla `seed`), llamando a `record(key)` antes de
+    cada uno si se da. Devuelve los ticks jugados: menos si se llegó a la salida o se perdió.
+    """
+    from characters import Player
+    keys = random.Random(seed)
+    choices = ['Left', 'Right', 'Up', 'Down', 'z', 'c', None, None, None]
+    for tick in range(ticks):
+        if Player.main.at_exit():
+            return tick
+        key = keys.choice(choices) if tick % 9 == 0 else None
+        if record is not None:
+            record(key)
+        try:
+            main.game_tick(key)
+        except SystemExit:
+            return tick + 1
+    return ticks
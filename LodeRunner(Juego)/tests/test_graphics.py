@@ -0,0 +1,107 @@
+# Archivo: tests/test_graphics.py
+
+import zlib, struct, base64, tkinter
+import pytest
+
+import graphics
+
+tcl = tkinter.Tcl()  # Solo el intérprete (sin ventana), para splitlist
+
+
+class FakePhoto:
+    """
+    Lo que Image usa de un PhotoImage, sobre una lista de píxeles RGBA: 'data' compone con el
+    fondo pedido y redondea como Tk, put() pinta píxeles opacos.
+    """
+    name = 'fake'
+
+    def __init__(self, width, height, pixels):
+        self.w, self.h, self.pixels = width, height, list(pixels)
+        self.tk = self
+
+    def width(self):
+        return self.w
+
+    def height(self):
+        return self.h
+
+    def splitlist(self, value):
+        return tcl.splitlist(value)
+
+    def call(self, name, command, *args):
+        background = (0, 0, 0)
+        if args[0] == '-background':
+            background = bytes.fromhex(args[1][1:])
+            args = args[2:]
+        x1, y1, x2, y2 = args[1:]
+        rows = []
+        for y in range(y1, y2):
+            colors = []
+            for r, g, b, a in self.pixels[y * self.w + x1:y * self.w + x2]:
+                colors.append('#%02x%02x%02x' % tuple(round((a * v + (255 - a) * back) / 255)
+                                                      for v, back in zip((r, g, b), background)))
+            rows.append('{%s}' % ' '.join(colors))
+        return ' '.join(rows)
+
+    def put(self, data, to=(0, 0)):
+        for dy, row in enumerate(data):
+            for dx, color in enumerate(row.split()):
+                self.pixels[(to[1] + dy) * self.w + to[0] + dx] = tuple(bytes.fromhex(color[1:])) + (255,)
+
+
+def image(width, height, pixels):
+    result = graphics.Image.__new__(graphics.Image)
+    result.img = FakePhoto(width, height, pixels)
+    return result
+
+
+def decode_png(png):
+    # RGBA de un PNG de rgba_to_png (8 bits, color 6, filtro 0 en cada fila)
+    assert png[:8] == b'\x89PNG\r\n\x1a\n'
+    pos, idat = 8, b''
+    while pos < len(png):
+        size, = struct.unpack('>I', png[pos:pos + 4])
+        kind, payload = png[pos + 4:pos + 8], png[pos + 8:pos + 8 + size]
+        assert struct.unpack('>I', png[pos + 8 + size:pos + 12 + size])[0] == zlib.crc32(kind + payload)
+        if kind == b'IHDR':
+            width, height = struct.unpack('>II', payload[:8])
+        elif kind == b'IDAT':
+            idat += payload
+        pos += 12 + size
+    raw, stride = zlib.decompress(idat), width * 4 + 1
+    assert all(raw[row * stride] == 0 for row in range(height))
+    return width, height, b''.join(raw[row * stride + 1:(row + 1) * stride] for row in range(height))
+
+
+def test_opaque_pixels_round_trip():
+    img = image(3, 2, [(0, 0, 0, 255)] * 6)
+    img.putPixels([['#ff8000', (1, 2, 3), '#0000ff'], [(9, 9, 9), '#000000', '#ffffff']])
+    assert img.getPixels() == [[(255, 128, 0), (1, 2, 3), (0, 0, 255)], [(9, 9, 9), (0, 0, 0), (255, 255, 255)]]
+    assert img.toBytes() == bytes([255, 128, 0, 255, 1, 2, 3, 255, 0, 0, 255, 255,
+                                   9, 9, 9, 255, 0, 0, 0, 255, 255, 255, 255, 255])
+
+
+def test_one_bit_alpha_is_exact():
+    pixels = [(200, 10, 30, 255), (0, 0, 0, 0), (0, 0, 0, 255), (255, 255, 255, 255)]
+    assert image(2, 2, pixels).toBytes() == b''.join(bytes(pixel) for pixel in pixels)
+
+
+def test_partial_alpha_is_approximate():
+    pixels = [(r, 255 - r, r // 2, a) for r in range(0, 256, 51) for a in (1, 64, 128, 200, 254)]
+    data = image(len(pixels), 1, pixels).toBytes()
+    for index, (r, g, b, a) in enumerate(pixels):
+        assert abs(data[index * 4 + 3] - a) <= 1
+        for got, expected in zip(data[index * 4:index * 4 + 3], (r, g, b)):
+            assert abs(got - expected) <= 255 // a + 1
+
+
+def test_photo_from_rgba_gets_the_same_bytes(monkeypatch):
+    pixels = [(10 * x, 20 * y, 5, 255 if (x + y) % 3 else 0) for y in range(4) for x in range(5)]
+    data = image(5, 4, pixels).toBytes()
+    made = []
+    monkeypatch.setattr(graphics, '_get_root', lambda: None)  # Sin pantalla: se revisa el PNG que recibiría Tk
+    monkeypatch.setattr(graphics.tk, 'PhotoImage', lambda data, master: made.append(data) or 'photo')
+    assert graphics.photo_from_rgba(5, 4, data) == 'photo'
+    assert decode_png(base64.b64decode(made[0])) == (5, 4, data)
+    with pytest.raises(graphics.GraphicsError):
+        graphics.rgba_to_png(5, 4, data[:-1])
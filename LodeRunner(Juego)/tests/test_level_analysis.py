@@ -0,0 +1,50 @@
+# Archivo: tests/test_level_analysis.py
+
+from level_analysis import LevelAnalysis
+
+
+def test_one_row_level():
+    # Sin fila de abajo no hay dónde mirar si el jugador queda parado: antes leía fuera de la grilla
+    analysis = LevelAnalysis([['E', 'E', 'E']], [('P', 0, 0)])
+    assert analysis.exit_reachable
+    assert analysis.ok()
+    assert list(analysis.reachable) == [1, 1, 1]
+
+
+def test_shipped_levels_are_winnable():
+    import csv
+    for num in (1, 2):
+        with open(f'levels/level{num}.csv') as file_data:
+            rows = [row for row in csv.reader(file_data)]
+        characters = [(value, col, row_num) for row_num, row in enumerate(rows)
+                      for col, value in enumerate(row) if value == 'P']
+        assert LevelAnalysis(rows, characters).problems == []
+
+
+def test_unreachable_gold_and_ragged_rows():
+    # Moneda arriba del jugador sin escalera (cavar solo baja), y un nivel con filas de distinto largo
+    rows = [['4', '1', '1'], ['1', '0', '1'], ['1', '1', '1']]  # 0 vacío, 1 ladrillo, 4 oro
+    analysis = LevelAnalysis(rows, [('P', 1, 1)])
+    assert analysis.uncollectable_gold == [(0, 0)]
+    assert not analysis.ok()
+    assert not LevelAnalysis([['0', '0'], ['0']], [('P', 0, 0)]).ok()
+
+
+def test_can_reach_matches_a_flood_fill():
+    # Las zonas (condensación) contestan lo mismo que recorrer el grafo desde la celda de partida
+    import csv, random
+    from level_analysis import player_moves, visit
+    from level_data import LevelData
+    with open('levels/level2.csv') as file_data:
+        rows = [row for row in csv.reader(file_data)]
+    analysis = LevelAnalysis(rows)
+    table = LevelData._tile_table()
+    props = bytearray(table.get(value, table[None]) for row in rows for value in row)
+    moves = player_moves(props, analysis.width, analysis.height)
+    regions = analysis.regions
+    assert len(regions.sources) <= sum(map(len, moves))  # Lineal en el grafo, no cuadrático en las zonas
+    rng = random.Random(0)
+    for start in rng.sample(range(len(moves)), 40):
+        seen = visit(moves, [start])
+        for goal in rng.sample(range(len(moves)), 40):
+            assert analysis.can_reach(start, goal) == bool(seen[goal])
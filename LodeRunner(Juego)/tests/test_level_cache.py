@@ -0,0 +1,115 @@
+# Archivo: tests/test_level_cache.py
+
+import os, glob, gc
+import pytest
+
+from level_cache import LevelCache
+from level_data import LevelData
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    # Caché activo, pero en una carpeta temporal
+    monkeypatch.setattr(LevelCache, 'enabled', True)
+    monkeypatch.setattr(LevelCache, 'DIR', str(tmp_path))
+    return tmp_path
+
+
+def files(cache, name='level1'):
+    return sorted(glob.glob(os.path.join(str(cache), f'{name}-*.bin')))
+
+
+def fields(data):
+    # Lo que LevelCache guarda, en tipos comparables
+    nav, regions = data.nav_components, data.analysis.regions
+    return {
+        'rows': data.rows, 'characters': data.characters, 'props': bytes(data.props),
+        'nav': [list(moves) for moves in data.nav],
+        'components': [(list(c.comp), list(c.starts), list(c.sources)) for c in (nav, regions)],
+        'problems': list(data.analysis.problems),
+    }
+
+
+def test_hit_matches_derived(cache):
+    derived = LevelData(1)
+    assert len(files(cache)) == 1 and derived._mapping is None
+    hits = LevelCache.hits
+    cached = LevelData(1)
+    assert LevelCache.hits == hits + 1 and cached._mapping is not None
+    assert fields(cached) == fields(derived)
+
+
+def test_mapping_closed_when_level_dropped(cache):
+    LevelData(1)
+    data = LevelData(1)
+    mapping = data._mapping
+    del data
+    gc.collect()
+    assert mapping.closed and mapping.mapped.closed
+    os.remove(files(cache)[0])  # En Windows fallaría con el archivo todavía mapeado
+
+
+def test_analysis_outlives_level(cache):
+    LevelData(1)
+    data = LevelData(1)
+    mapping, analysis = data._mapping, data.analysis
+    expected = [analysis.can_reach(0, goal) for goal in range(len(analysis.reachable))]
+    del data
+    gc.collect()
+    assert mapping.closed
+    assert [analysis.can_reach(0, goal) for goal in range(len(analysis.reachable))] == expected
+    assert sum(analysis.reachable) > 0 and analysis.ok()
+
+
+def test_navgraph_keeps_mapping_alive(cache, level):
+    from pathfinding import NavGraph
+    from tiles import Tile
+    LevelData(1)  # Guarda el caché: load_level lo lee
+    level(1)
+    graph = NavGraph.current()
+    gc.collect()
+    assert graph._owner is not None and not graph._owner._mapping.closed
+    fresh = NavGraph(Tile.props, graph.width, graph.height)  # Calcula sus propias componentes
+    cells = [index for index, moves in enumerate(graph.adj) if moves]
+    for goal in cells[::7]:
+        assert graph.reachable(cells[0], goal) == fresh.reachable(cells[0], goal)
+
+
+def test_key_changes_with_csv(cache):
+    with open(LevelData.path(1), 'rb') as file_data:
+        raw = file_data.read()
+    table = LevelData._tile_table()
+    old_key = LevelCache.key(raw, table, LevelData._shown_bits)
+    new_key = LevelCache.key(raw.replace(b'0', b'3', 1), table, LevelData._shown_bits)
+    assert old_key != new_key
+    data = LevelData(1)
+    old_file = files(cache)
+    assert LevelCache.load('level1', new_key) is None
+    LevelCache.store('level1', new_key, data)
+    assert files(cache) != old_file and len(files(cache)) == 1  # El viejo se borró
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'magic'])
+def test_broken_file_is_rejected_and_replaced(cache, damage):
+    LevelData(1)
+    path, = files(cache)
+    with open(path, 'r+b') as cache_file:
+        if damage == 'truncate':
+            cache_file.truncate(os.path.getsize(path) // 2)
+        else:
+            cache_file.write(b'XXXX')
+    misses = LevelCache.misses
+    data = LevelData(1)
+    assert LevelCache.misses == misses + 1 and data._mapping is None
+    assert files(cache) == [path]
+    assert LevelData(1)._mapping is not None  # El archivo reemplazado ya se lee
+
+
+def test_store_failure_is_reported(cache, monkeypatch, capsys):
+    data = LevelData(1)
+
+    def fail(*args):
+        raise PermissionError('archivo en uso')
+    monkeypatch.setattr(os, 'replace', fail)
+    LevelCache.store('level1', 'otra' * 16, data)
+    assert 'Aviso' in capsys.readouterr().out
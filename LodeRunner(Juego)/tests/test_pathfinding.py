@@ -0,0 +1,143 @@
+# Archivo: tests/test_pathfinding.py
+
+import random
+import pytest
+from pathfinding import NavGraph
+
+
+def sample_pairs(graph, count, seed=0):
+    # Pares (inicio, objetivo) al azar entre celdas con algún movimiento
+    rng = random.Random(seed)
+    cells = [index for index, moves in enumerate(graph.adj) if moves]
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(count)]
+
+
+def valid_path(graph, start, path):
+    # Cada paso es un movimiento permitido desde la celda anterior
+    previous = start
+    for cell in path:
+        if not graph.has_move(previous, cell):
+            return False
+        previous = cell
+    return True
+
+
+def test_search_modes_agree_with_reachability(level):
+    for num in (1, 2):
+        level(num)
+        graph = NavGraph.current()
+        for start, goal in sample_pairs(graph, 300, seed=num):
+            bfs = graph.find(start, goal, 'bfs')
+            astar = graph.find(start, goal, 'astar')
+            hierarchical = graph.find(start, goal, 'hierarchical')
+            reachable = graph.reachable(start, goal)
+            for path in (bfs, astar, hierarchical):
+                assert (path is not None) == reachable, (num, start, goal)
+                if path is not None:
+                    assert path[-1] == goal and valid_path(graph, start, path)
+            if reachable:
+                assert len(astar) == len(bfs)  # Todos los pasos cuestan 1: los dos dan el más corto
+                assert len(hierarchical) >= len(bfs)
+
+
+def test_astar_heuristic_is_admissible(level):
+    # La cota de A* nunca pasa el largo real del camino (el del BFS), y a veces es mayor que Manhattan
+    for num in (1, 2):
+        level(num)
+        graph = NavGraph.current()
+        width = graph.width
+        tighter = 0
+        for start, goal in sample_pairs(graph, 500, seed=num):
+            path = graph.bfs(start, goal) if graph.reachable(start, goal) else None
+            if path is None:
+                continue
+            flat, climb = graph.heuristic(goal)
+            x, y, gy = start % width, start // width, goal // width
+            estimate = (climb if y > gy else flat)[x] + abs(y - gy)
+            assert estimate <= len(path), (num, start, goal)
+            tighter += estimate > abs(x - goal % width) + abs(y - gy)
+        assert tighter > 0
+
+
+def test_update_matches_rebuild(level):
+    # Cambiar celdas y actualizar el grafo da lo mismo que armarlo de cero
+    from tiles import Tile
+    from config import Config
+    level(1)
+    graph = NavGraph.current()
+    for index in range(0, len(Tile.props), 7):
+        Tile.props[index] ^= 0xFF
+    graph.update(range(0, len(Tile.props), 7))
+    fresh = NavGraph(Tile.props, Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT)
+    assert graph.adj == fresh.adj
+    for start, goal in sample_pairs(fresh, 200):
+        assert graph.reachable(start, goal) == fresh.reachable(start, goal)
+
+
+def test_worker_searches_do_not_use_the_frame_budget(level):
+    # Las búsquedas del trabajador no suman a NavGraph.expanded (el presupuesto de AIScheduler)
+    import path_worker
+    from tiles import Tile
+    from config import Config
+    level(1)
+    graph = NavGraph.current()
+    start, goal = next((a, b) for a, b in sample_pairs(graph, 100) if graph.reachable(a, b))
+    before = NavGraph.expanded
+    version, searched_from, path, expanded = path_worker.search(
+        bytes(Tile.props), Config.LEVEL_WIDTH, Config.LEVEL_HEIGHT, Tile.version, start, goal, 'astar')
+    assert NavGraph.expanded == before
+    assert expanded > 0 and path == graph.find(start, goal, 'astar')
+    assert NavGraph.expanded > before  # La del hilo del juego sí cuenta
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    # PathWorker en modo hilo, con su propio executor y sus propios pedidos
+    from path_worker import PathWorker
+    monkeypatch.setattr(PathWorker, 'mode', 'thread')
+    monkeypatch.setattr(PathWorker, '_executor', None)
+    monkeypatch.setattr(PathWorker, '_jobs', {})
+    yield PathWorker
+    if PathWorker._executor is not None:
+        PathWorker._executor.shutdown(wait=True)
+
+
+def cells(baddie):
+    # Celda del baddie y celda del jugador
+    from characters import Player
+    import util
+    return util.index(*baddie.pos()), util.index(*Player.main.pos())
+
+
+def chase(baddie):
+    # Pide al trabajador el camino de `baddie` hasta el jugador y espera a que termine (falle o no)
+    from characters import PathFinder
+    from path_worker import PathWorker
+    PathWorker.submit(baddie, *cells(baddie), PathFinder.mode)
+    PathWorker._jobs[baddie].exception(timeout=10)
+
+
+def test_failed_worker_search_falls_back(level, worker, monkeypatch):
+    import path_worker
+    from characters import Baddie, PathFinder
+
+    def broken(*args):
+        raise MemoryError('búsqueda rota')
+    monkeypatch.setattr(path_worker, 'search', broken)
+    level(1)
+    baddie = next(baddie for baddie in Baddie.baddies if NavGraph.current().reachable(*cells(baddie)))
+    chase(baddie)
+    assert worker.ready() == [baddie]
+    step = PathFinder.run_cached(baddie)  # No lanza: busca en el hilo del juego
+    assert step is not None and worker.failed >= 1
+    assert baddie not in worker._jobs
+
+
+def test_jobs_dropped_without_lives(level, worker):
+    from characters import Baddie, Player
+    level(1)
+    baddie = Baddie.baddies[0]
+    chase(baddie)
+    Player.main.lives = 0
+    baddie.move_action()
+    assert worker.ready() == []
@@ -0,0 +1,59 @@
+# Archivo: tests/test_replay.py
+
+import random
+from conftest import play
+from replay import Recorder, Replay, state_digest
+
+
+def record_segment(main, level_num, ticks, seed=5):
+    # Graba en memoria un tramo de `ticks` ticks con teclas al azar y lo devuelve junto a la semilla
+    from characters import Player
+    Recorder.start_session(seed=seed)
+    random.seed(seed)
+    Player.main = None
+    main.load_level(level_num)
+    Player.main.lives = 50
+    Recorder.start_level(level_num)
+    play(main, ticks, record=Recorder.record)
+    Recorder.end_level()
+    segment = Recorder._session['levels'][0]
+    Recorder._session = None
+    return segment, seed
+
+
+def test_replay_reaches_recorded_state(level):
+    main = level(1)
+    for level_num in (1, 2):
+        segment, seed = record_segment(main, level_num, 1500)
+        assert len(segment['inputs']) > 10
+        replay = Replay(segment, seed)
+        assert replay.run() == segment['ticks']
+        assert replay.matches(), (segment['end'], state_digest())
+
+
+def test_replay_is_deterministic(level):
+    main = level(1)
+    segment, seed = record_segment(main, 1, 1200)
+    digests = []
+    for _ in range(2):
+        replay = Replay(segment, seed, checkpoint_every=100)
+        replay.run()
+        digests.append(state_digest())
+    assert digests[0] == digests[1] == segment['end']
+
+
+def test_seek_matches_linear_run(level):
+    main = level(1)
+    segment, seed = record_segment(main, 1, 1200)
+    targets = [150, 777, 401, 1000, 0, segment['ticks']]
+    expected = {}
+    for target in sorted(set(targets)):
+        linear = Replay(segment, seed, checkpoint_every=100)
+        linear.run(until=target)
+        expected[target] = state_digest()
+    replay = Replay(segment, seed, checkpoint_every=100)
+    replay.run()  # Llena los puntos de control
+    for target in targets:  # Hacia adelante y hacia atrás
+        replay.seek(target)
+        assert replay.tick == min(target, segment['ticks'])
+        assert state_digest() == expected[target], target
@@ -0,0 +1,66 @@
+# Archivo: tests/test_snapshot.py
+
+import random
+import pytest
+from conftest import play
+from replay import state_digest
+from snapshot import Snapshot
+
+
+def terrain():
+    # Qué tile hay en cada celda y cuáles están ocultos: lo que Snapshot tiene que devolver tal cual
+    from tiles import Tile
+    return [type(tile).__name__ for tile in Tile.level], set(map(id, Tile._hidden_tiles)), bytes(Tile.props)
+
+
+def test_restore_round_trip(level):
+    main = level(1)
+    play(main, 300, seed=3)
+    snapshot = Snapshot.take()
+    before, before_terrain = state_digest(), terrain()
+    random_state = random.getstate()
+    play(main, 900, seed=4)
+    after = state_digest()
+    assert after != before  # Si no cambió nada la prueba no prueba nada
+    snapshot.restore()
+    assert state_digest() == before
+    assert terrain() == before_terrain
+    # Desde la foto restaurada, las mismas teclas llevan al mismo estado
+    random.setstate(random_state)
+    play(main, 900, seed=4)
+    assert state_digest() == after
+
+
+def test_restore_is_repeatable(level):
+    main = level(2)
+    snapshot = Snapshot.take()
+    start = state_digest()
+    for seed in (7, 8):
+        play(main, 400, seed=seed)
+        snapshot.restore()
+        assert state_digest() == start
+
+
+def test_restore_updates_hud(level):
+    from characters import Player
+    from drawable import Drawable
+    from hud import Hud
+    main = level(1)
+    snapshot = Snapshot.take()
+    lives, coins = Player.main.lives, Player.main._coins_collected
+    play(main, 900, seed=4)
+    # Cambios seguros en los dos contadores, como los de perder una vida y juntar una moneda
+    Player.main.lose_life()
+    Player.main._coins_collected += 1
+    Drawable.draw_coin_counter(Player.main._coins_collected)
+    snapshot.restore()
+    assert Hud.fields['lives'].value == lives
+    assert Hud.fields['coins'].value == coins
+
+
+def test_restore_rejects_other_level(level):
+    main = level(1)
+    snapshot = Snapshot.take()
+    level(2)
+    with pytest.raises(ValueError):
+        snapshot.restore()
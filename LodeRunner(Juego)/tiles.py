@@ -1,6 +1,7 @@
-import csv       # Para leer los archivos CSV que definen la disposición de los tiles
 import util      # Módulo con funciones auxiliares (p.ej. util.index para convertir coordenadas)
-import os        # Para manejar rutas de archivos (os.path.join al cargar niveles)
+import level_data  # Niveles ya parseados (y precargados en segundo plano)
+from config import Config
+from game_events import GameEvents  # Bus de eventos: aviso cuando se toma oro o se revelan escaleras
 from drawable import Drawable  # Clase base que define cómo dibujar y mover objetos en pantalla
 
 
@@ -20,25 +21,99 @@ class Tile(Drawable):
 
     _hidden_tiles = []  # Lista de tiles ocultos (p.ej. escaleras ocultas)
 
+    # Versión del terreno: sube cada vez que cambia algún tile (nunca baja, ni al cambiar de nivel).
+    # Junto con GameEvents.TERRAIN_CHANGED permite cachear datos derivados (caminos, caídas, fondo)
+    # y actualizarlos solo en las celdas que cambiaron.
+    version = 0
+    props = bytearray()  # Grilla de propiedades del terreno actual, una máscara de bits (level_data) por celda
+    _dirty = None  # Mientras se agrupan cambios (carga de nivel, showAll) acumula aquí las celdas
+
+    # Propiedades por defecto de un tile; cada subclase declara en PROPERTIES solo las que cambia
+    DEFAULT_PROPERTIES = {
+        'passable':  True,
+        'takable':   False,
+        'standable': False,
+        'climbable': False,
+        'grabbable': False,
+        'diggable':  False
+    }
+    PROPERTIES = {}
+    HIDDEN = False  # True si el tile empieza oculto (HiddenLadder)
+
     @staticmethod
-    def load_level(num):
+    def load_level(num, data=None):
         """
-        Carga el nivel número `num` desde un archivo CSV.
+        Carga el nivel número `num`. Usa el LevelData ya parseado si se lo pasan
+        (p.ej. el que se precargó en segundo plano); si no, lo obtiene de level_data.
         Cada celda del CSV se convierte en un objeto Tile según tile_map.
         """
-        path = os.path.join('levels', f'level{num}.csv')
-        with open(path) as file_data:
-            Tile.level = []
-            row_num = 0
-            for row in csv.reader(file_data):
-                # Para cada elemento en la fila, instancia el tile correspondiente
-                Tile.level.extend([
-                    Tile.tile_map[elem]((index, row_num)) 
-                    if elem in Tile.tile_map 
-                    else Empty((index, row_num))  # Por defecto, Empty si no está en tile_map
-                    for index, elem in enumerate(row)
-                ])
-                row_num += 1
+        if data is None:
+            data = level_data.LevelData.get(num)
+        Gold._num_gold = 0  # El contador de oro empieza de cero en cada nivel
+        HiddenLadder._hidden = []  # Olvida las escaleras ocultas del nivel anterior
+        Tile._hidden_tiles = []
+        Tile.level = []
+        Tile._dirty = set()  # Los tiles que se ocultan al crearse no avisan uno por uno
+        for row_num, row in enumerate(data.rows):
+            # Para cada elemento en la fila, instancia el tile correspondiente
+            Tile.level.extend([
+                Tile.tile_map[elem]((index, row_num)) 
+                if elem in Tile.tile_map 
+                else Empty((index, row_num))  # Por defecto, Empty si no está en tile_map
+                for index, elem in enumerate(row)
+            ])
+        Tile._dirty = None
+        Tile.terrain_changed(None)  # Toda la grilla es nueva
+        if Gold.all_taken():
+            GameEvents.emit(GameEvents.ALL_GOLD_COLLECTED)  # Nivel sin oro: las escaleras salen desde el inicio
+
+    @staticmethod
+    def initial_properties(code):
+        """
+        Devuelve las propiedades con las que empieza un tile del código `code` del CSV,
+        sin crearlo (y por lo tanto sin tocar la pantalla).
+        """
+        tile_class = Tile.tile_map.get(code, Empty)
+        properties = dict(Tile.DEFAULT_PROPERTIES)
+        if not tile_class.HIDDEN:
+            properties.update(tile_class.PROPERTIES)
+        return properties
+
+    @staticmethod
+    def terrain_changed(cells):
+        """
+        Registra que cambiaron las celdas `cells` (índices en Tile.level), o toda la grilla
+        si es None: actualiza Tile.props, sube Tile.version y avisa por GameEvents.TERRAIN_CHANGED.
+        Si se están agrupando cambios, solo acumula las celdas hasta flush_terrain_changes().
+        """
+        if cells is None:
+            Tile.props = bytearray(level_data.pack_properties(tile.properties) for tile in Tile.level)
+        else:
+            if Tile._dirty is not None:
+                Tile._dirty.update(cells)
+                return
+            for index in cells:
+                Tile.props[index] = level_data.pack_properties(Tile.level[index].properties)
+        Tile.version += 1
+        GameEvents.emit(GameEvents.TERRAIN_CHANGED, Tile.version, cells)
+
+    @staticmethod
+    def batch_terrain_changes():
+        """
+        Empieza a agrupar cambios de terreno: se notificarán juntos, con una sola versión nueva,
+        al llamar a flush_terrain_changes().
+        """
+        if Tile._dirty is None:
+            Tile._dirty = set()
+
+    @staticmethod
+    def flush_terrain_changes():
+        """
+        Termina de agrupar cambios y notifica todas las celdas acumuladas de una vez.
+        """
+        cells, Tile._dirty = Tile._dirty, None
+        if cells:
+            Tile.terrain_changed(cells)
 
     @staticmethod
     def query(coord, property):
@@ -65,6 +140,7 @@ class Tile(Drawable):
         idx = util.index(*coord)
         Tile.level[idx].undraw()
         Tile.level[idx] = Empty(coord)
+        Tile.terrain_changed((idx,))
 
     def __init__(self, coord, img_path=None, properties={}, hidden=False):
         """
@@ -79,14 +155,7 @@ class Tile(Drawable):
             self.draw()  # Dibuja en pantalla si no está oculto
 
         # Propiedades por defecto de un tile
-        self.properties = {
-            'passable':  True,
-            'takable':   False,
-            'standable': False,
-            'climbable': False,
-            'grabbable': False,
-            'diggable':  False
-        }
+        self.properties = dict(Tile.DEFAULT_PROPERTIES)
 
         # Sobreescribe solo las propiedades definidas en el argumento
         for key in properties:
@@ -102,15 +171,10 @@ class Tile(Drawable):
        
         self.hidden_properties = self.properties
         # Al ocultar, el tile deja de impactar en la jugabilidad salvo como pasable
-        self.properties = {
-            'passable':  True,
-            'takable':   False,
-            'standable': False,
-            'climbable': False,
-            'grabbable': False,
-            'diggable':  False
-        }
+        self.properties = dict(Tile.DEFAULT_PROPERTIES)
+        Tile._hidden_tiles.append(self)
         self.undraw()
+        Tile.terrain_changed((util.index(*self.coord),))
 
     def show(self):
         """
@@ -119,6 +183,9 @@ class Tile(Drawable):
         """
         self.draw()
         self.properties = self.hidden_properties
+        if self in Tile._hidden_tiles:
+            Tile._hidden_tiles.remove(self)
+        Tile.terrain_changed((util.index(*self.coord),))
 
     def take(self):
         # Método genérico para tomar/usar el tile; se sobreescribe en subclases (p.ej. Gold).
@@ -136,13 +203,14 @@ class Brick(Tile):
     """
     Ladrillo que bloquea el paso, se puede pararse sobre él y se puede cavar (diggable).
     """
+    PROPERTIES = {
+        'passable':   False,  # No se puede atravesar
+        'standable':  True,   # El jugador puede pararse encima
+        'diggable':   True    # Se puede cavar (y convertir en Empty)
+    }
+
     def __init__(self, coord):
-        properties = {
-            'passable':   False,  # No se puede atravesar
-            'standable':  True,   # El jugador puede pararse encima
-            'diggable':   True    # Se puede cavar (y convertir en Empty)
-        }
-        super(Brick, self).__init__(coord, 'brick.png', properties)
+        super(Brick, self).__init__(coord, 'brick.png', Brick.PROPERTIES)
 
 
 class Ladder(Tile):
@@ -150,24 +218,26 @@ class Ladder(Tile):
     Escalera: permite que el jugador suba o baje. También se puede “agarrar”.
     Puede crearse oculta (p.ej. HiddenLadder hereda de esta clase con hidden=True).
     """
+    PROPERTIES = {
+        'standable':  True,   # El jugador puede pararse en la parte superior
+        'climbable':  True,   # Se puede subir/bajar por ella
+        'grabbable': True     # Interacción de agarrar cuerda/escalera (si aplica)
+    }
+
     def __init__(self, coord, hidden=False):
-        properties = {
-            'standable':  True,   # El jugador puede pararse en la parte superior
-            'climbable':  True,   # Se puede subir/bajar por ella
-            'grabbable': True     # Interacción de agarrar cuerda/escalera (si aplica)
-        }
-        super(Ladder, self).__init__(coord, 'ladder.png', properties, hidden)
+        super(Ladder, self).__init__(coord, 'ladder.png', Ladder.PROPERTIES, hidden)
 
 
 class Rope(Tile):
     """
     Cuerda: el jugador puede agarrarse (grabbable), pero no se para sobre ella.
     """
+    PROPERTIES = {
+        'grabbable': True  # Única propiedad relevante
+    }
+
     def __init__(self, coord):
-        properties = {
-            'grabbable': True  # Única propiedad relevante
-        }
-        super(Rope, self).__init__(coord, 'rope.png', properties)
+        super(Rope, self).__init__(coord, 'rope.png', Rope.PROPERTIES)
 
 
 class Gold(Tile):
@@ -184,12 +254,13 @@ class Gold(Tile):
         """
         return Gold._num_gold <= 0
 
+    PROPERTIES = {
+        'takable': True  # Se puede recoger
+    }
+
     def __init__(self, coord):
         Gold._num_gold += 1  # Incrementa contador al crearse
-        properties = {
-            'takable': True  # Se puede recoger
-        }
-        super(Gold, self).__init__(coord, 'gold.png', properties)
+        super(Gold, self).__init__(coord, 'gold.png', Gold.PROPERTIES)
 
     def take(self):
         """
@@ -199,6 +270,9 @@ class Gold(Tile):
         if self.properties['takable']:
             Gold._num_gold -= 1
             Tile.clear(self.coord)
+            GameEvents.emit(GameEvents.GOLD_TAKEN, self)
+            if Gold.all_taken():
+                GameEvents.emit(GameEvents.ALL_GOLD_COLLECTED)  # Era la última: se revela la salida
             return True
         return False  # No se pudo tomar (si ya no era takable por alguna razón)
 
@@ -209,6 +283,7 @@ class HiddenLadder(Ladder):
     Puede mostrarse todas juntas usando showAll().
     """
     _hidden = []
+    HIDDEN = True
 
     @staticmethod
     def showAll():
@@ -216,15 +291,30 @@ class HiddenLadder(Ladder):
         Muestra todas las escaleras ocultas del nivel,
         restaurando sus propiedades originales.
         """
+        Tile.batch_terrain_changes()  # Todas las escaleras aparecen en un solo cambio de terreno
         for ladder in HiddenLadder._hidden:
             ladder.show()
+            ladder.lower_img()  # Queda debajo de los personajes sin tener que redibujarlos
         HiddenLadder._hidden = []
+        Tile.flush_terrain_changes()
+
+    @staticmethod
+    def reveal():
+        """
+        Suscriptor de ALL_GOLD_COLLECTED: revela las escaleras una sola vez, en el
+        momento en que se toma la última moneda.
+        """
+        if not Config.hidden_flag:
+            HiddenLadder.showAll()
+            Config.hidden_flag = True
 
     def __init__(self, coord):
         super(HiddenLadder, self).__init__(coord, hidden=True)
         HiddenLadder._hidden.append(self)  # Se registra en la lista de ocultos
 
 
+GameEvents.subscribe(GameEvents.ALL_GOLD_COLLECTED, HiddenLadder.reveal)
+
 # Se define el diccionario tile_map al final para que las clases ya existan
 Tile.tile_map = {
     '0': Empty,